@@ -9,14 +9,17 @@ file.  The individual passes are implemented in separate modules.
 The function build() is the main interface to this module.
 """
 
+import bisect
+import multiprocessing
 import os
 import os.path
 import shlex
 import subprocess
 import sys
+import time
 from os.path import dirname, basename
 
-from typing import Undefined, Dict, List, Tuple, cast, Set
+from typing import Undefined, Any, Dict, List, Tuple, cast, Set, Function
 
 from mypy.types import Type
 from mypy.nodes import MypyFile, Node, Import, ImportFrom, ImportAll
@@ -24,9 +27,21 @@ from mypy.nodes import SymbolTableNode, MODULE_REF
 from mypy.semanal import SemanticAnalyzer, FirstPass, ThirdPass
 from mypy.checker import TypeChecker
 from mypy.errors import Errors, CompileError
+from mypy.cache import (
+    ModuleCache, MemoryModuleCache, ParseTreeCache, SnapshotCache, CacheMeta,
+    CacheError
+)
+from mypy import cache
+from mypy import importscan
+from mypy import lex
 from mypy import parse
 from mypy import stats
+from mypy.subtypes import ResultCache, subtype_cache
+from mypy.join import join_cache
+from mypy.meet import meet_cache
 from mypy import transform
+from mypy import buildstats
+from mypy.buildstats import BuildStats
 
 
 debug = False
@@ -43,6 +58,29 @@ DO_NOT_RUN = 'do-not-run'        # Only type check, don't run the program
 VERBOSE = 'verbose'              # More verbose messages (for troubleshooting)
 MODULE = 'module'                # Build/run module as a script
 TEST_BUILTINS = 'test-builtins'  # Use stub builtins to speed up tests
+INCREMENTAL = 'incremental'      # Cache analyzed modules between builds
+LAZY_STUBS = 'lazy-stubs'        # Only check parts of stubs used by others
+PROFILE = 'profile'              # Report time spent per module and phase
+PROFILE_JSON = 'profile-json'    # Like PROFILE, but report as JSON
+PARSE_CACHE = 'parse-cache'      # Cache parse trees of source files
+NO_SNAPSHOT = 'no-snapshot'      # Don't load core modules from a snapshot
+
+
+# Default directory for incremental build cache files
+DEFAULT_CACHE_DIR = '.mypy_cache'
+
+# Modules that are stored in snapshots of core modules (together with the
+# modules that they depend on)
+SNAPSHOT_MODULES = ['builtins', 'typing']
+
+# Caches of the results of type operations, by name. The results are only
+# valid within a build. The numbers of cache hits and misses are reported by
+# PROFILE.
+type_operation_caches = [
+    ('subtype', subtype_cache),
+    ('join', join_cache),
+    ('meet', meet_cache),
+]  # type: List[Tuple[str, ResultCache]]
 
 
 # State ids. These describe the states a source file / module can be in a
@@ -69,18 +107,43 @@ def earlier_state(s: int, t: int) -> bool:
     return s < t
 
 
+class BuildSource:
+    """A module that is processed as an entry point of a build.
+
+    Attributes:
+      path:      Path to the source file (None if the module is looked up
+                 using the library path)
+      module:    Module id, such as 'os.path' or '__main__'; if None, the id
+                 is derived from path (see assign_module_ids)
+      text:      Source code of the module; if None, read from path
+      recursive: If True, the module is a package and all the modules in
+                 the package (recursively) are entry points as well
+    """
+
+    def __init__(self, path: str, module: str, text: str = None,
+                 recursive: bool = False) -> None:
+        self.path = path
+        self.module = module
+        self.text = text
+        self.recursive = recursive
+
+
 class BuildResult:
     """The result of a successful build.
 
     Attributes:
       files:  Dictionary from module name to related AST node.
       types:  Dictionary from parse tree node to its inferred type.
+      stats:  Timing and size statistics of modules (None if not
+              profiling; see PROFILE and format_stats). If the build fails,
+              the statistics are in the stats attribute of the CompileError.
     """
 
     def __init__(self, files: Dict[str, MypyFile],
-                 types: Dict[Node, Type]) -> None:
+                 types: Dict[Node, Type], stats: BuildStats = None) -> None:
         self.files = files
         self.types = types
+        self.stats = stats
 
 
 def build(program_path: str,
@@ -93,12 +156,18 @@ def build(program_path: str,
           pyversion: int = 3,
           custom_typing_module: str = None,
           html_report_dir: str = None,
+          cache_dir: str = None,
+          cache_files: Dict[str, bytes] = None,
+          jobs: int = 1,
+          sources: List[BuildSource] = None,
           flags: List[str] = None) -> BuildResult:
     """Build a mypy program.
 
     A single call to build performs parsing, semantic analysis and optionally
     type checking and other build passes for the program *and* all imported
-    modules, recursively.
+    modules, recursively. Additional entry points (files, modules and
+    packages) can be given using sources; modules shared by the entry points
+    are processed only once.
 
     Return BuildResult if successful; otherwise raise CompileError.
 
@@ -116,10 +185,27 @@ def build(program_path: str,
       output_dir: directory where the output (Python) is stored
       pyversion: Python version (2 for 2.x or 3 for 3.x)
       custom_typing_module: if not None, use this module id as an alias for typing
+      cache_dir: directory for cache files (only used with the INCREMENTAL
+        and PARSE_CACHE flags); DEFAULT_CACHE_DIR by default
+      cache_files: if not None, keep cache files in this dictionary (from
+        file name to contents) instead of cache_dir
+      jobs: number of processes used for parsing modules (1 means that
+        modules are parsed in the main process)
+      sources: additional entry points; if given, program_path and module
+        can be omitted
       flags: list of build options (e.g. COMPILE_ONLY)
     """
     flags = flags or []
-    module = module or '__main__'
+    sources = list(sources or [])
+    if program_path or program_text is not None or module or not sources:
+        sources.insert(0, BuildSource(program_path, module or '__main__',
+                                      program_text))
+    derived = [source for source in sources if source.module is None]
+    for source in derived:
+        source.module = module_for_path(source.path)
+
+    # Files may have been added or removed since an earlier build.
+    find_module_clear_caches()
 
     data_dir = default_data_dir(bin_dir)
 
@@ -130,10 +216,16 @@ def build(program_path: str,
         # Use stub builtins (to speed up test cases and to make them easier to
         # debug).
         lib_path.insert(0, os.path.join('mypy', 'test', 'data', 'lib-stub'))
-    elif program_path:
-        # Include directory of the program file in the module search path.
-        lib_path.insert(
-            0, remove_cwd_prefix_from_path(dirname(program_path)))
+    elif [source for source in sources if source.path]:
+        # Include the directories of the program files in the module search
+        # path.
+        dirs = List[str]()
+        for source in sources:
+            if source.path:
+                dir = source_base_dir(source.path, source.module)
+                if dir not in dirs:
+                    dirs.append(dir)
+        lib_path[:0] = dirs
     else:
         # Building/running a module.
         lib_path.insert(0, os.getcwd())
@@ -143,6 +235,8 @@ def build(program_path: str,
     if alt_lib_path:
         lib_path.insert(0, alt_lib_path)
 
+    assign_module_ids(sources, derived, lib_path)
+
     # Construct a build manager object that performs all the stages of the
     # build in the correct order.
     #
@@ -151,24 +245,123 @@ def build(program_path: str,
                            pyversion=pyversion, flags=flags,
                            ignore_prefix=os.getcwd(),
                            custom_typing_module=custom_typing_module,
-                           html_report_dir=html_report_dir)
-
-    program_path = program_path or lookup_program(module, lib_path)
-    if program_text is None:
-        program_text = read_program(program_path)
-
-    # Construct information that describes the initial file. __main__ is the
-    # implicit module id and the import context is empty initially ([]).
-    info = StateInfo(program_path, module, [], manager)
-    # Perform the build by sending the file as new file (UnprocessedFile is the
-    # initial state of all files) to the manager. The manager will process the
-    # file and all dependant modules recursively.
-    result = manager.process(UnprocessedFile(info, program_text))
+                           html_report_dir=html_report_dir,
+                           cache_dir=cache_dir,
+                           cache_files=cache_files,
+                           jobs=jobs)
+
+    # Find the files of the entry points as (module id, path, source) tuples.
+    roots = List[Tuple[str, str, str]]()
+    for source in sources:
+        if source.recursive:
+            modules = find_package_modules(source.module, lib_path)
+            if not modules:
+                raise CompileError([
+                    "mypy: can't find package '{}'".format(source.module)])
+        else:
+            modules = [(source.module, source.path)]
+        for id, path in modules:
+            if [root for root in roots if root[0] == id]:
+                raise CompileError([
+                    "mypy: duplicate module named '{}'".format(id)])
+            path = path or lookup_program(id, lib_path)
+            text = None  # type: str
+            if not source.recursive:
+                text = source.text
+            if text is None:
+                text = read_program(path)
+            roots.append((id, path, text))
+
+    # Load up-to-date core modules from a snapshot and other modules from the
+    # incremental build cache before processing anything else, so that they
+    # won't be processed again.
+    if NO_SNAPSHOT not in flags:
+        manager.load_snapshot()
+    if manager.cache:
+        manager.load_cached_modules(roots)
+
+    # Construct information that describes the initial files. The import
+    # context is empty initially ([]).
+    initial_states = List[UnprocessedFile]()
+    for id, path, text in roots:
+        info = StateInfo(path, id, [], manager)
+        initial_states.append(UnprocessedFile(info, text))
+    # Perform the build by sending the files as new files (UnprocessedFile is
+    # the initial state of all files) to the manager. The manager will process
+    # the files and all dependant modules recursively.
+    try:
+        result = manager.process(initial_states)
+    except CompileError as e:
+        e.stats = manager.stats
+        raise
+    finally:
+        manager.close()
     if 'html-report' in flags:
         stats.generate_html_index(html_report_dir)
     return result
 
 
+def format_stats(stats: BuildStats, flags: List[str]) -> List[str]:
+    """Format build statistics as JSON or as a table sorted by time."""
+    if PROFILE_JSON in flags:
+        return stats.format_json().splitlines()
+    else:
+        return stats.format_table()
+
+
+def create_snapshot(bin_dir: str = None, pyversion: int = 3,
+                    alt_lib_path: str = None,
+                    flags: List[str] = None) -> str:
+    """Analyze the core library modules and store them in a snapshot.
+
+    The modules in SNAPSHOT_MODULES and their dependencies are semantically
+    analyzed and type checked, and the results for both build targets are
+    written to a snapshot file in the directory that contains builtins.
+    Later builds load the modules from the snapshot as long as their source
+    files have not changed (see BuildManager.load_snapshot).
+
+    Return the path of the snapshot file; raise CompileError if the modules
+    have errors.
+    """
+    flags = (flags or []) + [INCREMENTAL, NO_SNAPSHOT]
+    # Entry points are added to the build in reverse order. Add builtins
+    # first, as when the modules are imported by a program, since analyzing
+    # the import cycle between builtins and typing depends on the order.
+    sources = [BuildSource(None, id) for id in reversed(SNAPSHOT_MODULES)]
+    targets = Dict[int, Dict[str, bytes]]()
+    base_dir = ''
+    for target in [SEMANTIC_ANALYSIS, TYPE_CHECK]:
+        files = Dict[str, bytes]()
+        result = build(None, target, bin_dir=bin_dir, pyversion=pyversion,
+                       alt_lib_path=alt_lib_path, cache_files=files,
+                       sources=sources, flags=flags)
+        base_dir = dirname(result.files['builtins'].path)
+        options = cache_options(pyversion, target, None,
+                                LAZY_STUBS in flags)
+        module_cache = MemoryModuleCache(files, options)
+        snapshot = SnapshotCache({}, options, base_dir)
+        for id in result.files:
+            meta = module_cache.read_meta(id)
+            if meta is not None and meta.unit_key:
+                snapshot.write_meta(meta)
+                name = module_cache.data_name(meta.unit)
+                snapshot.write_file(name, module_cache.read_file(name))
+        targets[target] = snapshot.files
+    path = os.path.join(base_dir, cache.SNAPSHOT_NAME)
+    cache.write_snapshot(path, targets)
+    return path
+
+
+def cache_options(pyversion: int, target: int, custom_typing_module: str,
+                  lazy_stubs: bool) -> List[Any]:
+    """Return the build options that cached modules depend on.
+
+    Stubs that were only partially type checked (LAZY_STUBS) must not be
+    reused by builds that check stubs fully, so lazy_stubs is included.
+    """
+    return [pyversion, target, custom_typing_module, lazy_stubs]
+
+
 def default_data_dir(bin_dir: str) -> str:
     if not bin_dir:
         # Default to current directory.
@@ -223,6 +416,84 @@ def default_lib_path(data_dir: str, target: int, pyversion: int) -> List[str]:
     return path
 
 
+def source_base_dir(path: str, id: str) -> str:
+    """Return the directory that contains the top-level package of a module.
+
+    The directory is used for looking up the modules imported by a file that
+    is given as an entry point of a build.
+    """
+    dir = dirname(path)
+    if basename(path) == '__init__.py':
+        dir = dirname(dir)
+    for _ in range(id.count('.')):
+        dir = dirname(dir)
+    return remove_cwd_prefix_from_path(dir)
+
+
+def module_for_path(path: str) -> str:
+    """Find the module id of a source file based on enclosing packages.
+
+    Directories that contain an __init__.py file are packages.
+    """
+    dir, name = os.path.split(os.path.normpath(path))
+    components = List[str]()
+    if name != '__init__.py':
+        components.append(os.path.splitext(name)[0])
+    while os.path.isfile(os.path.join(dir, '__init__.py')):
+        dir, name = os.path.split(dir)
+        if not name:
+            break
+        components.insert(0, name)
+    return '.'.join(components)
+
+
+def assign_module_ids(sources: List[BuildSource], derived: List[BuildSource],
+                      lib_path: List[str]) -> None:
+    """Make the module ids derived from the paths of files unique.
+
+    The module id of a file that is not in a package is its file name
+    without the extension (see module_for_path). If the id is also used by
+    another entry point or by a different module in lib_path, the file gets
+    the id 'name-2' (or 'name-3', ...) instead. These ids can't be imported,
+    so they can't collide with other modules. derived contains the entry
+    points whose ids were derived from their paths.
+    """
+    used = set(source.module for source in sources if source not in derived)
+    for source in derived:
+        id = source.module
+        if '.' not in id and basename(source.path) != '__init__.py':
+            path = find_module(id, lib_path)
+            if id in used or (path is not None and
+                              os.path.abspath(path) !=
+                              os.path.abspath(source.path)):
+                n = 2
+                while '{}-{}'.format(id, n) in used:
+                    n += 1
+                id = '{}-{}'.format(id, n)
+        source.module = id
+        used.add(id)
+
+
+def find_package_modules(id: str,
+                         lib_path: List[str]) -> List[Tuple[str, str]]:
+    """Find all the modules in a package, including subpackages.
+
+    Return a list of (module id, path) tuples, or an empty list if the
+    package is not found.
+    """
+    path = find_module(id, lib_path)
+    if path is None or basename(path) != '__init__.py':
+        return []
+    modules = [(id, path)]
+    dir = dirname(path)
+    for name in sorted(os.listdir(dir)):
+        if name.endswith('.py') and name != '__init__.py':
+            modules.append((id + '.' + name[:-3], os.path.join(dir, name)))
+        elif os.path.isfile(os.path.join(dir, name, '__init__.py')):
+            modules.extend(find_package_modules(id + '.' + name, lib_path))
+    return modules
+
+
 def lookup_program(module: str, lib_path: List[str]) -> str:
     path = find_module(module, lib_path)
     if path:
@@ -268,12 +539,46 @@ class BuildManager:
                        by a single state object (after it has been encountered
                        for the first time). This is the only place where
                        states are stored.
+      state_positions: Map from source file path to the index of the state
+                       of the file in states
+      module_positions:
+                       Map from module name to the index of the state of the
+                       module in states
+      dependents:      Map from module name to the names of the modules that
+                       depend on it (directly), or that otherwise need to
+                       know when it is processed (see State.watched_modules)
+      ready_states:    Sorted indexes (in states) of the states that are ready,
+                       i.e. is_ready() is True. Finished states are never ready.
       module_files:    Map from module name to source file path. There is a
                        1:1 mapping between modules and source files.
-      module_deps:     Cache for module dependencies (direct or indirect).
-                       Item (m, n) indicates whether m depends on n (directly
-                       or indirectly).
+      module_sccs:     Map from module name to a representative module of
+                       the strongly connected component of the import graph
+                       that contains the module; modules in the same
+                       component depend on each other via import cycles.
+                       Kept up to date as dependencies are added (see
+                       update_sccs); None if the components must be
+                       computed again.
       missing_modules: Set of modules that could not be imported encountered so far
+      source_hashes:   Map from module name to the hash of its source file
+                       (only for incremental builds)
+      cache:           Incremental build cache (None if not incremental)
+      parse_cache:     Cache of parse trees (None if not using PARSE_CACHE)
+      fingerprints:    Map from module name to the interface fingerprint of
+                       the module (computed on demand for fully processed
+                       modules; only for incremental builds)
+      parser_pool:     Processes for parsing modules in parallel (None if
+                       parsing in the main process)
+      parse_results:   Map from source file path to the pending result of
+                       parsing the file in parser_pool
+      prefetched:      Map from module name to (path, source) of modules
+                       that files being parsed in parser_pool may import;
+                       these are found by scanning the tokens of the files
+                       and parsed ahead of time (path and source are None
+                       if the module could not be found)
+      stats:           Timing and size statistics of modules (None if not
+                       profiling)
+      lossless:        Do parse trees record the tokens of nodes (see
+                       parse.parse)? They are not needed for type checking.
 
     TODO Refactor code related to transformation to external objects.  This module
          should not directly depend on them.
@@ -287,7 +592,10 @@ class BuildManager:
                  flags: List[str],
                  ignore_prefix: str,
                  custom_typing_module: str,
-                 html_report_dir: str) -> None:
+                 html_report_dir: str,
+                 cache_dir: str = None,
+                 cache_files: Dict[str, bytes] = None,
+                 jobs: int = 1) -> None:
         self.data_dir = data_dir
         self.errors = Errors()
         self.errors.set_ignore_prefix(ignore_prefix)
@@ -298,6 +606,7 @@ class BuildManager:
         self.flags = flags
         self.custom_typing_module = custom_typing_module
         self.html_report_dir = html_report_dir
+        self.lossless = target != TYPE_CHECK
         self.semantic_analyzer = SemanticAnalyzer(lib_path, self.errors,
                                                   pyversion=pyversion)
         self.semantic_analyzer_pass3 = ThirdPass(self.errors)
@@ -305,19 +614,62 @@ class BuildManager:
                                         self.semantic_analyzer.modules,
                                         self.pyversion)
         self.states = List[State]()
+        self.state_positions = Dict[str, int]()
+        self.module_positions = Dict[str, int]()
+        self.dependents = Dict[str, Set[str]]()
+        self.ready_states = List[int]()
         self.module_files = Dict[str, str]()
-        self.module_deps = Dict[Tuple[str, str], bool]()
+        self.module_sccs = None  # type: Dict[str, str]
         self.missing_modules = Set[str]()
-
-    def process(self, initial_state: 'UnprocessedFile') -> BuildResult:
+        self.source_hashes = Dict[str, str]()
+        self.cache = None  # type: ModuleCache
+        self.fingerprints = Dict[str, str]()
+        # Modules loaded from a snapshot of core modules, with their metadata
+        self.snapshot_metas = Dict[str, CacheMeta]()
+        if INCREMENTAL in flags and target in [SEMANTIC_ANALYSIS, TYPE_CHECK]:
+            options = cache_options(pyversion, target, custom_typing_module,
+                                    LAZY_STUBS in flags)
+            if cache_files is not None:
+                self.cache = MemoryModuleCache(cache_files, options)
+            else:
+                self.cache = ModuleCache(cache_dir or DEFAULT_CACHE_DIR,
+                                         options)
+        self.parse_cache = None  # type: ParseTreeCache
+        if PARSE_CACHE in flags:
+            files = Undefined(ModuleCache)
+            if cache_files is not None:
+                files = MemoryModuleCache(cache_files, [])
+            else:
+                files = ModuleCache(cache_dir or DEFAULT_CACHE_DIR, [])
+            self.parse_cache = ParseTreeCache(
+                files, [pyversion, custom_typing_module, self.lossless])
+        self.parser_pool = None  # type: multiprocessing.Pool
+        if jobs > 1:
+            self.parser_pool = multiprocessing.Pool(jobs)
+        self.parse_results = Dict[str, Any]()
+        self.prefetched = Dict[str, Tuple[str, str]]()
+        self.stats = None  # type: BuildStats
+        if PROFILE in flags or PROFILE_JSON in flags:
+            self.stats = BuildStats()
+        for name, results in type_operation_caches:
+            results.clear()
+
+    def process(self, initial_states: List['UnprocessedFile']) -> BuildResult:
         """Perform a build.
 
-        The argument is a state that represents the main program
-        file. This method should only be called once per a build
-        manager object.  The return values are identical to the return
-        values of the build function.
+        The argument contains states that represent the entry points of the
+        build (such as the main program file). This method should only be
+        called once per a build manager object.  The return values are
+        identical to the return values of the build function.
         """
-        self.states.append(initial_state)
+        # Add the states in reverse order, since the most recently added
+        # states are processed first.
+        for initial in reversed(initial_states):
+            if not self.has_module(initial.id):
+                # The file was not loaded from the cache.
+                self.module_files[initial.id] = initial.path
+                self.start_parse(initial.path, initial.program_text)
+                self.add_state(initial)
 
         # Process states in a loop until all files (states) have been
         # semantically analyzed or type checked (depending on target).
@@ -328,6 +680,15 @@ class BuildManager:
             # Find the next state that has all its dependencies met.
             next = self.next_available_state()
             if not next:
+                pending = [cast(PendingCachedFile, s) for s in self.states
+                           if isinstance(s, PendingCachedFile)]
+                if pending:
+                    # Pending cached modules wait for modules that are not
+                    # going to be processed (for example, because an import
+                    # cycle was introduced). Process them from source.
+                    for p in pending:
+                        self.process_again(p)
+                    continue
                 trace('done')
                 break
 
@@ -344,6 +705,9 @@ class BuildManager:
             # various reasons, such as parse error, semantic analysis error,
             # etc.
             if self.errors.is_blockers():
+                if self.cache:
+                    # Cache the modules that were processed successfully.
+                    self.write_cache()
                 self.errors.raise_error()
 
         # If there were no errors, all files should have been fully processed.
@@ -351,6 +715,9 @@ class BuildManager:
             assert s.state() == final_state, (
                 '{} still unprocessed in state {}'.format(s.path, s.state()))
 
+        if self.cache:
+            self.write_cache()
+
         if self.errors.is_errors():
             self.errors.raise_error()
 
@@ -363,20 +730,165 @@ class BuildManager:
         self.final_passes(trees, self.type_checker.type_map)
 
         return BuildResult(self.semantic_analyzer.modules,
-                           self.type_checker.type_map)
+                           self.type_checker.type_map, self.stats)
+
+    def close(self) -> None:
+        """Release resources held by the build (parser processes, caches)."""
+        if self.parser_pool:
+            self.parser_pool.terminate()
+            self.parser_pool.join()
+            self.parser_pool = None
+        self.parse_results = {}
+        self.prefetched = {}
+        for name, results in type_operation_caches:
+            if self.stats:
+                self.stats.set_cache_counts(name, results.hits, results.misses)
+            results.clear()
+
+    def start_parse(self, path: str, text: str) -> None:
+        """Start parsing a file in parser_pool, if parsing in parallel.
+
+        Also start parsing the modules that the file may import, directly or
+        indirectly (see prefetch_imports). Files with a cached parse tree
+        are not parsed.
+        """
+        if self.parser_pool and path not in self.parse_results:
+            self.submit_parse(path, text)
+            self.prefetch_imports(text)
+
+    def submit_parse(self, path: str, text: str) -> None:
+        if not (self.parse_cache and self.parse_cache.contains(path, text)):
+            self.parse_results[path] = self.parser_pool.apply_async(
+                parse_in_worker,
+                (text, path, self.pyversion, self.custom_typing_module,
+                 self.lossless))
+
+    def prefetch_imports(self, text: str) -> None:
+        """Start parsing the modules imported by a source file, directly or
+        indirectly.
+
+        The imports are found by scanning tokens, so that the whole import
+        graph can be parsed in parallel without waiting for the importing
+        files to be parsed. Some of the modules may turn out not to be
+        needed (for example, if imported in unreachable code).
+        """
+        pending = [text]
+        while pending:
+            text = pending.pop()
+            ids = ['builtins']
+            for id, line in importscan.scan_imports(
+                    text, self.custom_typing_module):
+                ids.extend(super_packages(id))
+                ids.append(id)
+            for id in ids:
+                if id in self.prefetched or self.has_module(id):
+                    continue
+                path, source = read_module_source_from_file(id,
+                                                            self.lib_path)
+                self.prefetched[id] = (path, source)
+                if source is not None and path not in self.parse_results:
+                    self.submit_parse(path, source)
+                    pending.append(source)
+
+    def read_module(self, id: str) -> Tuple[str, str]:
+        """Find and read the source file of a module.
+
+        Return a pair (path, file contents), or (None, None) if the module
+        could not be found or read (see read_module_source_from_file).
+        """
+        if id in self.prefetched:
+            return self.prefetched.pop(id)
+        return read_module_source_from_file(id, self.lib_path)
+
+    def parsed_tree(self, path: str) -> MypyFile:
+        """Return the tree of a file parsed in parser_pool.
+
+        Return None if the file was not parsed in parallel, or if there were
+        errors. The file should then be parsed in the main process, which
+        also takes care of reporting parse errors.
+        """
+        result = self.parse_results.pop(path, None)
+        if result is None:
+            return None
+        data = result.get()
+        if data is None:
+            return None
+        try:
+            return cache.load_tree(data)
+        except CacheError:
+            return None
 
     def next_available_state(self) -> 'State':
-        """Find a ready state (one that has all its dependencies met)."""
-        i = len(self.states) - 1
-        while i >= 0:
-            if self.states[i].is_ready():
-                num_incomplete = self.states[i].num_incomplete_deps()
-                if num_incomplete == 0:
-                    # This is perfect; no need to look for the best match.
-                    return self.states[i]
-            i -= 1
+        """Find a ready state (one that has all its dependencies met).
+
+        Prefer the most recently added states.
+        """
+        for i in reversed(self.ready_states):
+            if self.states[i].num_incomplete_deps() == 0:
+                # This is perfect; no need to look for the best match.
+                return self.states[i]
         return None
 
+    def add_state(self, state: 'State') -> None:
+        """Add the state of a file that has not been encountered before."""
+        self.state_positions.setdefault(state.path, len(self.states))
+        self.module_positions.setdefault(state.id, len(self.states))
+        self.states.append(state)
+        self.add_dependents(state)
+        self.update_sccs(state)
+        self.update_ready_state(len(self.states) - 1)
+
+    def replace_state(self, state: 'State') -> None:
+        """Replace the state of a file with a new state object.
+
+        The dependencies of the file may have become ready as well.
+        """
+        i = self.state_positions.get(state.path)
+        if i is None:
+            raise RuntimeError('State for {} not found'.format(state.path))
+        old_dependencies = self.states[i].dependencies
+        self.states[i] = state
+        self.add_dependents(state)
+        if not set(old_dependencies) <= set(state.dependencies):
+            # Removing imports may split components.
+            self.module_sccs = None
+        elif state.dependencies != old_dependencies:
+            self.update_sccs(state)
+        self.update_ready_state(i)
+        for id in self.dependents.get(state.id, set()):
+            self.update_ready_state(self.module_positions[id])
+
+    def add_dependents(self, state: 'State') -> None:
+        for dep in state.watched_modules():
+            self.dependents.setdefault(dep, set()).add(state.id)
+
+    def update_sccs(self, state: 'State') -> None:
+        """Update module_sccs after imports to or from a module were added.
+
+        Only the component of the module changes (see update_components),
+        so the components are not computed again for the whole import graph
+        every time a file is parsed.
+        """
+        if self.module_sccs is not None:
+            update_components(self.module_sccs, state.id,
+                              lambda id: self.lookup_state(id).dependencies,
+                              self.importing_modules)
+
+    def importing_modules(self, id: str) -> List[str]:
+        """Return the modules with a state that directly import a module."""
+        return [dependent for dependent in self.dependents.get(id, set())
+                if id in self.lookup_state(dependent).dependencies]
+
+    def update_ready_state(self, i: int) -> None:
+        """Add or remove a state from the ready states as needed."""
+        j = bisect.bisect_left(self.ready_states, i)
+        present = j < len(self.ready_states) and self.ready_states[j] == i
+        if self.states[i].is_ready():
+            if not present:
+                self.ready_states.insert(j, i)
+        elif present:
+            del self.ready_states[j]
+
     def has_module(self, name: str) -> bool:
         """Have we seen a module yet?"""
         return name in self.module_files
@@ -389,10 +901,10 @@ class BuildManager:
 
         This function does not consider any dependencies.
         """
-        for s in self.states:
-            if s.path == path:
-                return s.state()
-        return UNSEEN_STATE
+        i = self.state_positions.get(path)
+        if i is None:
+            return UNSEEN_STATE
+        return self.states[i].state()
 
     def module_state(self, name: str) -> int:
         """Return the state of a module.
@@ -410,38 +922,26 @@ class BuildManager:
             state = fs
         return state
 
-    def is_dep(self, m1: str, m2: str, done: Set[str] = None) -> bool:
-        """Does m1 import m2 directly or indirectly?"""
-        # Have we computed this previously?
-        dep = self.module_deps.get((m1, m2))
-        if dep is not None:
-            return dep
-
-        if not done:
-            done = set([m1])
-
-        # m1 depends on m2 iff one of the deps of m1 depends on m2.
-        st = self.lookup_state(m1)
-        for m in st.dependencies:
-            if m in done:
-                continue
-            done.add(m)
-            # Cache this dependency.
-            self.module_deps[m1, m] = True
-            # Search recursively.
-            if m == m2 or self.is_dep(m, m2, done):
-                # Yes! Mark it in the cache.
-                self.module_deps[m1, m2] = True
-                return True
-        # No dependency. Mark it in the cache.
-        self.module_deps[m1, m2] = False
-        return False
+    def is_cyclic_dep(self, m1: str, m2: str) -> bool:
+        """Do m1 and m2 depend on each other (directly or indirectly)?"""
+        if self.module_sccs is None:
+            graph = Dict[str, List[str]]()
+            for state in self.states:
+                graph[state.id] = state.dependencies
+            self.module_sccs = {}
+            for scc in strongly_connected_components(graph):
+                representative = sorted(scc)[0]
+                for id in scc:
+                    self.module_sccs[id] = representative
+        representative = self.module_sccs.get(m1)
+        return (representative is not None and
+                representative == self.module_sccs.get(m2))
 
     def lookup_state(self, module: str) -> 'State':
-        for state in self.states:
-            if state.id == module:
-                return state
-        raise RuntimeError('%s not found' % str)
+        i = self.module_positions.get(module)
+        if i is None:
+            raise RuntimeError('%s not found' % module)
+        return self.states[i]
 
     def all_imported_modules_in_file(self,
                                      file: MypyFile) -> List[Tuple[str, int]]:
@@ -471,6 +971,374 @@ class BuildManager:
         """Is there a file in the file system corresponding to module id?"""
         return find_module(id, self.lib_path) is not None
 
+    def add_to_package(self, id: str, tree: MypyFile) -> None:
+        """Include module in the symbol table of the enclosing package."""
+        if '.' in id:
+            c = id.split('.')
+            p = '.'.join(c[:-1])
+            sem_anal = self.semantic_analyzer
+            sem_anal.modules[p].names[c[-1]] = SymbolTableNode(
+                MODULE_REF, tree, p)
+
+    def load_cached_modules(self, roots: List[Tuple[str, str, str]]) -> None:
+        """Load up-to-date modules from the incremental build cache.
+
+        Start from the initial modules, given as (module id, path, source)
+        tuples, and follow the dependencies recorded in the cache. Each
+        loaded module is represented by a final state. If the cache turns
+        out to be inconsistent, ignore it.
+
+        Cached modules that are unchanged but depend on changed modules are
+        represented by PendingCachedFile states. They are loaded later if the
+        interfaces of the changed modules turn out to be unchanged.
+        """
+        metas, changed = self.find_cache_metas(roots, self.cache)
+        root_texts = dict((id, text) for id, _, text in roots)
+        graph, fresh_units, pending_units = self.classify_cached_units(
+            metas, changed)
+        try:
+            self.read_cached_units(self.cache, fresh_units)
+        except CacheError as err:
+            self.log('Ignoring cache: {}'.format(err))
+            self.forget_cached_modules()
+            return
+
+        for unit_metas in pending_units:
+            for meta in unit_metas:
+                self.module_files[meta.id] = meta.path
+                info = StateInfo(meta.path, meta.id, meta.import_context, self)
+                self.add_state(PendingCachedFile(info, meta,
+                                                 root_texts.get(meta.id)))
+        # Schedule the changed modules that pending modules depend on. Other
+        # changed modules are imported as usual when they are encountered.
+        for unit_metas in pending_units:
+            for meta in unit_metas:
+                for dep in graph[meta.id]:
+                    if (dep in changed and dep not in root_texts and
+                            not self.has_module(dep)):
+                        dep_meta = metas[dep]
+                        dep_text = read_source(dep_meta.path)
+                        if dep_text is not None:
+                            info = StateInfo(dep_meta.path, dep,
+                                             dep_meta.import_context, self)
+                            self.module_files[dep] = dep_meta.path
+                            self.start_parse(dep_meta.path, dep_text)
+                            self.add_state(UnprocessedFile(info, dep_text))
+
+    def load_snapshot(self) -> None:
+        """Load up-to-date core modules from a snapshot (see create_snapshot).
+
+        The snapshot is looked up in the directory that contains builtins.
+        Modules that have changed since the snapshot was created, and the
+        modules that depend on them, are processed from source as usual.
+        """
+        if self.target not in [SEMANTIC_ANALYSIS, TYPE_CHECK]:
+            return
+        builtins_path = find_module('builtins', self.lib_path)
+        if builtins_path is None:
+            return
+        base_dir = dirname(builtins_path)
+        files = cache.read_snapshot(
+            os.path.join(base_dir, cache.SNAPSHOT_NAME)).get(self.target)
+        if not files:
+            return
+        snapshot = SnapshotCache(files,
+                                 cache_options(self.pyversion, self.target,
+                                               self.custom_typing_module,
+                                               LAZY_STUBS in self.flags),
+                                 base_dir)
+        roots = List[Tuple[str, str, str]]()
+        for id in SNAPSHOT_MODULES:
+            path = find_module(id, self.lib_path)
+            if path is not None:
+                roots.append((id, path, None))
+        metas, changed = self.find_cache_metas(roots, snapshot)
+        _, fresh_units, _ = self.classify_cached_units(metas, changed)
+        try:
+            self.read_cached_units(snapshot, fresh_units)
+        except CacheError as err:
+            self.log('Ignoring snapshot: {}'.format(err))
+            self.forget_cached_modules()
+            return
+        for unit_metas in fresh_units:
+            for meta in unit_metas:
+                self.snapshot_metas[meta.id] = meta
+
+    def classify_cached_units(
+            self, metas: Dict[str, CacheMeta],
+            changed: Set[str]) -> Tuple[Dict[str, List[str]],
+                                        List[List[CacheMeta]],
+                                        List[List[CacheMeta]]]:
+        """Divide cached modules into units that are loaded together.
+
+        Return the import graph of the modules and the fresh and pending
+        units (see load_cached_modules), dependencies first. Add the modules
+        of units that have to be processed again to changed.
+        """
+        graph = Dict[str, List[str]]()
+        for meta in metas.values():
+            graph[meta.id] = [dep for dep, _ in meta.dependencies]
+        fresh_units = List[List[CacheMeta]]()
+        pending_units = List[List[CacheMeta]]()
+        # Modules that will be processed or that depend on such modules
+        dirty = set(changed)
+        # The dependencies of each unit come before the unit itself.
+        for unit in strongly_connected_components(graph):
+            unit_metas = [metas[id] for id in sorted(unit)]
+            deps = set(dep for id in unit for dep in graph[id]) - unit
+            consistent = all(meta.unit == sorted(unit) and
+                             meta.unit_key == unit_metas[0].unit_key
+                             for meta in unit_metas)
+            if (not consistent or unit & changed or
+                    [dep for dep in deps if dep not in metas]):
+                # The unit is processed again as a whole.
+                changed.update(unit)
+            elif deps & dirty:
+                pending_units.append(unit_metas)
+            else:
+                fresh_units.append(unit_metas)
+                continue
+            dirty.update(unit)
+        return graph, fresh_units, pending_units
+
+    def read_cached_units(self, module_cache: ModuleCache,
+                          units: List[List[CacheMeta]]) -> None:
+        """Load units of modules from a cache, dependencies first.
+
+        Units that have already been loaded from a snapshot are skipped.
+        Raise CacheError if a unit could not be loaded.
+        """
+        modules = self.semantic_analyzer.modules
+        for unit_metas in units:
+            if unit_metas[0].id in self.snapshot_metas:
+                continue
+            start = time.time()
+            trees = module_cache.read_unit(unit_metas, modules,
+                                           self.semantic_analyzer.stored_vars)
+            self.add_cached_unit(unit_metas, trees, start)
+
+    def forget_cached_modules(self) -> None:
+        """Forget all modules loaded from a snapshot or a cache."""
+        self.semantic_analyzer.modules.clear()
+        self.semantic_analyzer.stored_vars.clear()
+        self.states = []
+        self.state_positions = {}
+        self.module_positions = {}
+        self.dependents = {}
+        self.ready_states = []
+        self.module_sccs = None
+        self.module_files = {}
+        self.fingerprints = {}
+        self.snapshot_metas = {}
+
+    def find_cache_metas(
+            self, roots: List[Tuple[str, str, str]],
+            module_cache: ModuleCache) -> Tuple[Dict[str, CacheMeta],
+                                                Set[str]]:
+        """Find cached modules, starting from the initial modules.
+
+        Return a map from module name to the metadata of each cached module
+        and the set of modules that have changed since they were cached. A
+        module has changed if its source file has changed, if it has no
+        valid metadata or was not cached because of errors, or if the
+        modules that it imports now refer to different files. The changes
+        of the modules that it depends on are not considered.
+
+        The dependencies recorded for changed modules are followed as well,
+        since most of them are likely to be still imported. Modules loaded
+        from a snapshot are up to date, and so are their dependencies.
+        """
+        metas = Dict[str, CacheMeta]()
+        changed = Set[str]()
+        pending = list(reversed(roots))
+        while pending:
+            id, path, text = pending.pop()
+            if id in metas or id in changed:
+                continue
+            if id in self.snapshot_metas:
+                metas[id] = self.snapshot_metas[id]
+                pending.extend((dep, dep_path, None) for dep, dep_path
+                               in metas[id].dependencies)
+                continue
+            meta = module_cache.read_meta(id)
+            if meta is None or meta.path != path:
+                changed.add(id)
+                continue
+            if text is None:
+                text = read_source(path)
+            if (text is None or cache.hash_source(text) != meta.hash or
+                    not meta.unit_key):
+                changed.add(id)
+            metas[id] = meta
+            for missing in meta.suppressed:
+                if find_module(missing, self.lib_path) is not None:
+                    # A previously missing module has appeared.
+                    changed.add(id)
+            for dep, dep_path in meta.dependencies:
+                if find_module(dep, self.lib_path) != dep_path:
+                    changed.add(id)
+                else:
+                    pending.append((dep, dep_path, None))
+        return metas, changed
+
+    def add_cached_unit(self, metas: List[CacheMeta], trees: List[MypyFile],
+                        start: float) -> None:
+        """Add the modules of a unit read from the cache to the build.
+
+        Start is the time when reading the unit started. The time is divided
+        evenly between the modules of the unit in build statistics.
+        """
+        load_time = (time.time() - start) / len(metas)
+        modules = self.semantic_analyzer.modules
+        for tree in trees:
+            modules[tree.fullname()] = tree
+        for meta in metas:
+            self.add_to_package(meta.id, modules[meta.id])
+            self.module_files[meta.id] = meta.path
+            info = StateInfo(meta.path, meta.id, meta.import_context, self)
+            state = CachedFile(info, modules[meta.id],
+                               [dep for dep, _ in meta.dependencies],
+                               meta.suppressed, meta.fingerprint)
+            if self.state_positions.get(meta.path) is None:
+                self.add_state(state)
+            else:
+                self.replace_state(state)
+            if self.stats:
+                self.stats.add_time(meta.id, meta.path, buildstats.CACHE_LOAD,
+                                    load_time)
+            self.log('Loaded {} from cache'.format(meta.id))
+
+    def load_pending_unit(self, unit: List[str]) -> None:
+        """Load a unit of pending cached modules, or process it again.
+
+        The unit can be loaded from the cache only if the interfaces of all
+        the modules that it depends on are the same as when it was cached.
+        """
+        states = [cast(PendingCachedFile, self.lookup_state(id))
+                  for id in unit]
+        metas = [state.meta for state in states]
+        start = time.time()
+        try:
+            for dep, fingerprint in sorted(metas[0].dep_fingerprints.items()):
+                if (self.module_state(dep) != final_state or
+                        self.module_fingerprint(dep) != fingerprint):
+                    raise CacheError('interface of {} has changed'.format(dep))
+            trees = self.cache.read_unit(metas, self.semantic_analyzer.modules,
+                                         self.semantic_analyzer.stored_vars)
+        except CacheError as err:
+            self.log('Processing {} again: {}'.format(', '.join(unit), err))
+            for state in states:
+                self.process_again(state)
+        else:
+            self.add_cached_unit(metas, trees, start)
+
+    def process_again(self, state: 'PendingCachedFile') -> None:
+        """Process a pending cached module from source."""
+        text = state.program_text
+        if text is None:
+            text = read_program(state.path)
+        self.start_parse(state.path, text)
+        state.switch_state(UnprocessedFile(state.info(), text))
+
+    def module_fingerprint(self, id: str) -> str:
+        """Return the interface fingerprint of a fully processed module."""
+        if id not in self.fingerprints:
+            state = self.lookup_state(id)
+            if isinstance(state, CachedFile):
+                self.fingerprints[id] = state.fingerprint
+            else:
+                self.fingerprints[id] = cache.module_fingerprint(
+                    self.semantic_analyzer.modules[id],
+                    self.semantic_analyzer.stored_vars)
+        return self.fingerprints[id]
+
+    def write_cache(self) -> None:
+        """Store the modules processed in this build in the cache.
+
+        Modules with errors are not cached, and neither are modules that
+        depend on them, so that the errors will be reported again. Only the
+        metadata of these modules is written.
+        """
+        states = Dict[str, State]()
+        graph = Dict[str, List[str]]()
+        for state in self.states:
+            states[state.id] = state
+            graph[state.id] = state.dependencies
+        index = cache.build_node_index(self.semantic_analyzer.modules)
+        # Map from cached module name to the modules that will be available
+        # when loading the module (the module and all its dependencies).
+        visible = Dict[str, Set[str]]()
+        for unit in strongly_connected_components(graph):
+            if [id for id in unit if states[id].state() != final_state]:
+                # The build was interrupted by an error.
+                continue
+            if not [id for id in unit
+                    if not isinstance(states[id], CachedFile)]:
+                # All the modules were loaded from the cache.
+                unit_visible = self.cacheable_unit_visible(unit, states,
+                                                           graph, visible)
+                if unit_visible is not None:
+                    for id in unit:
+                        visible[id] = unit_visible
+                continue
+            metas = List[CacheMeta]()
+            trees = List[MypyFile]()
+            for id in sorted(unit):
+                state = states[id]
+                dependencies = [(dep, self.module_files[dep])
+                                for dep in state.dependencies]
+                metas.append(CacheMeta(id, state.path, self.source_hashes[id],
+                                       dependencies, state.suppressed,
+                                       sorted(unit), '', self.cache.options,
+                                       import_context=state.import_context))
+                trees.append(cast('ParsedFile', state).tree)
+            unit_visible = self.cacheable_unit_visible(unit, states, graph,
+                                                       visible)
+            if unit_visible is not None:
+                key = cache.unit_key(metas)
+                dep_fingerprints = dict(
+                    (dep, self.module_fingerprint(dep))
+                    for dep in unit_visible - unit)
+                for meta in metas:
+                    meta.unit_key = key
+                    meta.fingerprint = self.module_fingerprint(meta.id)
+                    meta.dep_fingerprints = dep_fingerprints
+                try:
+                    self.cache.write_unit(metas, trees, unit_visible, index,
+                                          self.semantic_analyzer.stored_vars)
+                except CacheError as err:
+                    self.log('Could not cache {}: {}'.format(
+                        ', '.join(sorted(unit)), err))
+                else:
+                    for id in unit:
+                        visible[id] = unit_visible
+                    continue
+            # Record the dependencies even if the modules are not cached.
+            for meta in metas:
+                meta.unit_key = ''
+                self.cache.write_meta(meta)
+
+    def cacheable_unit_visible(self, unit: Set[str],
+                               states: Dict[str, 'State'],
+                               graph: Dict[str, List[str]],
+                               visible: Dict[str, Set[str]]) -> Set[str]:
+        """Return the modules available when loading a unit from the cache.
+
+        These include the modules in the unit and all their dependencies.
+        Return None if the unit can't be cached, since there were errors or
+        some dependency could not be cached.
+        """
+        unit_visible = set(unit)
+        for id in unit:
+            if self.errors.is_errors_for_file(states[id].path):
+                return None
+            for dep in graph[id]:
+                if dep not in unit:
+                    if dep not in visible:
+                        return None
+                    unit_visible.update(visible[dep])
+        return unit_visible
+
     def final_passes(self, files: List[MypyFile],
                      types: Dict[Node, Type]) -> None:
         """Perform the code generation passes for type checked files."""
@@ -499,11 +1367,24 @@ class BuildManager:
                 # transformed.
                 continue
             # Transform parse tree and produce pretty-printed output.
+            start = time.time()
             v = transform.DyncheckTransformVisitor(
                 self.type_checker.type_map,
                 self.semantic_analyzer.modules,
                 is_pretty=True)
             f.accept(v)
+            self.record_time(self.lookup_state(f.fullname()),
+                             buildstats.TRANSFORM, start)
+
+    def record_time(self, state: 'State', phase: str, start: float) -> None:
+        """Record the time spent in a phase since start (if profiling)."""
+        if self.stats:
+            self.stats.add_time(state.id, state.path, phase,
+                                time.time() - start)
+
+    def record_count(self, state: 'State', name: str, count: int) -> None:
+        if self.stats:
+            self.stats.set_count(state.id, state.path, name, count)
 
     def log(self, message: str) -> None:
         if VERBOSE in self.flags:
@@ -579,6 +1460,8 @@ class State:
     manager = Undefined(BuildManager)
     # Modules that this file directly depends on (in no particular order).
     dependencies = Undefined(List[str])
+    # Modules that this file imports but that could not be found.
+    suppressed = Undefined(List[str])
 
     def __init__(self, info: StateInfo) -> None:
         self.path = info.path
@@ -586,6 +1469,7 @@ class State:
         self.import_context = info.import_context
         self.manager = info.manager
         self.dependencies = []
+        self.suppressed = []
 
     def info(self) -> StateInfo:
         return StateInfo(self.path, self.id, self.import_context, self.manager)
@@ -593,6 +1477,10 @@ class State:
     def process(self) -> None:
         raise RuntimeError('Not implemented')
 
+    def watched_modules(self) -> List[str]:
+        """Return the modules whose progress may make this state ready."""
+        return self.dependencies
+
     def is_ready(self) -> bool:
         """Return True if all dependencies are at least in the same state
         as this object (but not in the initial state).
@@ -616,11 +1504,7 @@ class State:
 
         Also notify the manager.
         """
-        for i in range(len(self.manager.states)):
-            if self.manager.states[i].path == state_object.path:
-                self.manager.states[i] = state_object
-                return
-        raise RuntimeError('State for {} not found'.format(state_object.path))
+        self.manager.replace_state(state_object)
 
     def errors(self) -> Errors:
         return self.manager.errors
@@ -641,6 +1525,8 @@ class State:
 
 
 class UnprocessedFile(State):
+    program_text = Undefined(str)
+
     def __init__(self, info: StateInfo, program_text: str) -> None:
         super().__init__(info)
         self.program_text = program_text
@@ -656,18 +1542,19 @@ class UnprocessedFile(State):
 
     def process(self) -> None:
         """Parse the file, store global names and advance to the next state."""
+        start = time.time()
         tree = self.parse(self.program_text, self.path)
+        self.manager.record_time(self, buildstats.PARSE, start)
+        if self.manager.stats:
+            self.record_sizes(tree)
+        if self.manager.cache:
+            self.manager.source_hashes[self.id] = cache.hash_source(
+                self.program_text)
 
         # Store the parsed module in the shared module symbol table.
         self.manager.semantic_analyzer.modules[self.id] = tree
 
-        if '.' in self.id:
-            # Include module in the symbol table of the enclosing package.
-            c = self.id.split('.')
-            p = '.'.join(c[:-1])
-            sem_anal = self.manager.semantic_analyzer
-            sem_anal.modules[p].names[c[-1]] = SymbolTableNode(
-                MODULE_REF, tree, p)
+        self.manager.add_to_package(self.id, tree)
 
         if self.id != 'builtins':
             # The builtins module is imported implicitly in every program (it
@@ -679,8 +1566,10 @@ class UnprocessedFile(State):
         # Do the first pass of semantic analysis: add top-level definitions in
         # the file to the symbol table. We must do this before processing imports,
         # since this may mark some import statements as unreachable.
+        start = time.time()
         first = FirstPass(self.semantic_analyzer())
         first.analyze(tree, self.path, self.id)
+        self.manager.record_time(self, buildstats.SEMANAL_PASS1, start)
 
         # Add all directly imported modules to be processed (however they are
         # not processed yet, just waiting to be processed).
@@ -711,28 +1600,59 @@ class UnprocessedFile(State):
             # Do nothing:f already being compiled.
             return True
 
-        path, text = read_module_source_from_file(id, self.manager.lib_path)
+        path, text = self.manager.read_module(id)
         if text is not None:
             info = StateInfo(path, id, self.errors().import_context(),
                              self.manager)
-            self.manager.states.append(UnprocessedFile(info, text))
             self.manager.module_files[id] = path
+            self.manager.start_parse(path, text)
+            self.manager.add_state(UnprocessedFile(info, text))
             return True
         else:
             return False
 
+    def record_sizes(self, tree: MypyFile) -> None:
+        """Record the number of nodes in the file."""
+        self.manager.record_count(self, buildstats.NODES,
+                                  buildstats.count_nodes(tree))
+
+    def record_lexing(self, tokens: lex.TokenStream) -> None:
+        """Record the number of tokens in the file and the time spent in
+        the lexer while parsing it.
+        """
+        if self.manager.stats:
+            self.manager.stats.add_time(self.id, self.path, buildstats.LEX,
+                                        tokens.lex_time)
+            self.manager.record_count(self, buildstats.TOKENS,
+                                      tokens.num_tokens)
+
     def parse(self, source_text: str, fnam: str) -> MypyFile:
         """Parse the source of a file with the given name.
 
-        Raise CompileError if there is a parse error.
+        Use the parse tree cache, if enabled. Raise CompileError if there is
+        a parse error.
         """
-        num_errs = self.errors().num_messages()
-        tree = parse.parse(source_text, fnam, self.errors(),
-                           pyversion=self.manager.pyversion,
-                           custom_typing_module=self.manager.custom_typing_module)
+        parse_cache = self.manager.parse_cache
+        tree = self.manager.parsed_tree(fnam)
+        if tree is None and parse_cache:
+            tree = parse_cache.load(fnam, source_text)
+            if tree is not None:
+                tree.path = fnam
+                tree._fullname = self.id
+                return tree
+        if tree is None:
+            num_errs = self.errors().num_messages()
+            parser = parse.Parser(fnam, self.errors(), self.manager.pyversion,
+                                  self.manager.custom_typing_module,
+                                  self.manager.lossless)
+            tree = parser.parse(source_text)
+            tree.path = fnam
+            if self.errors().num_messages() != num_errs:
+                self.errors().raise_error()
+            self.record_lexing(parser.tok)
+        if parse_cache:
+            parse_cache.store(fnam, source_text, tree)
         tree._fullname = self.id
-        if self.errors().num_messages() != num_errs:
-            self.errors().raise_error()
         return tree
 
     def state(self) -> int:
@@ -746,13 +1666,16 @@ class ParsedFile(State):
         super().__init__(info)
         self.tree = tree
 
-        # Build a list all directly imported moules (dependencies).
-        imp = List[str]()
+        # Build a list all directly imported moules (dependencies). Also
+        # include the surrounding package(s).
+        imp = super_packages(self.id)
         for id, line in self.manager.all_imported_modules_in_file(tree):
             # Omit missing modules, as otherwise we could not type check
             # programs with missing modules.
             if not id in self.manager.missing_modules:
                 imp.append(id)
+            else:
+                self.suppressed.append(id)
         if self.id != 'builtins':
             imp.append('builtins')
 
@@ -766,7 +1689,9 @@ class ParsedFile(State):
 
     def process(self) -> None:
         """Semantically analyze file and advance to the next state."""
+        start = time.time()
         self.semantic_analyzer().visit_file(self.tree, self.tree.path)
+        self.manager.record_time(self, buildstats.SEMANAL_PASS2, start)
         self.switch_state(PartiallySemanticallyAnalyzedFile(self.info(),
                                                             self.tree))
 
@@ -774,14 +1699,15 @@ class ParsedFile(State):
         """Return the number of dependencies that are incomplete.
 
         Here complete means that their state is *later* than this module.
-        Cyclic dependencies are omitted to break cycles forcibly (and somewhat
-        arbitrarily).
+        Dependencies in the same import cycle as this module are omitted, so
+        that all the modules in a cycle are processed together, one pass at
+        a time.
         """
         incomplete = 0
         for module in self.dependencies:
             state = self.manager.module_state(module)
             if (not earlier_state(self.state(), state) and
-                    not self.manager.is_dep(module, self.id)):
+                    not self.manager.is_cyclic_dep(module, self.id)):
                 incomplete += 1
         return incomplete
 
@@ -792,7 +1718,9 @@ class ParsedFile(State):
 class PartiallySemanticallyAnalyzedFile(ParsedFile):
     def process(self) -> None:
         """Perform final pass of semantic analysis and advance state."""
+        start = time.time()
         self.semantic_analyzer_pass3().visit_file(self.tree, self.tree.path)
+        self.manager.record_time(self, buildstats.SEMANAL_PASS3, start)
         if 'dump-type-stats' in self.manager.flags:
             stats.dump_type_stats(self.tree, self.tree.path)
         self.switch_state(SemanticallyAnalyzedFile(self.info(), self.tree))
@@ -805,7 +1733,16 @@ class SemanticallyAnalyzedFile(ParsedFile):
     def process(self) -> None:
         """Type check file and advance to the next state."""
         if self.manager.target >= TYPE_CHECK:
-            self.type_checker().visit_file(self.tree, self.tree.path)
+            start = time.time()
+            num_types = len(self.manager.type_checker.type_map)
+            self.type_checker().visit_file(
+                self.tree, self.tree.path,
+                lazy_stub=(LAZY_STUBS in self.manager.flags and
+                           is_stub(self.path)))
+            self.manager.record_time(self, buildstats.TYPE_CHECK, start)
+            self.manager.record_count(
+                self, buildstats.TYPES,
+                len(self.manager.type_checker.type_map) - num_types)
             if 'dump-infer-stats' in self.manager.flags:
                 stats.dump_type_stats(self.tree, self.tree.path, inferred=True,
                                       typemap=self.manager.type_checker.type_map)
@@ -815,8 +1752,8 @@ class SemanticallyAnalyzedFile(ParsedFile):
                     type_map=self.manager.type_checker.type_map,
                     output_dir=self.manager.html_report_dir)
 
-        # FIX remove from active state list to speed up processing
-
+        # The type checked state is never ready, so the file drops out of
+        # the states considered by BuildManager.next_available_state.
         self.switch_state(TypeCheckedFile(self.info(), self.tree))
 
     def state(self) -> int:
@@ -836,11 +1773,110 @@ class TypeCheckedFile(SemanticallyAnalyzedFile):
         return TYPE_CHECKED_STATE
 
 
+class CachedFile(State):
+    """A module loaded from the incremental build cache.
+
+    The module was fully processed in an earlier build, so this is a final
+    state, similar to TypeCheckedFile.
+    """
+
+    tree = Undefined(MypyFile)
+    # Interface fingerprint recorded in the cache
+    fingerprint = ''
+
+    def __init__(self, info: StateInfo, tree: MypyFile,
+                 dependencies: List[str], suppressed: List[str],
+                 fingerprint: str) -> None:
+        super().__init__(info)
+        self.tree = tree
+        self.dependencies = dependencies
+        self.suppressed = suppressed
+        self.fingerprint = fingerprint
+
+    def process(self) -> None:
+        """Finished, so cannot process."""
+        raise RuntimeError('Cannot process CachedFile')
+
+    def is_ready(self) -> bool:
+        """Finished, so cannot ever become ready."""
+        return False
+
+    def state(self) -> int:
+        return TYPE_CHECKED_STATE
+
+
+class PendingCachedFile(State):
+    """A cached module that depends on modules that have changed.
+
+    The module is loaded from the cache (as a CachedFile) once the modules
+    that it depends on have been processed, if their interfaces have not
+    changed (see mypy.cache.module_fingerprint). Otherwise it is processed
+    from source. All the modules in the cached unit of the module are
+    loaded or processed together.
+    """
+
+    meta = Undefined(CacheMeta)
+    # Source of an initial module of the build (None for other modules)
+    program_text = Undefined(str)
+
+    def __init__(self, info: StateInfo, meta: CacheMeta,
+                 program_text: str = None) -> None:
+        super().__init__(info)
+        self.meta = meta
+        self.program_text = program_text
+        self.dependencies = [dep for dep, _ in meta.dependencies]
+        self.suppressed = meta.suppressed
+
+    def process(self) -> None:
+        self.manager.load_pending_unit(self.meta.unit)
+
+    def watched_modules(self) -> List[str]:
+        return self.dependencies + sorted(self.meta.dep_fingerprints)
+
+    def is_ready(self) -> bool:
+        """Return True if the modules outside the unit that the unit depends
+        on are fully processed.
+
+        Indirect dependencies that have not been encountered are ignored.
+        """
+        for module in self.watched_modules():
+            if module in self.meta.unit:
+                continue
+            if self.manager.has_module(module):
+                if self.manager.module_state(module) != final_state:
+                    return False
+            elif module in self.dependencies:
+                return False
+        return True
+
+    def state(self) -> int:
+        return UNPROCESSED_STATE
+
+
 def trace(s):
     if debug:
         print(s)
 
 
+def parse_in_worker(source_text: str, fnam: str, pyversion: int,
+                    custom_typing_module: str, lossless: bool) -> bytes:
+    """Parse a file in a parser process and return the serialized tree.
+
+    Return None if there were parse errors or if the tree could not be
+    serialized.
+    """
+    errors = Errors()
+    tree = parse.parse(source_text, fnam, errors, pyversion=pyversion,
+                       custom_typing_module=custom_typing_module,
+                       lossless=lossless)
+    if errors.is_errors():
+        return None
+    try:
+        return cache.dump_tree(tree)
+    except CacheError:
+        return None
+
+
 def read_module_source_from_file(id: str,
                                  lib_path: List[str]) -> Tuple[str, str]:
     """Find and read the source file of a module.
@@ -854,31 +1890,85 @@ def read_module_source_from_file(id: str,
     """
     path = find_module(id, lib_path)
     if path is not None:
-        text = ''
-        try:
-            f = open(path)
-            try:
-                text = f.read()
-            finally:
-                f.close()
-        except IOError:
+        text = read_source(path)
+        if text is None:
             return None, None
         return path, text
     else:
         return None, None
 
 
+def read_source(path: str) -> str:
+    """Return the contents of a source file, or None if it can't be read."""
+    try:
+        f = open(path)
+        try:
+            return f.read()
+        finally:
+            f.close()
+    except IOError:
+        return None
+
+
+# Cache of find_module results (including modules that were not found),
+# keyed by (module id, tuple of library path entries)
+find_module_cache = Dict[Any, str]()
+
+# Cache of directory listings used by find_module. The value is None if the
+# directory doesn't exist.
+find_module_listdir_cache = Dict[str, Set[str]]()
+
+
+def find_module_clear_caches() -> None:
+    """Forget cached module lookups (e.g. after files have been added)."""
+    find_module_cache.clear()
+    find_module_listdir_cache.clear()
+
+
+def list_dir(path: str) -> Set[str]:
+    """Return the names in a directory, or None if it can't be listed.
+
+    The results are cached.
+    """
+    if path not in find_module_listdir_cache:
+        try:
+            names = set(os.listdir(path or os.curdir))
+        except OSError:
+            names = None
+        find_module_listdir_cache[path] = names
+    return find_module_listdir_cache[path]
+
+
+def is_file(path: str) -> bool:
+    """Does a file exist?
+
+    Use cached directory listings so that a missing file doesn't cost a
+    stat call.
+    """
+    dir, name = os.path.split(path)
+    names = list_dir(dir)
+    return names is not None and name in names and os.path.isfile(path)
+
+
 def find_module(id: str, lib_path: List[str]) -> str:
-    """Return the path of the module source file, or None if not found."""
+    """Return the path of the module source file, or None if not found.
+
+    The results are cached until find_module_clear_caches is called.
+    """
+    key = (id, tuple(lib_path))
+    if key in find_module_cache:
+        return find_module_cache[key]
+    result = None  # type: str
+    comp = id.split('.')
     for pathitem in lib_path:
-        comp = id.split('.')
         path = os.path.join(pathitem, os.sep.join(comp[:-1]), comp[-1] + '.py')
-        text = ''
-        if not os.path.isfile(path):
+        if not is_file(path):
             path = os.path.join(pathitem, os.sep.join(comp), '__init__.py')
-        if os.path.isfile(path) and verify_module(id, path):
-            return path
-    return None
+        if is_file(path) and verify_module(id, path):
+            result = path
+            break
+    find_module_cache[key] = result
+    return result
 
 
 def verify_module(id: str, path: str) -> bool:
@@ -887,7 +1977,7 @@ def verify_module(id: str, path: str) -> bool:
         path = dirname(path)
     for i in range(id.count('.')):
         path = dirname(path)
-        if not os.path.isfile(os.path.join(path, '__init__.py')):
+        if not is_file(os.path.join(path, '__init__.py')):
             return False
     return True
 
@@ -901,6 +1991,103 @@ def super_packages(id: str) -> List[str]:
     return res
 
 
+def strongly_connected_components(
+        graph: Dict[str, List[str]]) -> List[Set[str]]:
+    """Find the strongly connected components of a directed graph.
+
+    The graph maps each vertex to its successors; successors that are not
+    vertices of the graph are ignored. Return the components so that each
+    component comes after all the components reachable from it (for an
+    import graph, dependencies come first).
+
+    This is an iterative version of Tarjan's algorithm.
+    """
+    index = Dict[str, int]()
+    lowlink = Dict[str, int]()
+    stack = List[str]()
+    on_stack = Set[str]()
+    components = List[Set[str]]()
+    for root in sorted(graph):
+        if root in index:
+            continue
+        # Simulate recursion using a stack of (vertex, next successor index)
+        # tuples.
+        work = [(root, 0)]
+        while work:
+            v, i = work.pop()
+            if i == 0:
+                index[v] = lowlink[v] = len(index)
+                stack.append(v)
+                on_stack.add(v)
+            successors = graph[v]
+            recurse = False
+            while i < len(successors):
+                w = successors[i]
+                i += 1
+                if w not in graph:
+                    continue
+                if w not in index:
+                    work.append((v, i))
+                    work.append((w, 0))
+                    recurse = True
+                    break
+                elif w in on_stack:
+                    lowlink[v] = min(lowlink[v], index[w])
+            if recurse:
+                continue
+            if lowlink[v] == index[v]:
+                component = Set[str]()
+                while True:
+                    w = stack.pop()
+                    on_stack.remove(w)
+                    component.add(w)
+                    if w == v:
+                        break
+                components.append(component)
+            if work:
+                parent = work[-1][0]
+                lowlink[parent] = min(lowlink[parent], lowlink[v])
+    return components
+
+
+def update_components(components: Dict[str, str], v: str,
+                      successors: Function[[str], List[str]],
+                      predecessors: Function[[str], List[str]]) -> None:
+    """Update strongly connected components after edges were added.
+
+    The components map each vertex to a representative vertex of its
+    component. All the added edges must start or end at vertex v, which
+    may also be a new vertex.
+
+    Adding edges only merges components, and any new cycle passes through
+    v, so the new component of v consists of the vertices that both reach v
+    and are reachable from v; other components don't change. Only the
+    vertices that reach v are visited.
+    """
+    if not successors(v):
+        components[v] = v
+        return
+    # Find the vertices that reach v.
+    reaching = {v}
+    work = [v]
+    while work:
+        for w in predecessors(work.pop()):
+            if w not in reaching:
+                reaching.add(w)
+                work.append(w)
+    # Of those, find the ones reachable from v; a path from v to a vertex
+    # that reaches v only goes through vertices that reach v.
+    component = {v}
+    work = [v]
+    while work:
+        for w in successors(work.pop()):
+            if w in reaching and w not in component:
+                component.add(w)
+                work.append(w)
+    for w in component:
+        components[w] = v
+
+
 def make_parent_dirs(path: str) -> None:
     parent = os.path.dirname(path)
     try:
@@ -0,0 +1,183 @@
+"""Per-module timing and size statistics of builds (see build.PROFILE).
+
+The build records the time spent in each phase of processing each module,
+and the sizes of the modules (tokens, parse tree nodes and inferred types).
+The numbers of hits and misses of the caches used by the type checker are
+also recorded. The statistics can be reported as a table sorted by time or
+as JSON.
+"""
+
+import json
+
+from typing import Any, Dict, List, Tuple
+
+from mypy.nodes import MypyFile, Node
+from mypy.traverser import TraverserVisitor
+from mypy.visitor import NodeVisitor
+
+
+# Build phases, in the order they are performed
+LEX = 'lex'              # Tokenizing (part of parse; see TOKENS)
+PARSE = 'parse'
+SEMANAL_PASS1 = 'semanal1'
+SEMANAL_PASS2 = 'semanal2'
+SEMANAL_PASS3 = 'semanal3'
+TYPE_CHECK = 'typecheck'
+TRANSFORM = 'transform'
+CACHE_LOAD = 'cache'     # Loading from the incremental build cache
+
+phases = [LEX, PARSE, SEMANAL_PASS1, SEMANAL_PASS2, SEMANAL_PASS3,
+          TYPE_CHECK, TRANSFORM, CACHE_LOAD]
+
+# Counts
+TOKENS = 'tokens'        # Only for files parsed in the main process
+NODES = 'nodes'
+TYPES = 'types'          # Types inferred by the type checker
+
+counts = [TOKENS, NODES, TYPES]
+
+
+class ModuleStats:
+    """Statistics of a single module."""
+
+    def __init__(self, id: str, path: str) -> None:
+        self.id = id
+        self.path = path
+        # Map from phase to the time spent in it (in seconds)
+        self.times = Dict[str, float]()
+        # Map from count name to the count
+        self.counts = Dict[str, int]()
+
+    def total_time(self) -> float:
+        """Return the time spent on the module.
+
+        Lexing is excluded, since it is also included in parsing.
+        """
+        return sum(t for phase, t in self.times.items() if phase != LEX)
+
+
+class BuildStats:
+    """Statistics of all the modules processed in a build."""
+
+    def __init__(self) -> None:
+        self.modules = Dict[str, ModuleStats]()
+        # Map from cache name to (hits, misses)
+        self.caches = Dict[str, Tuple[int, int]]()
+
+    def module(self, id: str, path: str) -> ModuleStats:
+        if id not in self.modules:
+            self.modules[id] = ModuleStats(id, path)
+        return self.modules[id]
+
+    def add_time(self, id: str, path: str, phase: str,
+                 seconds: float) -> None:
+        times = self.module(id, path).times
+        times[phase] = times.get(phase, 0.0) + seconds
+
+    def set_count(self, id: str, path: str, name: str, count: int) -> None:
+        self.module(id, path).counts[name] = count
+
+    def set_cache_counts(self, name: str, hits: int, misses: int) -> None:
+        self.caches[name] = (hits, misses)
+
+    def sorted_modules(self) -> List[ModuleStats]:
+        """Return the module statistics, the slowest modules first."""
+        return sorted(self.modules.values(),
+                      key=lambda m: (-m.total_time(), m.id))
+
+    def totals(self) -> ModuleStats:
+        """Return the sums of the times and counts of all modules."""
+        total = ModuleStats('total', None)
+        for m in self.modules.values():
+            for phase, t in m.times.items():
+                total.times[phase] = total.times.get(phase, 0.0) + t
+            for name, n in m.counts.items():
+                total.counts[name] = total.counts.get(name, 0) + n
+        return total
+
+    def format_table(self) -> List[str]:
+        """Format the statistics as a table sorted by time (in ms)."""
+        rows = [['module', 'total'] + phases + counts]
+        for m in self.sorted_modules() + [self.totals()]:
+            row = [m.id, '{:.1f}'.format(m.total_time() * 1000)]
+            for phase in phases:
+                if phase in m.times:
+                    row.append('{:.1f}'.format(m.times[phase] * 1000))
+                else:
+                    row.append('-')
+            for name in counts:
+                row.append(str(m.counts[name]) if name in m.counts else '-')
+            rows.append(row)
+        widths = [max(len(row[i]) for row in rows)
+                  for i in range(len(rows[0]))]
+        lines = List[str]()
+        for row in rows:
+            cells = [row[0].ljust(widths[0])]
+            cells += [cell.rjust(width)
+                      for cell, width in zip(row[1:], widths[1:])]
+            lines.append('  '.join(cells).rstrip())
+        for name in sorted(self.caches):
+            hits, misses = self.caches[name]
+            lines.append('{} cache: {} hits, {} misses ({})'.format(
+                name, hits, misses, format_hit_rate(hits, misses)))
+        return lines
+
+    def format_json(self) -> str:
+        """Format the statistics as JSON (times in seconds)."""
+        modules = List[Dict[str, Any]]()
+        for m in self.sorted_modules():
+            modules.append({'module': m.id,
+                            'path': m.path,
+                            'total': m.total_time(),
+                            'times': m.times,
+                            'counts': m.counts})
+        totals = self.totals()
+        caches = Dict[str, Dict[str, int]]()
+        for name, counts in self.caches.items():
+            caches[name] = {'hits': counts[0], 'misses': counts[1]}
+        return json.dumps({'modules': modules,
+                           'total': {'total': totals.total_time(),
+                                     'times': totals.times,
+                                     'counts': totals.counts},
+                           'caches': caches},
+                          indent=2, sort_keys=True)
+
+
+def format_hit_rate(hits: int, misses: int) -> str:
+    if hits + misses == 0:
+        return 'unused'
+    return '{:.1f}% hit rate'.format(hits * 100.0 / (hits + misses))
+
+
+def count_nodes(tree: MypyFile) -> int:
+    """Return the number of nodes in a parse tree."""
+    counter = NodeCounter()
+    tree.accept(counter)
+    return counter.count
+
+
+class NodeCounter(TraverserVisitor):
+    """Count the nodes reached by a TraverserVisitor.
+
+    Each visit method is wrapped so that it increments the count (see
+    below).
+    """
+
+    count = 0
+
+    def __init__(self) -> None:
+        self.count = 0
+
+
+def counting_visit_method(name: str) -> Any:
+    method = getattr(TraverserVisitor, name)
+
+    def visit(self: NodeCounter, node: Node) -> Any:
+        self.count += 1
+        return method(self, node)
+    return visit
+
+
+for name in dir(NodeVisitor):
+    if name.startswith('visit_'):
+        setattr(NodeCounter, name, counting_visit_method(name))
@@ -0,0 +1,655 @@
+"""Persistent cache of analyzed modules for incremental builds.
+
+An incremental build (build flag INCREMENTAL) stores the semantically
+analyzed and type checked parse tree of each module in a cache directory.
+A later build loads a module from the cache instead of parsing, analyzing
+and type checking it again if neither the source file of the module nor
+the source file of any module it depends on (directly or indirectly) has
+changed.
+
+There are two kinds of cache files:
+
+ * Each module has a metadata file <id>.meta.json that records the hash of
+   the source file, the dependencies of the module and the name of the data
+   file that contains the module. Modules that could not be cached (because
+   of errors, for example) only have a metadata file, so that their cached
+   dependencies can still be found.
+
+ * Modules that depend on each other via an import cycle refer freely to
+   each other's definitions, so they are serialized together as a single
+   unit into a data file <id>.data (named after the first module of the
+   unit). References from a unit to definitions in other modules are stored
+   by name and resolved against already loaded modules when loading the
+   unit. Thus the dependencies of a unit must be loaded before the unit.
+
+Independently of incremental builds, parse trees can be cached (build flag
+PARSE_CACHE; see ParseTreeCache). A parse tree only depends on the source
+text and parser options. The tree of each source file is stored under a
+name derived from the hash of the file path (trees/<hash>.tree), together
+with the hash of the source text and options that it was parsed from, so
+only the latest tree of each file is kept.
+
+The core library modules (builtins and typing) can also be loaded from a
+snapshot that is created once and stored together with the library stubs
+(see SnapshotCache and build.create_snapshot). A snapshot contains the cache
+files of the modules for each build target, and it is validated against the
+source files in the same way as the incremental build cache.
+"""
+
+import copyreg
+import gc
+import hashlib
+import io
+import json
+import os
+import os.path
+import pickle
+
+from typing import Undefined, Any, Dict, List, Tuple, Set, cast
+
+from mypy.nodes import (
+    MypyFile, Node, SymbolNode, SymbolTableNode, TypeInfo, Decorator,
+    OverloadedFuncDef, FuncItem, FuncDef, Var, TypeVarExpr, MODULE_REF
+)
+from mypy.types import Type
+
+
+# Increment this whenever the format of the cache files or the representation
+# of serialized nodes changes.
+CACHE_VERSION = 5
+
+# Name of the snapshot file of core modules, in the directory of builtins
+SNAPSHOT_NAME = 'core.snapshot'
+
+# Objects defined in these modules (node and type representations) are only
+# needed for reproducing the original source code. They are not cached.
+repr_modules = set(['mypy.noderepr', 'mypy.typerepr'])
+
+
+class CacheError(Exception):
+    """Raised if a module cannot be stored to or loaded from the cache."""
+
+
+class CacheMeta:
+    """Metadata of a cached module (the contents of a metadata file)."""
+
+    id = ''
+    path = ''
+    # Hash of the source file contents
+    hash = ''
+    # Directly imported modules as (module id, path) tuples
+    dependencies = Undefined(List[Tuple[str, str]])
+    # Directly imported modules that could not be found
+    suppressed = Undefined(List[str])
+    # All the modules that were serialized together with this module
+    unit = Undefined(List[str])
+    # Hash of the unit; it identifies the contents of the data file
+    unit_key = ''
+    # Build options that affect the results of analysis
+    options = Undefined(List[Any])
+    # Fingerprint of the interface of the module (see module_fingerprint)
+    fingerprint = ''
+    # Fingerprints of all the modules the unit depends on (directly or
+    # indirectly) at the time the unit was cached
+    dep_fingerprints = Undefined(Dict[str, str])
+    # The import trail that caused the module to be imported, as (path, line)
+    # tuples
+    import_context = Undefined(List[Tuple[str, int]])
+
+    def __init__(self, id: str, path: str, hash: str,
+                 dependencies: List[Tuple[str, str]], suppressed: List[str],
+                 unit: List[str], unit_key: str, options: List[Any],
+                 fingerprint: str = '',
+                 dep_fingerprints: Dict[str, str] = None,
+                 import_context: List[Tuple[str, int]] = None) -> None:
+        self.id = id
+        self.path = path
+        self.hash = hash
+        self.dependencies = dependencies
+        self.suppressed = suppressed
+        self.unit = unit
+        self.unit_key = unit_key
+        self.options = options
+        self.fingerprint = fingerprint
+        self.dep_fingerprints = dep_fingerprints or {}
+        self.import_context = import_context or []
+
+
+class ModuleCache:
+    """Reader and writer of the cache files in a cache directory."""
+
+    def __init__(self, cache_dir: str, options: List[Any]) -> None:
+        self.cache_dir = cache_dir
+        self.options = [CACHE_VERSION] + options
+
+    def meta_name(self, id: str) -> str:
+        return id + '.meta.json'
+
+    def data_name(self, unit: List[str]) -> str:
+        return min(unit) + '.data'
+
+    def read_file(self, name: str) -> bytes:
+        """Return the contents of a cache file; raise IOError on failure."""
+        with open(os.path.join(self.cache_dir, name), 'rb') as f:
+            return f.read()
+
+    def write_file(self, name: str, data: bytes) -> None:
+        path = os.path.join(self.cache_dir, name)
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        with open(path, 'wb') as f:
+            f.write(data)
+
+    def has_file(self, name: str) -> bool:
+        return os.path.isfile(os.path.join(self.cache_dir, name))
+
+    def read_meta(self, id: str) -> CacheMeta:
+        """Read the metadata of a module.
+
+        Return None if there is no valid metadata for the module (for example,
+        if it was generated using different build options).
+        """
+        try:
+            m = json.loads(self.read_file(self.meta_name(id)).decode('utf-8'))
+        except (IOError, ValueError):
+            return None
+        if m.get('options') != self.options or m.get('id') != id:
+            return None
+        return CacheMeta(id, m['path'], m['hash'],
+                         [(dep, path) for dep, path in m['dependencies']],
+                         m['suppressed'], m['unit'], m['unit_key'],
+                         m['options'], m['fingerprint'],
+                         m['dep_fingerprints'],
+                         [(path, line) for path, line in m['import_context']])
+
+    def write_unit(self, metas: List[CacheMeta], trees: List[MypyFile],
+                   visible: Set[str],
+                   index: Dict[int, Tuple[str, str, Any]],
+                   type_aliases: Dict[Node, Type]) -> None:
+        """Write the cache files of a unit of modules.
+
+        The modules in the unit may refer to definitions in the modules in
+        visible (these will be loaded before the unit). Index maps node
+        object ids to node references (see build_node_index).
+
+        Raise CacheError if the unit cannot be serialized.
+        """
+        unit = [meta.id for meta in metas]
+        removed = strip_submodule_references(trees, unit)
+        try:
+            aliases = [(var, typ) for var, typ in type_aliases.items()
+                       if id(var) in index and index[id(var)][0] in unit]
+            buf = io.BytesIO()
+            pickler = UnitPickler(buf, unit, visible, index)
+            pickler.dump((metas[0].unit_key, trees, aliases))
+        except (pickle.PicklingError, RuntimeError) as err:
+            # RuntimeError is raised if the tree is nested too deeply.
+            raise CacheError(str(err))
+        finally:
+            for names, name, node in removed:
+                names[name] = node
+        # Write the data file before the metadata files, so that an
+        # interrupted write is detected as a unit key mismatch.
+        self.write_file(self.data_name(unit), buf.getvalue())
+        for meta in metas:
+            self.write_meta(meta)
+
+    def write_meta(self, meta: CacheMeta) -> None:
+        """Write the metadata file of a module.
+
+        An empty unit key means that the module itself is not cached; only
+        its dependencies are recorded.
+        """
+        data = json.dumps({'id': meta.id,
+                           'path': meta.path,
+                           'hash': meta.hash,
+                           'dependencies': meta.dependencies,
+                           'suppressed': meta.suppressed,
+                           'unit': meta.unit,
+                           'unit_key': meta.unit_key,
+                           'options': self.options,
+                           'fingerprint': meta.fingerprint,
+                           'dep_fingerprints': meta.dep_fingerprints,
+                           'import_context': meta.import_context})
+        self.write_file(self.meta_name(meta.id), data.encode('utf-8'))
+
+    def read_unit(self, metas: List[CacheMeta], modules: Dict[str, MypyFile],
+                  type_aliases: Dict[Node, Type]) -> List[MypyFile]:
+        """Read the trees of a unit of modules from a data file.
+
+        All the dependencies of the unit must already be included in modules.
+        Add any type aliases defined in the unit to type_aliases.
+
+        Raise CacheError if the data file is missing or out of date.
+        """
+        name = self.data_name(metas[0].unit)
+        try:
+            unpickler = UnitUnpickler(io.BytesIO(self.read_file(name)),
+                                      modules)
+            key, trees, aliases = load_without_gc(unpickler)
+        except (IOError, EOFError, ValueError, KeyError, AttributeError,
+                IndexError, pickle.UnpicklingError, RuntimeError) as err:
+            raise CacheError('could not load {}: {}'.format(metas[0].id, err))
+        if key != metas[0].unit_key:
+            raise CacheError('{} is out of date'.format(name))
+        for var, typ in aliases:
+            type_aliases[var] = typ
+        return trees
+
+
+class MemoryModuleCache(ModuleCache):
+    """Module cache that keeps the cache files in a dictionary.
+
+    This is used by a build server (see mypy.daemon) to avoid file system
+    access. The serialized form is still used, since loading a module
+    creates fresh objects that earlier builds can't have modified.
+    """
+
+    def __init__(self, files: Dict[str, bytes], options: List[Any]) -> None:
+        super().__init__(None, options)
+        self.files = files
+
+    def read_file(self, name: str) -> bytes:
+        if name not in self.files:
+            raise IOError('{} is not cached'.format(name))
+        return self.files[name]
+
+    def write_file(self, name: str, data: bytes) -> None:
+        self.files[name] = data
+
+    def has_file(self, name: str) -> bool:
+        return name in self.files
+
+
+class ParseTreeCache:
+    """Cache of parse trees, keyed by the path of the source file.
+
+    Each cache file holds the tree of the latest version of a source file,
+    preceded by a line with the key of the source text and options (see
+    source_key); a tree is only used if the key matches. Storing a tree
+    replaces the earlier tree of the file, so the cache doesn't grow when
+    files change.
+
+    The trees are stored before semantic analysis, as serialized by
+    dump_tree. The cache files are read and written using a ModuleCache.
+    """
+
+    def __init__(self, files: ModuleCache, options: List[Any]) -> None:
+        self.files = files
+        self.options = [CACHE_VERSION] + options
+
+    def tree_name(self, path: str) -> str:
+        key = hash_source(os.path.abspath(path))
+        return os.path.join('trees', key + '.tree')
+
+    def source_key(self, source_text: str) -> bytes:
+        key = hash_source(json.dumps(self.options) + '\n' + source_text)
+        return key.encode('ascii')
+
+    def read_tree_data(self, path: str, source_text: str) -> bytes:
+        """Return the serialized cached tree of a source file.
+
+        Raise IOError if the tree isn't cached or is for a different source
+        text.
+        """
+        data = self.files.read_file(self.tree_name(path))
+        key, _, tree_data = data.partition(b'\n')
+        if key != self.source_key(source_text):
+            raise IOError('{} has changed since it was cached'.format(path))
+        return tree_data
+
+    def contains(self, path: str, source_text: str) -> bool:
+        try:
+            self.read_tree_data(path, source_text)
+        except IOError:
+            return False
+        return True
+
+    def load(self, path: str, source_text: str) -> MypyFile:
+        """Return the cached tree of a source file (None if not cached)."""
+        try:
+            return load_tree(self.read_tree_data(path, source_text))
+        except (IOError, CacheError):
+            return None
+
+    def store(self, path: str, source_text: str, tree: MypyFile) -> None:
+        """Store the tree of a source file, replacing any earlier tree.
+
+        The tree must not have been semantically analyzed. Trees that cannot
+        be serialized or written are silently not cached.
+        """
+        try:
+            self.files.write_file(self.tree_name(path),
+                                  self.source_key(source_text) + b'\n' +
+                                  dump_tree(tree))
+        except (IOError, CacheError):
+            pass
+
+
+class SnapshotCache(MemoryModuleCache):
+    """Module cache backed by the cache files of a snapshot.
+
+    The snapshot is stored in the library stub directory that the modules
+    were found in (base_dir). Paths of the modules are stored relative to
+    it, so that the snapshot stays valid if the stubs are installed
+    elsewhere.
+    """
+
+    def __init__(self, files: Dict[str, bytes], options: List[Any],
+                 base_dir: str) -> None:
+        super().__init__(files, options)
+        self.base_dir = base_dir
+
+    def read_meta(self, id: str) -> CacheMeta:
+        meta = super().read_meta(id)
+        if meta is not None:
+            meta.path = os.path.join(self.base_dir, meta.path)
+            meta.dependencies = [(dep, os.path.join(self.base_dir, path))
+                                 for dep, path in meta.dependencies]
+        return meta
+
+    def write_meta(self, meta: CacheMeta) -> None:
+        dependencies = [(dep, self.relative_path(path))
+                        for dep, path in meta.dependencies]
+        super().write_meta(CacheMeta(meta.id, self.relative_path(meta.path),
+                                     meta.hash, dependencies, meta.suppressed,
+                                     meta.unit, meta.unit_key, meta.options,
+                                     meta.fingerprint, meta.dep_fingerprints,
+                                     meta.import_context))
+
+    def relative_path(self, path: str) -> str:
+        """Return a path relative to base_dir, if it is under it."""
+        rel = os.path.relpath(path, self.base_dir or os.curdir)
+        if rel.startswith(os.pardir):
+            return os.path.abspath(path)
+        return rel
+
+
+def read_snapshot(path: str) -> Dict[int, Dict[str, bytes]]:
+    """Read a snapshot file.
+
+    Return a map from build target to the cache files of the target, or an
+    empty map if there is no valid snapshot.
+    """
+    try:
+        with open(path, 'rb') as f:
+            version, targets = pickle.load(f)
+    except (IOError, EOFError, ValueError, TypeError,
+            pickle.UnpicklingError):
+        return {}
+    if version != CACHE_VERSION:
+        return {}
+    return targets
+
+
+def write_snapshot(path: str, targets: Dict[int, Dict[str, bytes]]) -> None:
+    with open(path, 'wb') as f:
+        pickle.dump((CACHE_VERSION, targets), f)
+
+
+def reduce_undefined(obj: Any) -> str:
+    # Pickle typing.Undefined by name, so that it is still the same object
+    # after unpickling.
+    return 'Undefined'
+
+
+def reduce_type_info(info: Any) -> Any:
+    # Leave out the supertype mappings and cached member lookups, since they
+    # depend on base classes that may be defined in other units (and may
+    # change).
+    state = info.__dict__.copy()
+    state['supertype_map'] = {}
+    state['member_cache'] = {}
+    state['member_cache_version'] = -1
+    return copyreg.__newobj__, (TypeInfo,), state
+
+
+tree_dispatch_table = copyreg.dispatch_table.copy()
+tree_dispatch_table[type(Undefined)] = reduce_undefined
+tree_dispatch_table[TypeInfo] = reduce_type_info
+
+
+class TreePickler(pickle.Pickler):
+    """Pickler for parse trees.
+
+    This doesn't override persistent_id, since that would slow down
+    pickling considerably.
+    """
+
+    def __init__(self, file: Any) -> None:
+        super().__init__(file, pickle.HIGHEST_PROTOCOL)
+        self.dispatch_table = tree_dispatch_table
+
+
+class UnitPickler(TreePickler):
+    """Pickler that stores references to nodes outside a unit by name."""
+
+    def __init__(self, file: Any, unit: List[str], visible: Set[str],
+                 index: Dict[int, Tuple[str, str, Any]]) -> None:
+        super().__init__(file)
+        self.unit = set(unit)
+        self.visible = visible
+        self.index = index
+
+    def persistent_id(self, obj: Any) -> Any:
+        if type(obj).__module__ in repr_modules:
+            return ('repr',)
+        if isinstance(obj, MypyFile):
+            if obj.fullname() in self.unit:
+                return None
+            return self.reference(obj.fullname(), ('module', obj.fullname()))
+        ref = self.index.get(id(obj))
+        if ref is not None and ref[0] not in self.unit:
+            return self.reference(ref[0], ('node',) + ref)
+        return None
+
+    def reference(self, module: str, ref: Any) -> Any:
+        if module not in self.visible:
+            raise pickle.PicklingError(
+                'reference to {} which is not a dependency'.format(module))
+        return ref
+
+
+class UnitUnpickler(pickle.Unpickler):
+    """Unpickler that resolves references created by UnitPickler."""
+
+    def __init__(self, file: Any, modules: Dict[str, MypyFile]) -> None:
+        super().__init__(file)
+        self.modules = modules
+
+    def persistent_load(self, pid: Any) -> Any:
+        kind = pid[0]
+        if kind == 'repr':
+            return None
+        elif kind == 'module':
+            return self.modules[pid[1]]
+        else:
+            module, name, attrs = pid[1:]
+            node = self.modules[module]  # type: Any
+            for part in name.split('.'):
+                node = node.names[part].node
+            for attr in attrs:
+                if isinstance(attr, int):
+                    node = node[attr]
+                else:
+                    node = getattr(node, attr)
+            return node
+
+
+def dump_tree(tree: MypyFile) -> bytes:
+    """Serialize a parse tree that has not been semantically analyzed.
+
+    Unlike cached units, the tree includes node representations. Raise
+    CacheError if the tree cannot be serialized.
+    """
+    buf = io.BytesIO()
+    try:
+        TreePickler(buf).dump(tree)
+    except (pickle.PicklingError, RuntimeError) as err:
+        # RuntimeError is raised if the tree is nested too deeply.
+        raise CacheError(str(err))
+    return buf.getvalue()
+
+
+def load_tree(data: bytes) -> MypyFile:
+    """Deserialize a parse tree serialized using dump_tree."""
+    try:
+        return cast(MypyFile,
+                    load_without_gc(pickle.Unpickler(io.BytesIO(data))))
+    except (EOFError, ValueError, KeyError, AttributeError, IndexError,
+            pickle.UnpicklingError, RuntimeError) as err:
+        raise CacheError('could not load tree: {}'.format(err))
+
+
+def load_without_gc(unpickler: pickle.Unpickler) -> Any:
+    """Unpickle an object with the garbage collector disabled.
+
+    Unpickling a tree creates lots of objects but no garbage, so the
+    collections that would otherwise be triggered are wasted time.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return unpickler.load()
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def build_node_index(
+        modules: Dict[str, MypyFile]) -> Dict[int, Tuple[str, str, Any]]:
+    """Map definitions that can be referenced from other modules to names.
+
+    Return a dictionary from the object id of a node to a tuple (module id,
+    dotted name within the module, attributes to follow) that can be used to
+    look up the node.
+    """
+    index = Dict[int, Tuple[str, str, Any]]()
+    for module_id in sorted(modules):
+        for name, symnode in modules[module_id].names.items():
+            node = symnode.node
+            # Only index the names that are defined in the module (instead of
+            # being imported from another module).
+            if (symnode.kind != MODULE_REF and isinstance(node, SymbolNode)
+                    and node.fullname() == module_id + '.' + name):
+                index_node(index, node, module_id, name, ())
+    return index
+
+
+def index_node(index: Dict[int, Tuple[str, str, Any]],
+               node: Node, module_id: str, name: str,
+               attrs: Any) -> None:
+    if id(node) in index:
+        return
+    index[id(node)] = (module_id, name, attrs)
+    if isinstance(node, Decorator):
+        index_node(index, node.func, module_id, name, attrs + ('func',))
+        index_node(index, node.var, module_id, name, attrs + ('var',))
+    elif isinstance(node, OverloadedFuncDef):
+        for i, item in enumerate(node.items):
+            index_node(index, item, module_id, name, attrs + ('items', i))
+    elif isinstance(node, TypeInfo):
+        for member, symnode in node.names.items():
+            if symnode.node is not None:
+                index_node(index, symnode.node, module_id,
+                           name + '.' + member, ())
+
+
+def strip_submodule_references(
+        trees: List[MypyFile],
+        unit: List[str]) -> List[Tuple[Dict[str, Any], str, Any]]:
+    """Remove references to submodules outside unit from module symbol tables.
+
+    The build adds each module to the symbol table of the enclosing package,
+    but submodules are loaded after the package. Return the removed entries
+    as (symbol table, name, entry) tuples.
+    """
+    removed = List[Tuple[Dict[str, Any], str, Any]]()
+    for tree in trees:
+        for name, symnode in list(tree.names.items()):
+            sub_id = tree.fullname() + '.' + name
+            if (symnode.kind == MODULE_REF and sub_id not in unit and
+                    isinstance(symnode.node, MypyFile) and
+                    symnode.node.fullname() == sub_id):
+                removed.append((tree.names, name, symnode))
+                del tree.names[name]
+    return removed
+
+
+def module_fingerprint(tree: MypyFile, type_aliases: Dict[Node, Type]) -> str:
+    """Compute a fingerprint of the interface of a module.
+
+    The fingerprint is a hash of the names defined at the top level of the
+    module (and the members of classes defined in the module) together with
+    their kinds and types. The analysis of another module only depends on
+    these, so a module that was cached doesn't have to be processed again if
+    the modules it depends on have changed but their fingerprints haven't.
+    """
+    lines = List[str]()
+    symbol_table_fingerprint(tree.names, tree.fullname(), type_aliases, lines)
+    return hash_source('\n'.join(lines))
+
+
+def symbol_table_fingerprint(names: Dict[str, SymbolTableNode], prefix: str,
+                             type_aliases: Dict[Node, Type],
+                             lines: List[str]) -> None:
+    for name in sorted(names):
+        symnode = names[name]
+        node = symnode.node
+        lines.append(' '.join([name, str(symnode.kind), str(symnode.fullname),
+                               str(symnode.type_override),
+                               str(symnode.tvar_id),
+                               node_fingerprint(node, type_aliases)]))
+        if isinstance(node, TypeInfo):
+            info = cast(TypeInfo, node)
+            if info.fullname() == prefix + '.' + name:
+                # The class is defined here (instead of being imported).
+                symbol_table_fingerprint(info.names, info.fullname(),
+                                         type_aliases, lines)
+
+
+def node_fingerprint(node: Node, type_aliases: Dict[Node, Type]) -> str:
+    """Describe the parts of a definition that other modules may rely on."""
+    if isinstance(node, Var):
+        return 'var {} {} {}'.format(
+            node.type, type_aliases.get(node),
+            [node.is_self, node.is_ready, node.is_initialized_in_class,
+             node.is_staticmethod, node.is_classmethod, node.is_property])
+    elif isinstance(node, FuncItem):
+        flags = [node.is_static, node.is_class, node.is_overload,
+                 node.is_implicit, node.is_generator, node.min_args,
+                 node.max_pos]
+        if isinstance(node, FuncDef):
+            flags += [node.is_abstract, node.is_property]
+        return 'func {} {} {} {}'.format(node.type,
+                                         [arg.name() for arg in node.args],
+                                         node.arg_kinds, flags)
+    elif isinstance(node, OverloadedFuncDef):
+        return 'overload {} {}'.format(
+            node.type, [node_fingerprint(item, type_aliases)
+                        for item in node.items])
+    elif isinstance(node, Decorator):
+        return 'decorator {} {} {}'.format(
+            node_fingerprint(node.var, type_aliases),
+            node_fingerprint(node.func, type_aliases), node.is_overload)
+    elif isinstance(node, TypeInfo):
+        return 'class {} {} {} {} {} {} {}'.format(
+            node.bases, [info.fullname() for info in node.mro],
+            node.is_abstract, node.abstract_attributes, node.type_vars,
+            [info.fullname() for info in node.disjoint_classes],
+            node.ducktype)
+    elif isinstance(node, TypeVarExpr):
+        return 'typevar {}'.format(node.values)
+    elif isinstance(node, MypyFile):
+        return 'module {}'.format(node.fullname())
+    else:
+        return type(node).__name__
+
+
+def hash_source(text: str) -> str:
+    return hashlib.md5(text.encode('utf-8')).hexdigest()
+
+
+def unit_key(metas: List[CacheMeta]) -> str:
+    return hash_source(' '.join('{}:{}'.format(meta.id, meta.hash)
+                                for meta in metas))
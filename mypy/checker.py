@@ -23,7 +23,7 @@ from mypy import nodes
 from mypy.types import (
     Type, AnyType, Callable, Void, FunctionLike, Overloaded, TupleType,
     Instance, NoneTyp, UnboundType, ErrorType, TypeTranslator, BasicTypes,
-    strip_type, UnionType
+    TypeTable, strip_type, UnionType
 )
 from mypy.sametypes import is_same_type
 from mypy.messages import MessageBuilder
@@ -317,6 +317,15 @@ class TypeChecker(NodeVisitor[Type]):
     locals = Undefined(SymbolTable)
     modules = Undefined(Dict[str, MypyFile])
 
+    # If True, the current file is a stub that is only checked to the extent
+    # needed by other modules (see visit_file)
+    is_lazy_stub = False
+
+    # Shared types created by the type checker
+    type_table = Undefined(TypeTable)
+    # Cache of named_type results, by fully qualified name
+    named_types = Undefined(Dict[str, Instance])
+
     def __init__(self, errors: Errors, modules: Dict[str, MypyFile],
                  pyversion: int = 3) -> None:
         """Construct a type checker.
@@ -337,15 +346,29 @@ class TypeChecker(NodeVisitor[Type]):
         self.type_context = []
         self.dynamic_funcs = []
         self.function_stack = []
-
-    def visit_file(self, file_node: MypyFile, path: str) -> None:
-        """Type check a mypy file with the given path."""
+        self.type_table = TypeTable()
+        self.named_types = {}
+
+    def visit_file(self, file_node: MypyFile, path: str,
+                   lazy_stub: bool = False) -> None:
+        """Type check a mypy file with the given path.
+
+        If lazy_stub is True, the file is a stub and only the definitions
+        whose types are inferred by the type checker (such as variables
+        without type annotations and decorated functions) are processed.
+        The definitions of functions with empty bodies don't affect other
+        modules, so they are not checked.
+        """
         self.errors.set_file(path)
         self.globals = file_node.names
         self.locals = None
+        self.is_lazy_stub = lazy_stub
 
-        for d in file_node.defs:
-            self.accept(d)
+        try:
+            for d in file_node.defs:
+                self.accept(d)
+        finally:
+            self.is_lazy_stub = False
 
     def accept(self, node: Node, type_context: Type = None) -> Type:
         """Type check a node in the given type context."""
@@ -414,6 +437,9 @@ class TypeChecker(NodeVisitor[Type]):
         raise RuntimeError('Not implemented')
 
     def visit_overloaded_func_def(self, defn: OverloadedFuncDef) -> Type:
+        if self.is_lazy_stub and all(is_empty_body(fdef.func.body)
+                                     for fdef in defn.items):
+            return None
         num_abstract = 0
         for fdef in defn.items:
             self.check_func_item(fdef.func, name=fdef.func.name())
@@ -438,6 +464,8 @@ class TypeChecker(NodeVisitor[Type]):
 
     def visit_func_def(self, defn: FuncDef) -> Type:
         """Type check a function definition."""
+        if self.is_lazy_stub and is_empty_body(defn.body):
+            return None
         self.check_func_item(defn, name=defn.name())
         if defn.info:
             self.check_method_override(defn)
@@ -848,7 +876,8 @@ class TypeChecker(NodeVisitor[Type]):
         self.binder.push_frame()
         self.accept(defn.defs)
         self.binder = old_binder
-        self.check_multiple_inheritance(typ)
+        if not self.is_lazy_stub:
+            self.check_multiple_inheritance(typ)
         self.errors.pop_type()
 
     def check_multiple_inheritance(self, typ: TypeInfo) -> None:
@@ -1661,9 +1690,14 @@ class TypeChecker(NodeVisitor[Type]):
         type arguments. For example, named_type('builtins.object')
         produces the object type.
         """
-        # Assume that the name refers to a type.
-        sym = self.lookup_qualified(name)
-        return Instance(cast(TypeInfo, sym.node), [])
+        result = self.named_types.get(name)
+        if result is None:
+            # Assume that the name refers to a type.
+            sym = self.lookup_qualified(name)
+            result = self.type_table.instance(cast(TypeInfo, sym.node), [])
+            if '.' in name:
+                self.named_types[name] = result
+        return result
 
     def named_type_if_exists(self, name: str) -> Type:
         """Return named instance type, or UnboundType if the type was
@@ -1674,9 +1708,7 @@ class TypeChecker(NodeVisitor[Type]):
         etc.).
         """
         try:
-            # Assume that the name refers to a type.
-            sym = self.lookup_qualified(name)
-            return Instance(cast(TypeInfo, sym.node), [])
+            return self.named_type(name)
         except KeyError:
             return UnboundType(name)
 
@@ -1686,7 +1718,7 @@ class TypeChecker(NodeVisitor[Type]):
         Assume that the number of arguments is correct.  Assume that
         the name refers to a compatible generic type.
         """
-        return Instance(self.lookup_typeinfo(name), args)
+        return self.type_table.instance(self.lookup_typeinfo(name), args)
 
     def lookup_typeinfo(self, fullname: str) -> TypeInfo:
         # Assume that the name refers to a class.
@@ -1829,6 +1861,15 @@ def map_type_from_supertype(typ: Type, sub_info: TypeInfo,
     return expand_type_by_instance(typ, inst_type)
 
 
+def is_empty_body(body: Block) -> bool:
+    """Does a function body only contain pass statements and expressions
+    (such as docstrings)?"""
+    for s in body.body:
+        if not isinstance(s, PassStmt) and not isinstance(s, ExpressionStmt):
+            return False
+    return True
+
+
 def get_undefined_tuple(rvalue: Node) -> Type:
     """Get tuple type corresponding to a tuple of Undefined values.
 
@@ -0,0 +1,68 @@
+"""Client for the mypy build server (see mypy.daemon).
+
+This module doesn't depend on the rest of mypy, so that a client starts
+quickly.
+
+Clients connect to the server using a Unix domain socket. A client sends a
+single request, a JSON object terminated by a newline, and the server
+replies with a JSON object and closes the connection. The requests are:
+
+  {"command": "check", "path": <program path>, "cwd": <directory>}
+    Type check a program. The response has the error messages
+    ("messages") and an exit status ("status"; 0 if there were no errors).
+    If the server was started with profiling enabled, the response also
+    has the profiling report as a list of lines ("profile").
+
+  {"command": "stop"}
+    Shut down the server.
+"""
+
+import json
+import os
+import socket
+
+from typing import Any, Dict
+
+
+def send_request(socket_path: str, request: Dict[str, Any]) -> Dict[str, Any]:
+    """Send a request to a build server and return the response."""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(socket_path)
+        write_message(sock, request)
+        response = read_message(sock)
+    finally:
+        sock.close()
+    if response is None:
+        raise IOError('Invalid response from build server')
+    return response
+
+
+def check(socket_path: str, path: str) -> Dict[str, Any]:
+    """Ask a build server to type check a program."""
+    return send_request(socket_path, {'command': 'check',
+                                      'path': path,
+                                      'cwd': os.getcwd()})
+
+
+def stop(socket_path: str) -> None:
+    """Ask a build server to shut down."""
+    send_request(socket_path, {'command': 'stop'})
+
+
+def read_message(sock: socket.socket) -> Dict[str, Any]:
+    """Read a JSON message terminated by a newline (None if invalid)."""
+    f = sock.makefile('rb')
+    try:
+        message = json.loads(f.readline().decode('utf-8'))
+    except ValueError:
+        return None
+    finally:
+        f.close()
+    if not isinstance(message, dict):
+        return None
+    return message
+
+
+def write_message(sock: socket.socket, message: Dict[str, Any]) -> None:
+    sock.sendall((json.dumps(message) + '\n').encode('utf-8'))
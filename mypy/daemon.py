@@ -0,0 +1,109 @@
+"""Build server that keeps analyzed modules in memory between builds.
+
+A build server is a long-running process that type checks programs on
+request. The results of earlier builds are kept in an in-memory incremental
+build cache (see mypy.cache), so only the modules that have changed since
+the previous build, and the modules that depend on them, are processed
+again. Everything else, including builtins and the other library stubs, is
+loaded from memory.
+
+Clients connect to the server using a Unix domain socket; see mypy.client
+for the protocol.
+"""
+
+import os
+import socket
+import traceback
+
+from typing import Any, Dict, List, Tuple
+
+from mypy import build
+from mypy.client import read_message, write_message
+from mypy.errors import CompileError
+
+
+class BuildServer:
+    """Type check programs using an in-memory incremental build cache."""
+
+    def __init__(self, bin_dir: str, pyversion: int = 3,
+                 custom_typing_module: str = None,
+                 flags: List[str] = None) -> None:
+        self.bin_dir = bin_dir
+        self.pyversion = pyversion
+        self.custom_typing_module = custom_typing_module
+        self.flags = (flags or []) + [build.INCREMENTAL]
+        # Incremental build cache files
+        self.cache_files = Dict[str, bytes]()
+
+    def check(self, path: str) -> Tuple[List[str], List[str]]:
+        """Type check a program.
+
+        Return the error messages and the profiling report (empty if not
+        profiling; see build.format_stats).
+        """
+        messages = List[str]()
+        try:
+            result = build.build(
+                path,
+                target=build.TYPE_CHECK,
+                bin_dir=self.bin_dir,
+                pyversion=self.pyversion,
+                custom_typing_module=self.custom_typing_module,
+                cache_files=self.cache_files,
+                flags=self.flags)
+            stats = result.stats
+        except CompileError as e:
+            messages = e.messages
+            stats = e.stats
+        if not stats:
+            return messages, []
+        return messages, build.format_stats(stats, self.flags)
+
+    def handle(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Process a request and return the response."""
+        command = request.get('command')
+        if command == 'stop':
+            return {'status': 0, 'messages': []}
+        elif command != 'check' or 'path' not in request:
+            return {'status': 2, 'messages': ['Invalid request']}
+        cwd = os.getcwd()
+        try:
+            os.chdir(request.get('cwd', cwd))
+            messages, report = self.check(request['path'])
+        except Exception:
+            # An internal error might have left the cache in an inconsistent
+            # state.
+            self.cache_files.clear()
+            return {'status': 2,
+                    'messages': traceback.format_exc().splitlines()}
+        finally:
+            os.chdir(cwd)
+        response = {'status': 1 if messages else 0,
+                    'messages': messages}  # type: Dict[str, Any]
+        if report:
+            response['profile'] = report
+        return response
+
+    def serve(self, socket_path: str) -> None:
+        """Serve requests using a socket until a stop request is received."""
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.bind(socket_path)
+        try:
+            sock.listen(5)
+            while True:
+                conn, _ = sock.accept()
+                request = {}  # type: Dict[str, Any]
+                try:
+                    request = read_message(conn) or {}
+                    write_message(conn, self.handle(request))
+                except OSError:
+                    # The client disconnected early (or some other socket
+                    # error happened); only this connection is affected.
+                    pass
+                finally:
+                    conn.close()
+                if request.get('command') == 'stop':
+                    break
+        finally:
+            sock.close()
+            os.remove(socket_path)
@@ -144,6 +144,14 @@ class Errors:
         """Are there any generated errors?"""
         return bool(self.error_info)
 
+    def is_errors_for_file(self, file: str) -> bool:
+        """Are there any errors reported for a source file?"""
+        file = remove_path_prefix(os.path.normpath(file), self.ignore_prefix)
+        for info in self.error_info:
+            if info.file == file:
+                return True
+        return False
+
     def is_blockers(self) -> bool:
         """Are the any errors that are blockers?"""
         return any(err for err in self.error_info if err.blocker)
@@ -294,6 +302,9 @@ class CompileError(Exception):
     """
 
     messages = Undefined(List[str])
+    # Statistics of the failed build, if profiling (a mypy.buildstats
+    # BuildStats object; see mypy.build.BuildResult)
+    stats = None  # type: Any
 
     def __init__(self, messages: List[str]) -> None:
         super().__init__()
@@ -64,6 +64,9 @@ class ExpandTypeVisitor(TypeVisitor[Type]):
 
     def visit_instance(self, t: Instance) -> Type:
         args = self.expand_types(t.args)
+        if is_same_objects(args, t.args) and not t.erased:
+            # Nothing was substituted; share the original type.
+            return t
         return Instance(t.type, args, t.line, t.repr)
 
     def visit_type_var(self, t: TypeVar) -> Type:
@@ -92,10 +95,16 @@ class ExpandTypeVisitor(TypeVisitor[Type]):
         return Overloaded(items)
 
     def visit_tuple_type(self, t: TupleType) -> Type:
-        return TupleType(self.expand_types(t.items), t.line, t.repr)
+        items = self.expand_types(t.items)
+        if is_same_objects(items, t.items):
+            return t
+        return TupleType(items, t.line, t.repr)
 
     def visit_union_type(self, t: UnionType) -> Type:
-        return UnionType(self.expand_types(t.items), t.line, t.repr)
+        items = self.expand_types(t.items)
+        if is_same_objects(items, t.items):
+            return t
+        return UnionType(items, t.line, t.repr)
 
     def expand_types(self, types: List[Type]) -> List[Type]:
         a = []  # type: List[Type]
@@ -111,6 +120,16 @@ class ExpandTypeVisitor(TypeVisitor[Type]):
         return a
 
 
+def is_same_objects(a: List[Type], b: List[Type]) -> bool:
+    """Are the items of two lists the same objects?"""
+    if len(a) != len(b):
+        return False
+    for i in range(len(a)):
+        if a[i] is not b[i]:
+            return False
+    return True
+
+
 def update_callable_implicit_bounds(
         t: Callable, arg_types: List[Tuple[int, Type]]) -> Callable:
     # FIX what if there are existing bounds?
@@ -0,0 +1,123 @@
+"""Finding the imports of a source file without parsing it.
+
+The import statements of a file can be found from its tokens much faster
+than by parsing the file. This lets a build find the modules that a
+program may depend on, and start parsing them in parallel, before the
+importing files have been parsed.
+
+The result is an approximation: imports in unreachable code and names
+imported from modules that may or may not be submodules are included (see
+scan_imports).
+"""
+
+from typing import List, Tuple
+
+from mypy import lex
+from mypy.lex import Token
+
+
+# Kinds of tokens after which a new statement may start
+statement_start_kinds = set([lex.BREAK, lex.INDENT, lex.DEDENT, lex.COLON])
+
+
+def scan_imports(text: str,
+                 custom_typing_module: str = None) -> List[Tuple[str, int]]:
+    """Find the modules imported by a source file.
+
+    Return a list of tuples (module id, line number) in the order the
+    imports appear in the file. For each name imported using
+    'from m import n', include both m and m.n, since n could be a
+    submodule of m. Syntax errors are ignored.
+    """
+    tokens = lex.lex(text)
+    result = List[Tuple[str, int]]()
+    at_start = True
+    i = 0
+    while i < len(tokens):
+        t = tokens[i]
+        if at_start and t.kind == lex.KEYWORD:
+            if t.string == 'import':
+                i = scan_import(tokens, i + 1, result, custom_typing_module)
+                continue
+            elif t.string == 'from':
+                i = scan_import_from(tokens, i + 1, result,
+                                     custom_typing_module)
+                continue
+        at_start = t.kind in statement_start_kinds
+        i += 1
+    return result
+
+
+def scan_import(tokens: List[Token], i: int, result: List[Tuple[str, int]],
+                custom_typing_module: str) -> int:
+    """Scan the module names of 'import m, ...' starting at tokens[i].
+
+    Add the modules to result and return the index of the token after the
+    statement.
+    """
+    line = tokens[i - 1].line
+    while True:
+        id, i = scan_qualified_name(tokens, i)
+        if id is None:
+            break
+        if id == custom_typing_module:
+            id = 'typing'
+        result.append((id, line))
+        if tokens[i].string == 'as' and tokens[i + 1].kind == lex.NAME:
+            i += 2
+        if tokens[i].string != ',':
+            break
+        i += 1
+    return i
+
+
+def scan_import_from(tokens: List[Token], i: int,
+                     result: List[Tuple[str, int]],
+                     custom_typing_module: str) -> int:
+    """Scan 'from m import ...' starting at tokens[i] (after 'from').
+
+    Add the modules to result and return the index of the token after the
+    statement.
+    """
+    line = tokens[i - 1].line
+    id, i = scan_qualified_name(tokens, i)
+    if id is None or tokens[i].string != 'import':
+        return i
+    if id == custom_typing_module:
+        id = 'typing'
+    i += 1
+    names = List[str]()
+    if tokens[i].string == '(':
+        i += 1
+    while tokens[i].kind == lex.NAME:
+        names.append(tokens[i].string)
+        i += 1
+        if tokens[i].string == 'as' and tokens[i + 1].kind == lex.NAME:
+            i += 2
+        if tokens[i].string != ',':
+            break
+        i += 1
+    if '{}.{}'.format(id, names[0] if names else '') == custom_typing_module:
+        result.append(('typing', line))
+        return i
+    result.append((id, line))
+    for name in names:
+        result.append(('{}.{}'.format(id, name), line))
+    return i
+
+
+def scan_qualified_name(tokens: List[Token], i: int) -> Tuple[str, int]:
+    """Scan a dotted name starting at tokens[i].
+
+    Return the name and the index of the token after it. Return None as the
+    name if there is no name at tokens[i].
+    """
+    if tokens[i].kind != lex.NAME:
+        return None, i
+    name = tokens[i].string
+    i += 1
+    while (tokens[i].string == '.' and tokens[i].kind == lex.OP and
+           tokens[i + 1].kind == lex.NAME):
+        name += '.' + tokens[i + 1].string
+        i += 2
+    return name, i
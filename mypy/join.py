@@ -1,13 +1,19 @@
 """Calculation of the least upper bound types (joins)."""
 
-from typing import cast, List
+from typing import cast, List, Any
 
 from mypy.types import (
     Type, AnyType, NoneTyp, Void, TypeVisitor, Instance, UnboundType,
     ErrorType, TypeVar, Callable, TupleType, ErasedType, BasicTypes, TypeList,
-    UnionType
+    UnionType, type_key
 )
-from mypy.subtypes import is_subtype, is_equivalent, map_instance_to_supertype
+from mypy.subtypes import (
+    is_subtype, is_equivalent, map_instance_to_supertype, pair_key, ResultCache
+)
+
+
+# Cache of joins computed by TypeJoinVisitor (see join_with_visitor)
+join_cache = ResultCache(4096)
 
 
 def join_simple(declaration: Type, s: Type, t: Type, basic: BasicTypes) -> Type:
@@ -31,7 +37,7 @@ def join_simple(declaration: Type, s: Type, t: Type, basic: BasicTypes) -> Type:
     if isinstance(declaration, UnionType):
         return UnionType.make_simplified_union([s, t])
 
-    value = t.accept(TypeJoinVisitor(s, basic))
+    value = join_with_visitor(s, t, basic)
 
     if value is None:
         # XXX this code path probably should be avoided.
@@ -64,7 +70,40 @@ def join_types(s: Type, t: Type, basic: BasicTypes) -> Type:
         return t
 
     # Use a visitor to handle non-trivial cases.
-    return t.accept(TypeJoinVisitor(s, basic))
+    return join_with_visitor(s, t, basic)
+
+
+def join_with_visitor(s: Type, t: Type, basic: BasicTypes) -> Type:
+    """Join s and t using TypeJoinVisitor.
+
+    The results are cached by the structure of the types.
+    """
+    key = cache_key(s, t, basic)
+    if key is not None:
+        result = join_cache.get(key)
+        if result is not None:
+            return result
+    result = t.accept(TypeJoinVisitor(s, basic))
+    if key is not None and result is not None:
+        join_cache.add(key, result)
+    return result
+
+
+def cache_key(s: Type, t: Type, basic: BasicTypes) -> Any:
+    """Return a key for caching a join or a meet (None if there is none).
+
+    The result may depend on the basic types, so they are part of the key.
+    """
+    key = pair_key(s, t)
+    if key is None:
+        return None
+    basic_keys = List[Any]()
+    for typ in basic.object, basic.type_type, basic.tuple, basic.function:
+        if typ is not None:
+            basic_keys.append(type_key(typ))
+        else:
+            basic_keys.append(None)
+    return key, tuple(basic_keys)
 
 
 class TypeJoinVisitor(TypeVisitor[Type]):
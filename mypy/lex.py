@@ -7,13 +7,43 @@ This module can be run as a script (lex.py FILE).
 """
 
 import re
+import time
 
 from mypy.util import short_type
 from typing import List, Undefined, Function, Dict, Any, Match, Pattern
 
 
+# Token kinds. Each token class has a distinct kind, and tokens can be
+# classified by comparing kinds instead of using isinstance.
+TOKEN = 0  # Plain Token (only used for dummy tokens)
+BREAK = 1
+INDENT = 2
+DEDENT = 3
+EOF = 4
+KEYWORD = 5
+NAME = 6
+INT_LIT = 7
+STR_LIT = 8
+BYTES_LIT = 9
+UNICODE_LIT = 10
+FLOAT_LIT = 11
+PUNCT = 12
+COLON = 13
+OP = 14
+BOM = 15
+LEX_ERROR = 16
+
+
 class Token:
-    """Base class for all tokens."""
+    """Base class for all tokens.
+
+    Tokens are numerous, so they have no instance dictionaries. The token
+    kind is a class attribute.
+    """
+
+    __slots__ = ('string', 'pre', 'line')
+
+    kind = TOKEN
 
     def __init__(self, string: str, pre: str = '') -> None:
         """Initialize a token.
@@ -49,18 +79,34 @@ class Token:
 class Break(Token):
     """Statement break (line break or semicolon)"""
 
+    __slots__ = ()
+
+    kind = BREAK
+
 
 class Indent(Token):
     """Increase block indent level."""
 
+    __slots__ = ()
+
+    kind = INDENT
+
 
 class Dedent(Token):
     """Decrease block indent level."""
 
+    __slots__ = ()
+
+    kind = DEDENT
+
 
 class Eof(Token):
     """End of file"""
 
+    __slots__ = ()
+
+    kind = EOF
+
 
 class Keyword(Token):
     """Reserved word (other than keyword operators; they use Op).
@@ -68,18 +114,34 @@ class Keyword(Token):
     Examples: if, class, while, def.
     """
 
+    __slots__ = ()
+
+    kind = KEYWORD
+
 
 class Name(Token):
     """An alphanumeric identifier"""
 
+    __slots__ = ()
+
+    kind = NAME
+
 
 class IntLit(Token):
     """Integer literal"""
 
+    __slots__ = ()
+
+    kind = INT_LIT
+
 
 class StrLit(Token):
     """String literal"""
 
+    __slots__ = ()
+
+    kind = STR_LIT
+
     def parsed(self) -> str:
         """Return the parsed contents of the literal."""
         return _parse_str_literal(self.string)
@@ -88,6 +150,10 @@ class StrLit(Token):
 class BytesLit(Token):
     """Bytes literal"""
 
+    __slots__ = ()
+
+    kind = BYTES_LIT
+
     def parsed(self) -> str:
         """Return the parsed contents of the literal."""
         return _parse_str_literal(self.string)
@@ -96,6 +162,10 @@ class BytesLit(Token):
 class UnicodeLit(Token):
     """Unicode literal (Python 2.x)"""
 
+    __slots__ = ()
+
+    kind = UNICODE_LIT
+
     def parsed(self) -> str:
         """Return the parsed contents of the literal."""
         return _parse_str_literal(self.string)
@@ -104,26 +174,48 @@ class UnicodeLit(Token):
 class FloatLit(Token):
     """Float literal"""
 
+    __slots__ = ()
+
+    kind = FLOAT_LIT
+
 
 class Punct(Token):
     """Punctuator (e.g. comma, '(' or '=')"""
 
+    __slots__ = ()
+
+    kind = PUNCT
+
 
 class Colon(Token):
-    pass
+    __slots__ = ()
+
+    kind = COLON
 
 
 class Op(Token):
     """Operator (e.g. '+' or 'in')"""
 
+    __slots__ = ()
+
+    kind = OP
+
 
 class Bom(Token):
     """Byte order mark (at the start of a file)"""
 
+    __slots__ = ()
+
+    kind = BOM
+
 
 class LexError(Token):
     """Lexer error token"""
 
+    __slots__ = ('type',)
+
+    kind = LEX_ERROR
+
     def __init__(self, string: str, type: int) -> None:
         """Initialize token.
 
@@ -133,6 +225,10 @@ class LexError(Token):
         self.type = type
 
 
+# Kinds of tokens that may have an empty string
+empty_token_kinds = set([EOF, BREAK, LEX_ERROR, DEDENT])
+
+
 # Lexer error types
 NUMERIC_LITERAL_ERROR = 0
 UNTERMINATED_STRING_LITERAL = 1
@@ -148,16 +244,103 @@ STR_CONTEXT = 1
 COMMENT_CONTEXT = 2
 
 
-def lex(string: str, first_line: int = 1) -> List[Token]:
+# Lexer backends (see lex())
+REGEX_BACKEND = 'regex'        # A single combined regexp (RegexLexer)
+DISPATCH_BACKEND = 'dispatch'  # Per-character method dispatch (Lexer)
+BACKENDS = [REGEX_BACKEND, DISPATCH_BACKEND]
+
+
+def lex(string: str, first_line: int = 1,
+        backend: str = REGEX_BACKEND) -> List[Token]:
     """Analyze string and return an array of token objects.
 
-    The last token is always Eof.
+    The last token is always Eof. Both backends produce the same tokens.
     """
-    l = Lexer()
+    l = create_lexer(backend)
     l.lex(string, first_line)
     return l.tok
 
 
+def create_lexer(backend: str) -> 'Lexer':
+    if backend == REGEX_BACKEND:
+        return RegexLexer()
+    elif backend == DISPATCH_BACKEND:
+        return Lexer()
+    else:
+        raise ValueError('Unknown lexer backend {}'.format(backend))
+
+
+class TokenStream:
+    """The tokens of a string, analyzed on demand.
+
+    Tokens are accessed by index like the list returned by lex(). The string
+    is analyzed in chunks as tokens are requested, and only the most recent
+    tokens are kept: once token n has been accessed, tokens before
+    n - lookback are no longer available. This way a parser that looks back
+    only a few tokens never has all the tokens of a large file in memory.
+    """
+
+    # Number of characters analyzed at a time
+    chunk_size = 8192
+    # How many tokens before the last accessed token are kept
+    lookback = 16
+    # Number of tokens analyzed so far
+    num_tokens = 0
+    # Time spent in the lexer so far (in seconds)
+    lex_time = 0.0
+
+    def __init__(self, string: str, first_line: int = 1,
+                 backend: str = REGEX_BACKEND) -> None:
+        self.lexer = create_lexer(backend)
+        self.lexer.start(string, first_line)
+        self.done = False
+        # Available tokens; the first one is at index offset
+        self.tokens = List[Token]()
+        self.offset = 0
+
+    def __getitem__(self, index: int) -> Token:
+        i = index - self.offset
+        if 0 <= i < len(self.tokens):
+            return self.tokens[i]
+        return self.fetch(index)
+
+    def fetch(self, index: int) -> Token:
+        """Return a token that is not in the current chunk."""
+        if index < self.offset:
+            raise IndexError('Token {} is no longer available'.format(index))
+        while index >= self.offset + len(self.tokens):
+            if self.done:
+                raise IndexError('Token index out of range')
+            self.read_chunk(index)
+        return self.tokens[index - self.offset]
+
+    def read_chunk(self, index: int) -> None:
+        """Analyze the next chunk of the string.
+
+        Drop the tokens that are too far behind index.
+        """
+        drop = min(index - self.lookback - self.offset, len(self.tokens))
+        if drop > 0:
+            del self.tokens[:drop]
+            self.offset += drop
+        lexer = self.lexer
+        start = time.time()
+        if lexer.i < len(lexer.s):
+            lexer.lex_tokens(lexer.i + self.chunk_size)
+            # The lexer may still modify its last token (for example, by
+            # merging a line break to it), so leave it to the lexer.
+            new_tokens = lexer.tok[:-1]
+            del lexer.tok[:-1]
+        else:
+            lexer.finish()
+            new_tokens = lexer.tok[:]
+            del lexer.tok[:]
+            self.done = True
+        self.lex_time += time.time() - start
+        self.tokens.extend(new_tokens)
+        self.num_tokens += len(new_tokens)
+
+
 # Reserved words (not including operators)
 keywords = set([
     'as', 'assert', 'break', 'class', 'continue', 'def', 'del', 'elif',
@@ -305,6 +488,16 @@ class Lexer:
 
     def lex(self, s: str, first_line: int) -> None:
         """Lexically analyze a string, storing the tokens at the tok list."""
+        self.start(s, first_line)
+        self.lex_tokens(len(s))
+        self.finish()
+
+    def start(self, s: str, first_line: int) -> None:
+        """Start analyzing a string.
+
+        The string is analyzed by calling lex_tokens (possibly several times
+        to lex the string in parts) and finally finish.
+        """
         self.s = s
         self.i = 0
         self.line = first_line
@@ -316,26 +509,15 @@ class Lexer:
         # an error.
         self.lex_indent()
 
-        # Make a local copy of map as a simple optimization.
-        map = self.map
-
-        # Lex the file. Repeatedly call the lexer method for the current char.
-        while self.i < len(s):
-            # Get the character code of the next character to lex.
-            c = ord(s[self.i])
-            # Dispatch to the relevant lexer method. This will consume some
-            # characters in the text, add a token to self.tok and increment
-            # self.i.
-            map[c]()
-
+    def finish(self) -> None:
+        """Add the final tokens after the whole string has been analyzed."""
         # Append a break if there is no statement/block terminator at the end
         # of input.
-        if len(self.tok) > 0 and (not isinstance(self.tok[-1], Break) and
-                                  not isinstance(self.tok[-1], Dedent)):
+        if len(self.tok) > 0 and self.tok[-1].kind not in (BREAK, DEDENT):
             self.add_token(Break(''))
 
         # Attack any dangling comments/whitespace to a final Break token.
-        if self.tok and isinstance(self.tok[-1], Break):
+        if self.tok and self.tok[-1].kind == BREAK:
             self.tok[-1].string += self.pre_whitespace
             self.pre_whitespace = ''
 
@@ -344,6 +526,27 @@ class Lexer:
 
         self.add_token(Eof(''))
 
+    def lex_tokens(self, end: int) -> None:
+        """Lex the input up to index end, dispatching on each character.
+
+        The last token may extend beyond end, and end may be beyond the end
+        of the input.
+        """
+        s = self.s
+        end = min(end, len(s))
+
+        # Make a local copy of map as a simple optimization.
+        map = self.map
+
+        # Lex the file. Repeatedly call the lexer method for the current char.
+        while self.i < end:
+            # Get the character code of the next character to lex.
+            c = ord(s[self.i])
+            # Dispatch to the relevant lexer method. This will consume some
+            # characters in the text, add a token to self.tok and increment
+            # self.i.
+            map[c]()
+
     def lex_number_or_dot(self) -> None:
         """Analyse a token starting with a dot.
 
@@ -369,6 +572,8 @@ class Lexer:
         r'[0-9]*\.[0-9]*([eE][-+]?[0-9]+)?|[0-9]+[eE][-+]?[0-9]+')
     # These characters must not appear after a number literal.
     name_char_exp = re.compile('[a-zA-Z0-9_]')
+    # An invalid number literal (used for error recovery)
+    invalid_number_exp = re.compile('[0-9][0-9a-zA-Z_]*')
 
     def lex_number(self) -> None:
         """Analyse an int or float literal.
@@ -382,7 +587,7 @@ class Lexer:
         if self.name_char_exp.match(
                 self.s[self.i + maxlen:self.i + maxlen + 1]) is not None:
             # Error: alphanumeric character after number literal.
-            s3 = self.match(re.compile('[0-9][0-9a-zA-Z_]*'))
+            s3 = self.match(self.invalid_number_exp)
             maxlen = max(maxlen, len(s3))
             self.add_token(LexError(' ' * maxlen, NUMERIC_LITERAL_ERROR))
         elif len(s1) > len(s2):
@@ -393,6 +598,8 @@ class Lexer:
             self.add_token(FloatLit(s2))
 
     name_exp = re.compile('[a-zA-Z_][a-zA-Z0-9_]*')
+    # A string literal prefix followed by a quote, e.g. br'
+    prefixed_str_exp = re.compile('[a-z]+[\'"]')
 
     def lex_name(self) -> None:
         """Analyse a name.
@@ -405,7 +612,7 @@ class Lexer:
             self.add_token(Keyword(s))
         elif s in alpha_operators:
             self.add_token(Op(s))
-        elif s in str_prefixes and self.match(re.compile('[a-z]+[\'"]')) != '':
+        elif s in str_prefixes and self.match(self.prefixed_str_exp) != '':
             self.lex_prefixed_str(s)
         else:
             self.add_token(Name(s))
@@ -444,6 +651,10 @@ class Lexer:
     str_exp_double3 = re.compile('[a-z]*"""')
     str_exp_double3end = re.compile(r'[^\n\r]*?"""')
 
+    # The rest of the current line, excluding/including the line break
+    rest_of_line_exp = re.compile(r'[^\n\r]*')
+    line_exp = re.compile(r'[^\n\r]*(\n|\r\n?)')
+
     def lex_str_single(self) -> None:
         """Analyse single-quoted string literal"""
         self.lex_str(self.str_exp_single, self.str_exp_single_multi,
@@ -456,7 +667,7 @@ class Lexer:
 
     def lex_prefixed_str(self, prefix: str) -> None:
         """Analyse a string literal with a prefix, such as r'...'."""
-        s = self.match(re.compile('[a-z]+[\'"]'))
+        s = self.match(self.prefixed_str_exp)
         if s.endswith("'"):
             re1 = self.str_exp_single
             re2 = self.str_exp_single_multi
@@ -503,7 +714,7 @@ class Lexer:
                         self.add_token(StrLit(s))
             else:
                 # Unterminated string literal.
-                s = self.match(re.compile('[^\\n\\r]*'))
+                s = self.match(self.rest_of_line_exp)
                 self.add_token(LexError(s, UNTERMINATED_STRING_LITERAL))
 
     def lex_triple_quoted_str(self, re3end: Pattern[str], prefix: str) -> None:
@@ -514,7 +725,7 @@ class Lexer:
             m = re3end.match(self.s, self.i)
             if m is not None:
                 break
-            m = re.match('[^\\n\\r]*(\\n|\\r\\n?)', self.s[self.i:])
+            m = self.line_exp.match(self.s, self.i)
             if m is None:
                 self.add_special_token(
                     LexError(ss, UNTERMINATED_STRING_LITERAL), line, 0)
@@ -633,7 +844,7 @@ class Lexer:
         """Analyse a line break."""
         s = self.match(self.break_exp)
         last_tok = self.tok[-1] if self.tok else None
-        if isinstance(last_tok, Break):
+        if last_tok is not None and last_tok.kind == BREAK:
             was_semicolon = last_tok.string == ';'
             last_tok.string += self.pre_whitespace + s
             self.i += len(s)
@@ -727,10 +938,7 @@ class Lexer:
         Update its line number and record preceding whitespace
         characters and comments.
         """
-        if (tok.string == '' and not isinstance(tok, Eof)
-                and not isinstance(tok, Break)
-                and not isinstance(tok, LexError)
-                and not isinstance(tok, Dedent)):
+        if tok.string == '' and tok.kind not in empty_token_kinds:
             raise ValueError('Empty token')
         tok.pre = self.pre_whitespace
         tok.line = self.line
@@ -740,10 +948,7 @@ class Lexer:
 
     def add_special_token(self, tok: Token, line: int, skip: int) -> None:
         """Like add_token, but caller sets the number of chars to skip."""
-        if (tok.string == '' and not isinstance(tok, Eof)
-                and not isinstance(tok, Break)
-                and not isinstance(tok, LexError)
-                and not isinstance(tok, Dedent)):
+        if tok.string == '' and tok.kind not in empty_token_kinds:
             raise ValueError('Empty token')
         tok.pre = self.pre_whitespace
         tok.line = line
@@ -759,7 +964,7 @@ class Lexer:
         else:
             # Ignore break after another break or dedent.
             t = self.tok[-1]
-            return isinstance(t, Break) or isinstance(t, Dedent)
+            return t.kind == BREAK or t.kind == DEDENT
 
     def verify_encoding(self, string: str, context: int) -> None:
         """Verify that token is encoded correctly (using the file encoding)."""
@@ -781,6 +986,143 @@ class Lexer:
                 self.add_token(LexError('', type))
 
 
+# Master regexp of RegexLexer. It matches the whitespace before a token and
+# the start of the token. The name of the group that matched the token
+# determines how it is analyzed. The order of the alternatives matters: for
+# example, prefixed string literals must be matched before names, numbers
+# such as '.5' before the '.' operator and augmented assignment punctuators
+# before operators.
+master_exp = re.compile(r'(?P<space>[ \t\x0c]*)(?:' + '|'.join([
+    # String literal prefix, e.g. the r in r'foo'
+    r'(?P<prefix>(?:br|ur|r|b|u)(?=[\'"]))',
+    # Name, keyword or alphabetical operator
+    r'(?P<name>[a-zA-Z_][a-zA-Z0-9_]*)',
+    # Start of an int or float literal
+    r'(?P<number>\.?[0-9])',
+    # Complete single-line string literal (not triple-quoted)
+    r"(?P<str>'(?!'')(?:[^'\\\r\n]|\\[^\r\n])*'"
+    r'|"(?!"")(?:[^"\\\r\n]|\\[^\r\n])*")',
+    # Start of any other string literal
+    r"(?P<single>')",
+    r'(?P<double>")',
+    r'(?P<comment>#[^\n\r]*)',
+    r'(?P<break>[\r\n])',
+    r'(?P<semicolon>;)',
+    r'(?P<colon>:)',
+    r'(?P<backslash>\\)',
+    r'(?P<open>[\[({])',
+    r'(?P<close>[])}])',
+    r'(?P<punct>\*\*=|//=|<<=|>>=|->|[-+*/%&|^]=|[,@]|=(?!=))',
+    r'(?P<op>==|!=|<=|>=|\*\*|//|<<|>>|[-+*/<>.%&|^~])',
+    # Anything else is an invalid character
+    r'(?P<other>[^ \t\x0c])']) + ')', re.DOTALL)
+
+
+class RegexLexer(Lexer):
+    """Lexical analyzer that matches a single combined regexp per token.
+
+    Simple tokens (names, operators, punctuators, brackets and single-line
+    string literals), whitespace and comments are produced directly from the
+    match of master_exp. Other tokens are analyzed by the Lexer methods,
+    which take care of line breaks, indentation and error recovery.
+    """
+
+    def __init__(self) -> None:
+        # The character dispatch table is not needed.
+        self.tok = []
+        self.indents = [0]
+        self.open_brackets = []
+
+    def lex_tokens(self, end: int) -> None:
+        # Keep the current location and whitespace in local variables, and
+        # only synchronize them with the attributes around calls to the
+        # Lexer methods.
+        s = self.s
+        n = len(s)
+        i = self.i
+        pre = self.pre_whitespace
+        tok = self.tok
+        open_brackets = self.open_brackets
+        match = master_exp.match
+        while i < end:
+            m = match(s, i)
+            if m is None:
+                # Only whitespace remains.
+                pre += s[i:]
+                i = n
+                break
+            kind = m.lastgroup
+            t = Undefined  # type: Token
+            if kind == 'name':
+                string = m.group(kind)
+                if string in keywords:
+                    t = Keyword(string)
+                elif string in alpha_operators:
+                    t = Op(string)
+                else:
+                    t = Name(string)
+            elif kind == 'punct':
+                t = Punct(m.group(kind))
+            elif kind == 'op':
+                t = Op(m.group(kind))
+            elif kind == 'open':
+                t = Punct(m.group(kind))
+                open_brackets.append(t.string)
+            elif kind == 'close':
+                t = Punct(m.group(kind))
+                if (open_brackets != [] and
+                        self.open_bracket[t.string] == open_brackets[-1]):
+                    open_brackets.pop()
+            elif kind == 'colon':
+                t = Colon(':')
+            elif kind == 'str':
+                t = StrLit(m.group(kind))
+                self.verify_encoding(t.string, STR_CONTEXT)
+            elif kind == 'comment':
+                comment = m.group(kind)
+                self.verify_encoding(comment, COMMENT_CONTEXT)
+                pre += m.group()
+                i = m.end()
+                continue
+            else:
+                self.i = m.end(1)
+                self.pre_whitespace = pre + m.group(1)
+                self.lex_other(kind)
+                i = self.i
+                pre = self.pre_whitespace
+                continue
+            t.pre = pre + m.group(1)
+            t.line = self.line
+            tok.append(t)
+            i = m.end()
+            pre = ''
+        self.i = i
+        self.pre_whitespace = pre
+
+    def lex_other(self, kind: str) -> None:
+        """Analyze a token that is not produced directly from a match.
+
+        The kind argument is the name of the group of master_exp that matched
+        the start of the token.
+        """
+        if kind == 'break':
+            self.lex_break()
+        elif kind == 'number':
+            self.lex_number()
+        elif kind == 'prefix':
+            self.lex_prefixed_str(self.match(self.name_exp))
+        elif kind == 'single':
+            self.lex_str_single()
+        elif kind == 'double':
+            self.lex_str_double()
+        elif kind == 'semicolon':
+            self.lex_semicolon()
+        elif kind == 'backslash':
+            self.lex_backslash()
+        else:
+            self.unknown_character()
+
+
 if __name__ == '__main__':
     # Lexically analyze a file and dump the tokens to stdout.
     import sys
@@ -1,17 +1,23 @@
 from typing import cast, List
 
-from mypy.join import is_similar_callables, combine_similar_callables
+from mypy.join import (
+    is_similar_callables, combine_similar_callables, cache_key
+)
 from mypy.types import (
     Type, AnyType, TypeVisitor, UnboundType, Void, ErrorType, NoneTyp, TypeVar,
     Instance, Callable, TupleType, ErasedType, BasicTypes, TypeList, UnionType
 )
 from mypy.sametypes import is_same_type
-from mypy.subtypes import is_subtype
+from mypy.subtypes import is_subtype, ResultCache
 from mypy.nodes import TypeInfo
 
 # TODO Describe this module.
 
 
+# Cache of meets computed by TypeMeetVisitor (keyed by join.cache_key)
+meet_cache = ResultCache(4096)
+
+
 def meet_types(s: Type, t: Type, basic: BasicTypes) -> Type:
     if isinstance(s, ErasedType):
         return s
@@ -19,7 +25,15 @@ def meet_types(s: Type, t: Type, basic: BasicTypes) -> Type:
         return t
     if isinstance(s, UnionType) and not isinstance(t, UnionType):
         s, t = t, s
-    return t.accept(TypeMeetVisitor(s, basic))
+    key = cache_key(s, t, basic)
+    if key is not None:
+        result = meet_cache.get(key)
+        if result is not None:
+            return result
+    result = t.accept(TypeMeetVisitor(s, basic))
+    if key is not None and result is not None:
+        meet_cache.add(key, result)
+    return result
 
 
 def meet_simple(s: Type, t: Type, basic: BasicTypes, default_right: bool = True) -> Type:
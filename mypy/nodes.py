@@ -4,7 +4,8 @@ import re
 from abc import abstractmethod, ABCMeta
 
 from typing import (
-    Any, overload, typevar, Undefined, List, Tuple, cast, Set, Dict
+    Any, overload, typevar, Undefined, List, Tuple, cast, Set, Dict,
+    AbstractSet
 )
 
 from mypy.lex import Token
@@ -56,6 +57,15 @@ node_kinds = {
 
 implicit_module_attrs = ['__name__', '__doc__', '__file__']
 
+# Number of changes to symbol tables and class MROs so far. Cached class
+# member lookups are valid until the next change (see TypeInfo.lookup).
+symbol_table_version = 0
+
+
+def symbol_tables_changed() -> None:
+    global symbol_table_version
+    symbol_table_version += 1
+
 
 type_aliases = {
     'typing.List': '__builtins__.list',
@@ -1370,6 +1380,8 @@ class TypeInfo(SymbolNode):
     # Method Resolution Order: the order of looking up attributes. The first
     # value always to refers to self.
     mro = Undefined(List['TypeInfo'])
+    # Full names of the classes in the mro (for fast has_base checks)
+    ancestors = Undefined(AbstractSet[str])
     subtypes = Undefined(Set['TypeInfo'])  # Direct subclasses
     names = Undefined('SymbolTable')       # Names defined directly in this type
     is_abstract = False       # Does the class have any abstract attributes?
@@ -1388,6 +1400,20 @@ class TypeInfo(SymbolNode):
     # Direct base classes.
     bases = Undefined(List['mypy.types.Instance'])
 
+    # Map from a base class (including indirect bases) to the base class
+    # type with the type variables of this class as arguments. For example,
+    # for 'class C(Dict[int, T])', the base class dict is mapped to
+    # Dict[int, T]. This is filled by mypy.subtypes.supertype_mapping when
+    # the type checker first needs a mapping, since the type arguments of
+    # base classes are completed only by the last pass of semantic
+    # analysis. The mappings are not stored in the incremental build cache.
+    supertype_map = Undefined(Dict['TypeInfo', 'mypy.types.Instance'])
+
+    # Cached results of lookup (valid if member_cache_version is equal to
+    # symbol_table_version)
+    member_cache = Undefined(Dict[str, Tuple['TypeInfo', 'SymbolTableNode']])
+    member_cache_version = -1
+
     # Duck type compatibility (ducktype decorator)
     ducktype = None  # type: mypy.types.Type
 
@@ -1397,8 +1423,12 @@ class TypeInfo(SymbolNode):
         self.defn = defn
         self.subtypes = set()
         self.mro = []
+        self.ancestors = frozenset()
         self.type_vars = []
         self.bases = []
+        self.supertype_map = {}
+        self.member_cache = {}
+        self.member_cache_version = -1
         self._fullname = defn.fullname
         self.is_abstract = False
         self.abstract_attributes = []
@@ -1420,11 +1450,28 @@ class TypeInfo(SymbolNode):
         return self.type_vars is not None and len(self.type_vars) > 0
 
     def get(self, name: str) -> 'SymbolTableNode':
-        for cls in self.mro:
-            n = cls.names.get(name)
-            if n:
-                return n
-        return None
+        return self.lookup(name)[1]
+
+    def lookup(self, name: str) -> Tuple['TypeInfo', 'SymbolTableNode']:
+        """Look up a member in the MRO.
+
+        Return a tuple (defining class, symbol table node), or (None, None) if
+        the member is not found. The results are cached until a symbol table
+        or an MRO changes.
+        """
+        if self.member_cache_version != symbol_table_version:
+            self.member_cache = {}
+            self.member_cache_version = symbol_table_version
+        result = self.member_cache.get(name)
+        if result is None:
+            result = None, None
+            for cls in self.mro:
+                n = cls.names.get(name)
+                if n:
+                    result = cls, n
+                    break
+            self.member_cache[name] = result
+        return result
 
     def __getitem__(self, name: str) -> 'SymbolTableNode':
         n = self.get(name)
@@ -1452,13 +1499,9 @@ class TypeInfo(SymbolNode):
         return self.get_method(name) is not None
 
     def get_var(self, name: str) -> Var:
-        for cls in self.mro:
-            if name in cls.names:
-                node = cls.names[name].node
-                if isinstance(node, Var):
-                    return cast(Var, node)
-                else:
-                    return None
+        n = self.get(name)
+        if n and isinstance(n.node, Var):
+            return cast(Var, n.node)
         return None
 
     def get_var_or_getter(self, name: str) -> SymbolNode:
@@ -1470,13 +1513,9 @@ class TypeInfo(SymbolNode):
         return self.get_var(name)
 
     def get_method(self, name: str) -> FuncBase:
-        for cls in self.mro:
-            if name in cls.names:
-                node = cls.names[name].node
-                if isinstance(node, FuncBase):
-                    return node
-                else:
-                    return None
+        n = self.get(name)
+        if n and isinstance(n.node, FuncBase):
+            return cast(FuncBase, n.node)
         return None
 
     def calculate_mro(self) -> None:
@@ -1484,17 +1523,20 @@ class TypeInfo(SymbolNode):
 
         Raise MroError if cannot determine mro.
         """
-        self.mro = linearize_hierarchy(self)
+        self.set_mro(linearize_hierarchy(self))
+
+    def set_mro(self, mro: List['TypeInfo']) -> None:
+        """Set mro and the set of ancestor names derived from it."""
+        self.mro = mro
+        self.ancestors = frozenset(cls.fullname() for cls in mro)
+        symbol_tables_changed()
 
     def has_base(self, fullname: str) -> bool:
         """Return True if type has a base type with the specified name.
 
         This can be either via extension or via implementation.
         """
-        for cls in self.mro:
-            if cls.fullname() == fullname:
-                return True
-        return False
+        return fullname in self.ancestors
 
     def all_subtypes(self) -> 'Set[TypeInfo]':
         """Return TypeInfos of all subtypes, including this type, as a set."""
@@ -1583,6 +1625,14 @@ class SymbolTableNode:
 
 
 class SymbolTable(Dict[str, SymbolTableNode]):
+    def __setitem__(self, name: str, node: SymbolTableNode) -> None:
+        symbol_tables_changed()
+        super().__setitem__(name, node)
+
+    def __delitem__(self, name: str) -> None:
+        symbol_tables_changed()
+        super().__delitem__(name)
+
     def __str__(self) -> str:
         a = List[str]()
         for key, value in self.items():
@@ -9,10 +9,7 @@ import re
 from typing import Undefined, List, Tuple, Any, Set, cast
 
 from mypy import lex
-from mypy.lex import (
-    Token, Eof, Bom, Break, Name, Colon, Dedent, IntLit, StrLit, BytesLit,
-    UnicodeLit, FloatLit, Op, Indent, Keyword, Punct, LexError
-)
+from mypy.lex import Token, StrLit, BytesLit, UnicodeLit, LexError
 import mypy.types
 from mypy.nodes import (
     MypyFile, Import, Node, ImportAll, ImportFrom, FuncDef, OverloadedFuncDef,
@@ -62,7 +59,9 @@ none = Token('')  # Empty token
 
 
 def parse(s: str, fnam: str = None, errors: Errors = None,
-          pyversion: int = 3, custom_typing_module: str = None) -> MypyFile:
+          pyversion: int = 3, custom_typing_module: str = None,
+          lossless: bool = True,
+          lexer_backend: str = lex.REGEX_BACKEND) -> MypyFile:
     """Parse a source file, without doing any semantic analysis.
 
     Return the parse tree. If errors is not provided, raise ParseError
@@ -70,15 +69,25 @@ def parse(s: str, fnam: str = None, errors: Errors = None,
 
     The pyversion argument determines the Python syntax variant (2 for 2.x and
     3 for 3.x).
+
+    If lossless is False, do not record the tokens of the nodes (node.repr).
+    They are only needed for reproducing the source code (see mypy.output and
+    mypy.transform).
+
+    The lexer_backend argument selects the lexer implementation (see
+    lex.lex); all backends produce the same parse tree.
     """
-    parser = Parser(fnam, errors, pyversion, custom_typing_module)
+    parser = Parser(fnam, errors, pyversion, custom_typing_module, lossless,
+                    lexer_backend)
     tree = parser.parse(s)
     tree.path = fnam
     return tree
 
 
 class Parser:
-    tok = Undefined(List[Token])
+    # The tokens are analyzed as they are needed. The parser looks back at
+    # most a few tokens (see lex.TokenStream).
+    tok = Undefined(lex.TokenStream)
     ind = 0
     errors = Undefined(Errors)
     raise_on_error = False
@@ -89,12 +98,20 @@ class Parser:
     imports = Undefined(List[ImportBase])
     # Names imported from __future__.
     future_options = Undefined(List[str])
+    # Do we record the tokens of nodes (see set_repr)?
+    lossless = True
+    # Lexer implementation used for analyzing the source (see lex.lex)
+    lexer_backend = lex.REGEX_BACKEND
 
     def __init__(self, fnam: str, errors: Errors, pyversion: int,
-                 custom_typing_module: str = None) -> None:
+                 custom_typing_module: str = None,
+                 lossless: bool = True,
+                 lexer_backend: str = lex.REGEX_BACKEND) -> None:
         self.raise_on_error = errors is None
         self.pyversion = pyversion
         self.custom_typing_module = custom_typing_module
+        self.lossless = lossless
+        self.lexer_backend = lexer_backend
         if errors is not None:
             self.errors = errors
         else:
@@ -105,7 +122,7 @@ class Parser:
             self.errors.set_file('<input>')
 
     def parse(self, s: str) -> MypyFile:
-        self.tok = lex.lex(s)
+        self.tok = lex.TokenStream(s, backend=self.lexer_backend)
         self.ind = 0
         self.imports = []
         self.future_options = []
@@ -118,7 +135,7 @@ class Parser:
         """Parse a mypy source file."""
         is_bom = self.parse_bom()
         defs = self.parse_defs()
-        eof = self.expect_type(Eof)
+        eof = self.expect_kind(lex.EOF)
         node = MypyFile(defs, self.imports, is_bom)
         self.set_repr(node, noderepr.MypyFileRepr(eof))
         return node
@@ -127,9 +144,9 @@ class Parser:
 
     def parse_bom(self) -> bool:
         """Parse the optional byte order mark at the beginning of a file."""
-        if isinstance(self.current(), Bom):
-            self.expect_type(Bom)
-            if isinstance(self.current(), Break):
+        if self.current().kind == lex.BOM:
+            self.expect_kind(lex.BOM)
+            if self.current().kind == lex.BREAK:
                 self.expect_break()
             return True
         else:
@@ -149,7 +166,7 @@ class Parser:
             as_id = id
             if self.current_str() == 'as':
                 as_tok = self.expect('as')
-                name_tok = self.expect_type(Name)
+                name_tok = self.expect_kind(lex.NAME)
                 as_id = name_tok.string
                 as_names.append((as_tok, name_tok))
             else:
@@ -214,12 +231,12 @@ class Parser:
         return node
 
     def parse_import_name(self) -> Tuple[str, str, List[Token]]:
-        tok = self.expect_type(Name)
+        tok = self.expect_kind(lex.NAME)
         name = tok.string
         tokens = [tok]
         if self.current_str() == 'as':
             tokens.append(self.skip())
-            as_name = self.expect_type(Name)
+            as_name = self.expect_kind(lex.NAME)
             tokens.append(as_name)
             return name, as_name.string, tokens
         else:
@@ -232,12 +249,12 @@ class Parser:
         containing all the components of the name.
         """
         components = List[Token]()
-        tok = self.expect_type(Name)
+        tok = self.expect_kind(lex.NAME)
         n = tok.string
         components.append(tok)
         while self.current_str() == '.':
             components.append(self.expect('.'))
-            tok = self.expect_type(Name)
+            tok = self.expect_kind(lex.NAME)
             n += '.' + tok.string
             components.append(tok)
         return n, components
@@ -268,7 +285,7 @@ class Parser:
         try:
             commas, base_types = List[Token](), List[Type]()
             try:
-                name_tok = self.expect_type(Name)
+                name_tok = self.expect_kind(lex.NAME)
                 name = name_tok.string
 
                 self.errors.push_type(name)
@@ -298,7 +315,7 @@ class Parser:
             self.is_class_body = old_is_class_body
 
     def parse_super_type(self) -> Type:
-        if (isinstance(self.current(), Name) and self.current_str() != 'void'):
+        if (self.current().kind == lex.NAME and self.current_str() != 'void'):
             return self.parse_type()
         else:
             self.parse_error()
@@ -414,17 +431,17 @@ class Parser:
         name_tok = none
 
         try:
-            name_tok = self.expect_type(Name)
+            name_tok = self.expect_kind(lex.NAME)
             name = name_tok.string
 
             self.errors.push_function(name)
 
             (args, init, kinds, typ, arg_repr) = self.parse_args()
         except ParseError:
-            if not isinstance(self.current(), Break):
+            if self.current().kind != lex.BREAK:
                 self.ind -= 1  # Kludge: go back to the Break token
             # Resynchronise parsing by going back over :, if present.
-            if isinstance(self.tok[self.ind - 1], Colon):
+            if self.tok[self.ind - 1].kind == lex.COLON:
                 self.ind -= 1
             return (name, [], [], [], None, True, (name_tok, None))
 
@@ -519,7 +536,7 @@ class Parser:
                         self.parse_error()
                     asterisk.append(self.skip())
                     isdict = asterisk[-1].string == '**'
-                    name = self.expect_type(Name)
+                    name = self.expect_kind(lex.NAME)
                     arg_names.append(name)
                     names.append(name.string)
                     var_arg = Var(name.string)
@@ -534,7 +551,7 @@ class Parser:
                     arg_types.append(self.parse_arg_type(allow_signature))
                     require_named = True
                 else:
-                    name = self.expect_type(Name)
+                    name = self.expect_kind(lex.NAME)
                     arg_names.append(name)
                     args.append(Var(name.string))
                     arg_types.append(self.parse_arg_type(allow_signature))
@@ -600,7 +617,7 @@ class Parser:
 
     def parse_block(self, allow_type: bool = False) -> Tuple[Block, Type]:
         colon = self.expect(':')
-        if not isinstance(self.current(), Break):
+        if self.current().kind != lex.BREAK:
             # Block immediately after ':'.
             node = Block([self.parse_statement()]).set_line(colon)
             self.set_repr(node, noderepr.BlockRepr(colon, none, none, none))
@@ -611,8 +628,8 @@ class Parser:
             type = self.parse_type_comment(br, signature=True)
             indent = self.expect_indent()
             stmt = []  # type: List[Node]
-            while (not isinstance(self.current(), Dedent) and
-                   not isinstance(self.current(), Eof)):
+            while (self.current().kind != lex.DEDENT and
+                   self.current().kind != lex.EOF):
                 try:
                     s = self.parse_statement()
                     if s is not None:
@@ -621,7 +638,7 @@ class Parser:
                 except ParseError:
                     pass
             dedent = none
-            if isinstance(self.current(), Dedent):
+            if self.current().kind == lex.DEDENT:
                 dedent = self.skip()
             node = Block(stmt).set_line(colon)
             self.set_repr(node, noderepr.BlockRepr(colon, br, indent, dedent))
@@ -737,7 +754,7 @@ class Parser:
     def parse_return_stmt(self) -> ReturnStmt:
         return_tok = self.expect('return')
         expr = None  # type: Node
-        if not isinstance(self.current(), Break):
+        if self.current().kind != lex.BREAK:
             expr = self.parse_expression()
         br = self.expect_break()
         node = ReturnStmt(expr)
@@ -749,7 +766,7 @@ class Parser:
         expr = None  # type: Node
         from_expr = None  # type: Node
         from_tok = none
-        if not isinstance(self.current(), Break):
+        if self.current().kind != lex.BREAK:
             expr = self.parse_expression()
             if self.current_str() == 'from':
                 from_tok = self.expect('from')
@@ -770,7 +787,7 @@ class Parser:
     def parse_yield_stmt(self) -> YieldStmt:
         yield_tok = self.expect('yield')
         expr = None  # type: Node
-        if not isinstance(self.current(), Break):
+        if self.current().kind != lex.BREAK:
             expr = self.parse_expression()
         br = self.expect_break()
         node = YieldStmt(expr)
@@ -812,7 +829,7 @@ class Parser:
         name_toks = List[Token]()
         commas = List[Token]()
         while True:
-            n = self.expect_type(Name)
+            n = self.expect_kind(lex.NAME)
             names.append(n.string)
             name_toks.append(n)
             if self.current_str() != ',':
@@ -939,7 +956,7 @@ class Parser:
                                                        List[Token]())
         while self.current_str() == 'except':
             except_toks.append(self.expect('except'))
-            if not isinstance(self.current(), Colon):
+            if self.current().kind != lex.COLON:
                 try:
                     t = self.current()
                     types.append(self.parse_expression().set_line(t))
@@ -1006,7 +1023,7 @@ class Parser:
     def parse_print_stmt(self) -> PrintStmt:
         self.expect('print')
         args = List[Node]()
-        while not isinstance(self.current(), Break):
+        while self.current().kind != lex.BREAK:
             args.append(self.parse_expression(precedence[',']))
             if self.current_str() == ',':
                 comma = True
@@ -1040,18 +1057,18 @@ class Parser:
         elif s == '{':
             expr = self.parse_dict_or_set_expr()
         else:
-            if isinstance(self.current(), Name):
+            if self.current().kind == lex.NAME:
                 # Name expression.
                 expr = self.parse_name_expr()
-            elif isinstance(self.current(), IntLit):
+            elif self.current().kind == lex.INT_LIT:
                 expr = self.parse_int_expr()
-            elif isinstance(self.current(), StrLit):
+            elif self.current().kind == lex.STR_LIT:
                 expr = self.parse_str_expr()
-            elif isinstance(self.current(), BytesLit):
+            elif self.current().kind == lex.BYTES_LIT:
                 expr = self.parse_bytes_literal()
-            elif isinstance(self.current(), UnicodeLit):
+            elif self.current().kind == lex.UNICODE_LIT:
                 expr = self.parse_unicode_literal()
-            elif isinstance(self.current(), FloatLit):
+            elif self.current().kind == lex.FLOAT_LIT:
                 expr = self.parse_float_expr()
             else:
                 # Invalid expression.
@@ -1100,7 +1117,7 @@ class Parser:
                     break
             else:
                 # Binary operation or a special case.
-                if isinstance(self.current(), Op):
+                if self.current().kind == lex.OP:
                     op = self.current_str()
                     op_prec = precedence[op]
                     if op == 'not':
@@ -1259,7 +1276,7 @@ class Parser:
         while True:
             commas.append(self.expect(','))
             if (self.current_str() in [')', ']', '='] or
-                    isinstance(self.current(), Break)):
+                    self.current().kind == lex.BREAK):
                 break
             items.append(self.parse_expression(prec))
             if self.current_str() != ',': break
@@ -1268,14 +1285,14 @@ class Parser:
         return node
 
     def parse_name_expr(self) -> NameExpr:
-        tok = self.expect_type(Name)
+        tok = self.expect_kind(lex.NAME)
         node = NameExpr(tok.string)
         node.set_line(tok)
         self.set_repr(node, noderepr.NameExprRepr(tok))
         return node
 
     def parse_int_expr(self) -> IntExpr:
-        tok = self.expect_type(IntLit)
+        tok = self.expect_kind(lex.INT_LIT)
         s = tok.string
         v = 0
         if len(s) > 2 and s[1] in 'xX':
@@ -1290,9 +1307,9 @@ class Parser:
 
     def parse_str_expr(self) -> Node:
         # XXX \uxxxx literals
-        tok = [self.expect_type(StrLit)]
+        tok = [self.expect_kind(lex.STR_LIT)]
         value = (cast(StrLit, tok[0])).parsed()
-        while isinstance(self.current(), StrLit):
+        while self.current().kind == lex.STR_LIT:
             t = cast(StrLit, self.skip())
             tok.append(t)
             value += t.parsed()
@@ -1306,9 +1323,9 @@ class Parser:
 
     def parse_bytes_literal(self) -> Node:
         # XXX \uxxxx literals
-        tok = [self.expect_type(BytesLit)]
+        tok = [self.expect_kind(lex.BYTES_LIT)]
         value = (cast(BytesLit, tok[0])).parsed()
-        while isinstance(self.current(), BytesLit):
+        while self.current().kind == lex.BYTES_LIT:
             t = cast(BytesLit, self.skip())
             tok.append(t)
             value += t.parsed()
@@ -1321,9 +1338,9 @@ class Parser:
 
     def parse_unicode_literal(self) -> Node:
         # XXX \uxxxx literals
-        tok = [self.expect_type(UnicodeLit)]
+        tok = [self.expect_kind(lex.UNICODE_LIT)]
         value = (cast(UnicodeLit, tok[0])).parsed()
-        while isinstance(self.current(), UnicodeLit):
+        while self.current().kind == lex.UNICODE_LIT:
             t = cast(UnicodeLit, self.skip())
             tok.append(t)
             value += t.parsed()
@@ -1336,7 +1353,7 @@ class Parser:
         return node
 
     def parse_float_expr(self) -> FloatExpr:
-        tok = self.expect_type(FloatLit)
+        tok = self.expect_kind(lex.FLOAT_LIT)
         node = FloatExpr(float(tok.string))
         self.set_repr(node, noderepr.FloatExprRepr(tok))
         return node
@@ -1376,9 +1393,9 @@ class Parser:
         dict_arg = False
         named_args = False
         while self.current_str() != ')' and not self.eol() and not dict_arg:
-            if isinstance(self.current(), Name) and self.peek().string == '=':
+            if self.current().kind == lex.NAME and self.peek().string == '=':
                 # Named argument
-                name = self.expect_type(Name)
+                name = self.expect_kind(lex.NAME)
                 assign = self.expect('=')
                 kinds.append(nodes.ARG_NAMED)
                 names.append(name.string)
@@ -1411,16 +1428,17 @@ class Parser:
 
     def parse_member_expr(self, expr: Any) -> Node:
         dot = self.expect('.')
-        name = self.expect_type(Name)
+        name = self.expect_kind(lex.NAME)
         node = Undefined(Node)
         if (isinstance(expr, CallExpr) and isinstance(expr.callee, NameExpr)
                 and expr.callee.name == 'super'):
             # super() expression
             node = SuperExpr(name.string)
-            self.set_repr(node,
-                          noderepr.SuperExprRepr(expr.callee.repr.id,
-                                                 expr.repr.lparen,
-                                                 expr.repr.rparen, dot, name))
+            if self.lossless:
+                self.set_repr(node, noderepr.SuperExprRepr(expr.callee.repr.id,
+                                                           expr.repr.lparen,
+                                                           expr.repr.rparen,
+                                                           dot, name))
         else:
             node = MemberExpr(expr, name.string)
             self.set_repr(node, noderepr.MemberExprRepr(dot, name))
@@ -1453,7 +1471,7 @@ class Parser:
         return node
 
     def parse_bin_op_expr(self, left: Node, prec: int) -> OpExpr:
-        op = self.expect_type(Op)
+        op = self.expect_kind(lex.OP)
         op2 = none
         op_str = op.string
         if op_str == 'not':
@@ -1533,8 +1551,8 @@ class Parser:
             self.parse_error()
 
     def expect_indent(self) -> Token:
-        if isinstance(self.current(), Indent):
-            return self.expect_type(Indent)
+        if self.current().kind == lex.INDENT:
+            return self.expect_kind(lex.INDENT)
         else:
             self.fail('Expected an indented block', self.current().line)
             return none
@@ -1542,21 +1560,21 @@ class Parser:
     def fail(self, msg: str, line: int) -> None:
         self.errors.report(line, msg)
 
-    def expect_type(self, typ: type) -> Token:
-        if isinstance(self.current(), typ):
+    def expect_kind(self, kind: int) -> Token:
+        if self.current().kind == kind:
             self.ind += 1
             return self.tok[self.ind - 1]
         else:
             self.parse_error()
 
     def expect_colon_and_break(self) -> Tuple[Token, Token]:
-        return self.expect_type(Colon), self.expect_type(Break)
+        return self.expect_kind(lex.COLON), self.expect_kind(lex.BREAK)
 
     def expect_break(self) -> Token:
-        return self.expect_type(Break)
+        return self.expect_kind(lex.BREAK)
 
     def expect_end(self) -> Tuple[Token, Token]:
-        return self.expect('end'), self.expect_type(Break)
+        return self.expect('end'), self.expect_kind(lex.BREAK)
 
     def current(self) -> Token:
         return self.tok[self.ind]
@@ -1576,7 +1594,7 @@ class Parser:
         if isinstance(tok, LexError):
             msg = token_repr(tok)
             msg = msg[0].upper() + msg[1:]
-        elif isinstance(tok, Indent) or isinstance(tok, Dedent):
+        elif tok.kind == lex.INDENT or tok.kind == lex.DEDENT:
             msg = 'Inconsistent indentation'
         else:
             msg = 'Parse error before {}'.format(token_repr(tok))
@@ -1588,30 +1606,31 @@ class Parser:
 
     def skip_until_break(self) -> None:
         n = 0
-        while (not isinstance(self.current(), Break)
-               and not isinstance(self.current(), Eof)):
+        while (self.current().kind != lex.BREAK
+               and self.current().kind != lex.EOF):
             self.skip()
             n += 1
-        if isinstance(self.tok[self.ind - 1], Colon) and n > 1:
+        if self.tok[self.ind - 1].kind == lex.COLON and n > 1:
             self.ind -= 1
 
     def skip_until_next_line(self) -> None:
         self.skip_until_break()
-        if isinstance(self.current(), Break):
+        if self.current().kind == lex.BREAK:
             self.skip()
 
     def eol(self) -> bool:
-        return isinstance(self.current(), Break) or self.eof()
+        return self.current().kind == lex.BREAK or self.eof()
 
     def eof(self) -> bool:
-        return isinstance(self.current(), Eof)
+        return self.current().kind == lex.EOF
 
     # Type annotation related functionality
 
     def parse_type(self) -> Type:
         line = self.current().line
         try:
-            typ, self.ind = parse_type(self.tok, self.ind)
+            # The type parser only indexes the tokens.
+            typ, self.ind = parse_type(cast(List[Token], self.tok), self.ind)
         except TypeParseError as e:
             self.parse_error_at(e.token)
             raise ParseError()
@@ -1651,7 +1670,8 @@ class Parser:
     # Representation management
 
     def set_repr(self, node: Node, repr: Any) -> None:
-        node.repr = repr
+        if self.lossless:
+            node.repr = repr
 
     def repr(self, node: Node) -> Any:
         return node.repr
@@ -1675,24 +1695,24 @@ class ParseError(Exception): pass
 
 def token_repr(tok: Token) -> str:
     """Return a representation of a token for use in parse error messages."""
-    if isinstance(tok, Break):
+    kind = tok.kind
+    if kind == lex.BREAK:
         return 'end of line'
-    elif isinstance(tok, Eof):
+    elif kind == lex.EOF:
         return 'end of file'
-    elif isinstance(tok, Keyword) or isinstance(tok, Name):
+    elif kind == lex.KEYWORD or kind == lex.NAME:
         return '"{}"'.format(tok.string)
-    elif isinstance(tok, IntLit) or isinstance(tok, FloatLit):
+    elif kind == lex.INT_LIT or kind == lex.FLOAT_LIT:
         return 'numeric literal'
-    elif isinstance(tok, StrLit):
+    elif kind == lex.STR_LIT:
         return 'string literal'
-    elif (isinstance(tok, Punct) or isinstance(tok, Op)
-          or isinstance(tok, Colon)):
+    elif kind == lex.PUNCT or kind == lex.OP or kind == lex.COLON:
         return tok.string
-    elif isinstance(tok, Bom):
+    elif kind == lex.BOM:
         return 'byte order mark'
-    elif isinstance(tok, Indent):
+    elif kind == lex.INDENT:
         return 'indent'
-    elif isinstance(tok, Dedent):
+    elif kind == lex.DEDENT:
         return 'dedent'
     else:
         if isinstance(tok, LexError):
@@ -0,0 +1,344 @@
+"""Throughput benchmark of the lexer and the parser.
+
+Lex and parse a fixed corpus of source files (the library stubs, the Python
+library modules under lib-python and the mypy implementation itself) and
+report the throughput in tokens and parse tree nodes per second, the peak
+memory used while parsing a file and the files that are processed most
+slowly. The results can be saved as JSON and used as a baseline for later
+runs:
+
+  python -m mypy.parsebench --json baseline.json
+  (change the lexer or the parser)
+  python -m mypy.parsebench --baseline baseline.json
+
+Run it from the root of the repository.
+"""
+
+import json
+import os
+import os.path
+import sys
+import time
+
+from typing import Any, Dict, List, Tuple
+
+from mypy import lex
+from mypy.parse import parse
+from mypy.buildstats import count_nodes
+from mypy.errors import CompileError
+
+try:
+    import tracemalloc
+    has_tracemalloc = True
+except ImportError:
+    # Memory use is not measured before Python 3.4.
+    has_tracemalloc = False
+
+
+# The directories of the corpus, relative to the root of the repository
+CORPUS_DIRS = ['stubs', os.path.join('lib-python', '3.2'), 'mypy']
+
+# Files with fewer tokens than this are not reported as outliers, since the
+# fixed per-file overhead dominates their throughput.
+OUTLIER_MIN_TOKENS = 200
+
+# Parse times of individual files that change more than this (relative to
+# the baseline) are reported when comparing against a baseline.
+CHANGE_THRESHOLD = 0.25
+
+
+class FileResult:
+    """Benchmark results of a single file.
+
+    Times are the fastest of the repeated runs, in seconds. If the file
+    could not be parsed, error is the last error message and only the
+    token count is valid.
+    """
+
+    tokens = 0
+    nodes = 0
+    lex_time = 0.0
+    parse_time = 0.0
+    memory = 0          # Peak memory allocated while parsing (bytes)
+    error = None  # type: str
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+    def parse_rate(self) -> float:
+        """Return the number of tokens parsed per second."""
+        return rate(self.tokens, self.parse_time)
+
+    def to_json(self) -> Dict[str, Any]:
+        return {'path': self.path,
+                'tokens': self.tokens,
+                'nodes': self.nodes,
+                'lex': self.lex_time,
+                'parse': self.parse_time,
+                'memory': self.memory,
+                'error': self.error}
+
+
+class BenchmarkResult:
+    """Benchmark results of a corpus."""
+
+    def __init__(self, files: List[FileResult],
+                 measure_memory: bool) -> None:
+        self.files = files
+        self.measure_memory = measure_memory
+
+    def parsed_files(self) -> List[FileResult]:
+        return [f for f in self.files if f.error is None]
+
+    def failed_files(self) -> List[FileResult]:
+        return [f for f in self.files if f.error is not None]
+
+    def totals(self) -> Dict[str, Any]:
+        """Return the totals of the files that could be parsed.
+
+        The rates are in tokens or nodes per second, and the peak memory is
+        the largest peak of a single file (or None if memory use was not
+        measured).
+        """
+        files = self.parsed_files()
+        tokens = sum(f.tokens for f in files)
+        nodes = sum(f.nodes for f in files)
+        lex_time = sum(f.lex_time for f in files)
+        parse_time = sum(f.parse_time for f in files)
+        memory = None  # type: int
+        if self.measure_memory:
+            memory = max([f.memory for f in files] or [0])
+        return {'files': len(files),
+                'tokens': tokens,
+                'nodes': nodes,
+                'lex': lex_time,
+                'parse': parse_time,
+                'tokens_per_second': rate(tokens, lex_time),
+                'nodes_per_second': rate(nodes, parse_time),
+                'peak_memory': memory}
+
+    def outliers(self, n: int) -> List[FileResult]:
+        """Return at most n files with the lowest parse throughput."""
+        files = [f for f in self.parsed_files()
+                 if f.tokens >= OUTLIER_MIN_TOKENS]
+        return sorted(files, key=lambda f: (f.parse_rate(), f.path))[:n]
+
+    def format_report(self, n: int = 10) -> List[str]:
+        totals = self.totals()
+        lines = ['files          {}'.format(totals['files']),
+                 'tokens         {}'.format(totals['tokens']),
+                 'nodes          {}'.format(totals['nodes']),
+                 'lex time       {:.1f} ms'.format(totals['lex'] * 1000),
+                 'parse time     {:.1f} ms'.format(totals['parse'] * 1000),
+                 'tokens/sec     {:.0f}'.format(totals['tokens_per_second']),
+                 'nodes/sec      {:.0f}'.format(totals['nodes_per_second'])]
+        if totals['peak_memory'] is not None:
+            lines.append('peak memory    {:.1f} KiB'.format(
+                totals['peak_memory'] / 1024))
+        outliers = self.outliers(n)
+        if outliers:
+            lines.append('')
+            lines.append('slowest files (tokens parsed per second):')
+            average = rate(totals['tokens'], totals['parse'])
+            for f in outliers:
+                lines.append('  {:>9.0f}  {:>5.2f}x  {}'.format(
+                    f.parse_rate(), f.parse_rate() / average, f.path))
+        failed = self.failed_files()
+        if failed:
+            lines.append('')
+            lines.append('files that could not be parsed:')
+            for f in failed:
+                lines.append('  ' + f.error)
+        return lines
+
+    def format_json(self) -> str:
+        return json.dumps({'total': self.totals(),
+                           'files': [f.to_json() for f in self.files]},
+                          indent=2, sort_keys=True)
+
+    def format_comparison(self, baseline: Dict[str, Any]) -> List[str]:
+        """Compare the results against a baseline (see format_json)."""
+        old_totals = baseline['total']
+        totals = self.totals()
+        lines = List[str]()
+        for key, label in [('tokens_per_second', 'tokens/sec'),
+                           ('nodes_per_second', 'nodes/sec'),
+                           ('peak_memory', 'peak memory')]:
+            old = old_totals.get(key)
+            new = totals[key]
+            if old and new is not None:
+                lines.append('{:<14} {:>12.0f} -> {:>12.0f}  {:+.1f}%'.format(
+                    label, old, new, (new / old - 1) * 100))
+        old_files = Dict[str, Dict[str, Any]]()
+        for data in baseline['files']:
+            old_files[data['path']] = data
+        changed = List[Tuple[float, str]]()
+        for f in self.parsed_files():
+            old_file = old_files.get(f.path)
+            if (old_file is None or not old_file['parse']
+                    or f.tokens < OUTLIER_MIN_TOKENS):
+                continue
+            ratio = f.parse_time / old_file['parse']
+            if abs(ratio - 1) > CHANGE_THRESHOLD:
+                changed.append((ratio, f.path))
+        if changed:
+            lines.append('')
+            lines.append('files whose parse time changed by more than '
+                         '{:.0f}%:'.format(CHANGE_THRESHOLD * 100))
+            for ratio, path in sorted(changed, reverse=True):
+                lines.append('  {:+7.1f}%  {}'.format((ratio - 1) * 100,
+                                                     path))
+        return lines
+
+
+def rate(count: float, seconds: float) -> float:
+    """Return count per second (0 if no time was measured)."""
+    if seconds <= 0.0:
+        return 0.0
+    return count / seconds
+
+
+def corpus_files(base_dir: str = '.') -> List[str]:
+    """Return the paths of the source files of the corpus, relative to
+    base_dir."""
+    result = List[str]()
+    for corpus_dir in CORPUS_DIRS:
+        for root, dirs, files in os.walk(os.path.join(base_dir, corpus_dir)):
+            for name in files:
+                if name.endswith('.py'):
+                    path = os.path.join(root, name)
+                    result.append(os.path.relpath(path, base_dir))
+    return sorted(result)
+
+
+def pyversion_for_path(path: str) -> int:
+    """Return the Python syntax variant of a corpus file."""
+    if '2.7' in path.split(os.sep):
+        return 2
+    return 3
+
+
+def benchmark_file(path: str, base_dir: str = '.', repeat: int = 3,
+                   backend: str = lex.REGEX_BACKEND,
+                   measure_memory: bool = True) -> FileResult:
+    """Lex and parse a file repeat times and return the results.
+
+    The lexer backend is used both for lexing and for parsing.
+    """
+    result = FileResult(path)
+    with open(os.path.join(base_dir, path)) as f:
+        text = f.read()
+    pyversion = pyversion_for_path(path)
+
+    lex_times = List[float]()
+    for i in range(repeat):
+        t0 = time.time()
+        tokens = lex.lex(text, backend=backend)
+        lex_times.append(time.time() - t0)
+    result.lex_time = min(lex_times)
+    result.tokens = len(tokens)
+
+    parse_times = List[float]()
+    try:
+        for i in range(repeat):
+            t0 = time.time()
+            tree = parse(text, path, pyversion=pyversion,
+                         lexer_backend=backend)
+            parse_times.append(time.time() - t0)
+    except CompileError as e:
+        result.error = e.messages[-1] if e.messages else 'parse error'
+        return result
+    result.parse_time = min(parse_times)
+    result.nodes = count_nodes(tree)
+
+    if measure_memory and has_tracemalloc:
+        # Tracing slows down allocation, so measure memory use separately
+        # from the timing runs.
+        tracemalloc.start()
+        try:
+            parse(text, path, pyversion=pyversion, lexer_backend=backend)
+            result.memory = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return result
+
+
+def run_benchmark(paths: List[str], base_dir: str = '.', repeat: int = 3,
+                  backend: str = lex.REGEX_BACKEND,
+                  measure_memory: bool = True) -> BenchmarkResult:
+    """Benchmark the lexer and the parser on the given files."""
+    measure_memory = measure_memory and has_tracemalloc
+    files = [benchmark_file(path, base_dir, repeat, backend, measure_memory)
+             for path in paths]
+    return BenchmarkResult(files, measure_memory)
+
+
+def main(args: List[str]) -> None:
+    json_path = None  # type: str
+    baseline_path = None  # type: str
+    repeat = 3
+    outliers = 10
+    backend = lex.REGEX_BACKEND
+    measure_memory = True
+    while args:
+        if args[0] == '--json' and len(args) >= 2:
+            json_path = args[1]
+            args = args[2:]
+        elif args[0] == '--baseline' and len(args) >= 2:
+            baseline_path = args[1]
+            args = args[2:]
+        elif args[0] in ('-n', '--repeat') and len(args) >= 2:
+            repeat = int(args[1])
+            args = args[2:]
+        elif args[0] == '--outliers' and len(args) >= 2:
+            outliers = int(args[1])
+            args = args[2:]
+        elif args[0] == '--backend' and len(args) >= 2:
+            backend = args[1]
+            if backend not in lex.BACKENDS:
+                usage('Unknown lexer backend: {}'.format(backend))
+            args = args[2:]
+        elif args[0] == '--no-memory':
+            measure_memory = False
+            args = args[1:]
+        else:
+            usage()
+
+    result = run_benchmark(corpus_files(), repeat=repeat, backend=backend,
+                           measure_memory=measure_memory)
+    for line in result.format_report(outliers):
+        print(line)
+    if baseline_path:
+        with open(baseline_path) as f:
+            baseline = json.load(f)
+        print()
+        print('compared to {}:'.format(baseline_path))
+        for line in result.format_comparison(baseline):
+            print(line)
+    if json_path:
+        with open(json_path, 'w') as f:
+            f.write(result.format_json())
+
+
+def usage(msg: str = None) -> None:
+    if msg:
+        sys.stderr.write('{}\n'.format(msg))
+    sys.stderr.write(
+"""usage: python -m mypy.parsebench [option ...]
+
+Lex and parse the files under {} and report throughput.
+
+Options:
+  --json FILE       write the results as JSON to FILE (usable as a baseline)
+  --baseline FILE   compare the results to a baseline written using --json
+  -n, --repeat N    time N runs of each file and use the fastest (default 3)
+  --outliers N      report the N slowest files (default 10)
+  --backend NAME    lexer backend used for lexing and parsing: regex
+                    (default) or dispatch
+  --no-memory       do not measure memory use
+""".format(', '.join(CORPUS_DIRS)))
+    sys.exit(2)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -6,7 +6,7 @@ from mypy.types import (
     Type, UnboundType, TupleType, UnionType, TypeList, AnyType, Callable
 )
 from mypy.typerepr import CommonTypeRepr, ListTypeRepr
-from mypy.lex import Token, Name, StrLit, Break, lex
+from mypy.lex import Token, StrLit, NAME, STR_LIT, lex
 from mypy import nodes
 
 
@@ -51,13 +51,13 @@ class TypeParser:
     def parse_type(self) -> Type:
         """Parse a type."""
         t = self.current_token()
-        if isinstance(t, Name):
+        if t.kind == NAME:
             return self.parse_named_type()
         elif t.string == '[':
             return self.parse_type_list()
-        elif isinstance(t, StrLit):
+        elif t.kind == STR_LIT:
             # Type escaped as string literal.
-            typestr = t.parsed()
+            typestr = cast(StrLit, t).parsed()
             line = t.line
             self.skip()
             try:
@@ -103,12 +103,12 @@ class TypeParser:
         name = ''
         components = []  # type: List[Token]
 
-        components.append(self.expect_type(Name))
+        components.append(self.expect_kind(NAME))
         name += components[-1].string
 
         while self.current_token_str() == '.':
             components.append(self.skip())
-            t = self.expect_type(Name)
+            t = self.expect_kind(NAME)
             components.append(t)
             name += '.' + t.string
 
@@ -145,8 +145,8 @@ class TypeParser:
         else:
             self.parse_error()
 
-    def expect_type(self, typ: type) -> Token:
-        if isinstance(self.current_token(), typ):
+    def expect_kind(self, kind: int) -> Token:
+        if self.current_token().kind == kind:
             self.ind += 1
             return self.tok[self.ind - 1]
         else:
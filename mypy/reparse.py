@@ -0,0 +1,323 @@
+"""Incremental reparsing of edited source files.
+
+An editor checks a file again after every few keystrokes. Instead of
+parsing the whole file after each edit, SourceTree lexes and parses only the
+top-level statements affected by the edit and splices them into the
+existing parse tree.
+
+Parsing can be restarted at a top-level statement that starts at the
+beginning of a line after a line break (a restart point): the lexer has no
+open brackets or indentation there, and the parser is not inside any
+statement. Parsing starts at the last restart point before the edit, and it
+stops at the first restart point after the edit where an old statement
+started. The rest of the old statements are reused, after adjusting their
+line numbers.
+"""
+
+import bisect
+import re
+
+from typing import Undefined, Dict, List, Set, Any, cast
+
+from mypy import lex
+from mypy.parse import Parser, ParseError
+from mypy.nodes import (
+    Context, MypyFile, Node, Decorator, OverloadedFuncDef, ImportBase,
+    ImportFrom
+)
+from mypy import noderepr
+
+
+# A carriage return that is not part of a CR LF sequence. Line numbers are
+# computed based on line feeds only, so files that contain these are always
+# parsed from scratch.
+lone_cr_exp = re.compile('\r(?!\n)')
+
+
+class SourceTree:
+    """The parse tree of a source file, updated after edits of the file.
+
+    The tree is updated in place, so it must not be semantically analyzed.
+
+    Attributes:
+      text:   Current source text
+      tree:   Parse tree of text
+      starts: Line numbers of the statements in tree.defs
+      restartable: For each statement in tree.defs, does it start at a
+              restart point?
+      contexts: For each statement in tree.defs, the nodes and types within
+              it that have line numbers (None if not collected yet); these
+              are adjusted when lines are added or removed before them
+    """
+
+    text = ''
+    tree = Undefined(MypyFile)
+    starts = Undefined(List[int])
+    restartable = Undefined(List[bool])
+    contexts = Undefined(List[List[Any]])
+    # Offsets of the beginnings of lines in text
+    line_offsets = Undefined(List[int])
+
+    def __init__(self, text: str, fnam: str = None, pyversion: int = 3,
+                 custom_typing_module: str = None,
+                 lossless: bool = True) -> None:
+        self.fnam = fnam
+        self.pyversion = pyversion
+        self.custom_typing_module = custom_typing_module
+        self.lossless = lossless
+        self.parse_all(text)
+
+    def edit(self, start: int, end: int, replacement: str) -> MypyFile:
+        """Replace text[start:end] with replacement and update the tree.
+
+        Return the updated tree. If there are parse errors, raise
+        CompileError and leave the source tree as it was.
+        """
+        text = self.text[:start] + replacement + self.text[end:]
+        if lone_cr_exp.search(text):
+            return self.parse_all(text)
+        offsets = self.line_offsets
+        first_line = bisect.bisect_right(offsets, start)
+        last_line = bisect.bisect_right(offsets, end)
+        new_offsets = offsets[:first_line]
+        new_offsets.extend(start + m.end()
+                           for m in re.finditer('\n', replacement))
+        delta = len(replacement) - (end - start)
+        new_offsets.extend(offset + delta for offset in offsets[last_line:])
+        line_delta = len(new_offsets) - len(offsets)
+
+        # Map from the line numbers (in the new text) of old statements that
+        # follow the edit to their indices.
+        sync_lines = Dict[int, int]()
+        for i in range(len(self.starts) - 1, -1, -1):
+            if self.starts[i] <= last_line:
+                break
+            if self.restartable[i]:
+                sync_lines[self.starts[i] + line_delta] = i
+
+        defs = self.tree.defs
+        before = first_line
+        while True:
+            restart = self.restart_index(before)
+            if restart == 0:
+                restart_line = 1
+                restart_offset = 0
+            else:
+                restart_line = self.starts[restart]
+                restart_offset = offsets[restart_line - 1]
+            parser = IncrementalParser(self.fnam, self.pyversion,
+                                       self.custom_typing_module,
+                                       self.lossless, sync_lines, defs)
+            new_defs = parser.parse_region(text[restart_offset:],
+                                           restart_line, restart == 0)
+            if (restart > 0 and new_defs and
+                    continues_overload(defs[restart - 1], new_defs[0])):
+                # The first new statement is part of an overloaded function
+                # that starts before it.
+                before = restart_line
+                continue
+            break
+
+        sync = parser.sync_index
+        if sync < 0:
+            sync = len(defs)
+            sync_line = 0
+        else:
+            sync_line = self.starts[sync]
+        prefix_imports = List[ImportBase]()
+        suffix_imports = List[ImportBase]()
+        future_import = parser.future_options != []
+        for imp in self.tree.imports:
+            if imp.line < restart_line:
+                prefix_imports.append(imp)
+            elif sync_line and imp.line >= sync_line:
+                suffix_imports.append(imp)
+            elif (isinstance(imp, ImportFrom) and
+                    cast(ImportFrom, imp).id == '__future__'):
+                future_import = True
+        if future_import:
+            # A __future__ import in the edited region may affect the parsing
+            # of the rest of the file.
+            return self.parse_all(text)
+
+        suffix = defs[sync:]
+        if line_delta:
+            for i in range(sync, len(defs)):
+                if self.contexts[i] is None:
+                    self.contexts[i] = line_contexts(defs[i])
+                for context in self.contexts[i]:
+                    context.line += line_delta
+
+        tree = self.tree
+        tree.defs = defs[:restart] + new_defs + suffix
+        tree.imports = prefix_imports + parser.imports + suffix_imports
+        if restart == 0:
+            tree.is_bom = parser.is_bom
+        if parser.sync_index < 0 and self.lossless:
+            tree.repr = noderepr.MypyFileRepr(parser.eof_token)
+        self.starts = (self.starts[:restart] + parser.starts +
+                       [line + line_delta for line in self.starts[sync:]])
+        self.restartable = (self.restartable[:restart] +
+                            parser.restartable + self.restartable[sync:])
+        self.contexts = (self.contexts[:restart] +
+                         [None] * len(new_defs) + self.contexts[sync:])
+        self.text = text
+        self.line_offsets = new_offsets
+        return tree
+
+    def parse_all(self, text: str) -> MypyFile:
+        """Parse a source text from scratch."""
+        parser = IncrementalParser(self.fnam, self.pyversion,
+                                   self.custom_typing_module, self.lossless)
+        tree = parser.parse(text)
+        tree.path = self.fnam
+        self.text = text
+        self.tree = tree
+        self.starts = parser.starts
+        self.restartable = parser.restartable
+        self.contexts = [None] * len(tree.defs)
+        self.line_offsets = [0] + [m.end() for m in re.finditer('\n', text)]
+        return tree
+
+    def restart_index(self, before: int) -> int:
+        """Return the index of the last statement that starts at a restart
+        point before a line.
+
+        Return 0 if there is no such statement (the file is then parsed
+        from the beginning).
+        """
+        i = bisect.bisect_left(self.starts, before) - 1
+        while i > 0 and not self.restartable[i]:
+            i -= 1
+        return max(i, 0)
+
+
+class IncrementalParser(Parser):
+    """Parser that records the restart points of top-level statements.
+
+    The parser can also parse a region of a file that starts at a restart
+    point, stopping at a restart point where parsing can continue with old
+    statements (sync_lines).
+    """
+
+    # Line numbers of the top-level statements
+    starts = Undefined(List[int])
+    # For each top-level statement, does it start at a restart point?
+    restartable = Undefined(List[bool])
+    # Map from line number to the index of an old statement that starts at
+    # the line, if the line is a restart point
+    sync_lines = Undefined(Dict[int, int])
+    # The top-level statements of the old tree
+    old_defs = Undefined(List[Node])
+    # Index of the old statement at which parsing stopped (-1 if parsing
+    # reached the end of the file)
+    sync_index = -1
+    is_bom = False
+    eof_token = Undefined(lex.Token)
+
+    def __init__(self, fnam: str, pyversion: int,
+                 custom_typing_module: str, lossless: bool,
+                 sync_lines: Dict[int, int] = None,
+                 old_defs: List[Node] = None) -> None:
+        super().__init__(fnam, None, pyversion, custom_typing_module,
+                         lossless)
+        self.starts = []
+        self.restartable = []
+        self.sync_lines = sync_lines or {}
+        self.old_defs = old_defs or []
+
+    def parse_region(self, s: str, first_line: int,
+                     at_start: bool) -> List[Node]:
+        """Parse the top-level statements of a region of a file.
+
+        The region starts at a restart point at first_line (or at the start
+        of the file), and it ends at a sync point or at the end of the file.
+        Raise CompileError if there are parse errors.
+        """
+        self.tok = lex.TokenStream(s, first_line, self.lexer_backend)
+        # The region usually ends soon after the edit.
+        self.tok.chunk_size = 1024
+        self.ind = 0
+        self.imports = []
+        self.future_options = []
+        if at_start:
+            self.is_bom = self.parse_bom()
+        defs = self.parse_defs()
+        if self.sync_index < 0:
+            self.eof_token = self.expect_kind(lex.EOF)
+        if self.errors.is_errors():
+            self.errors.raise_error()
+        return defs
+
+    def parse_defs(self) -> List[Node]:
+        defs = List[Node]()
+        while not self.eof():
+            restartable = self.at_restart_point()
+            line = self.current().line
+            if restartable and line in self.sync_lines:
+                index = self.sync_lines[line]
+                if not (defs and continues_overload(defs[-1],
+                                                    self.old_defs[index])):
+                    self.sync_index = index
+                    break
+            try:
+                defn = self.parse_statement()
+                if defn is not None:
+                    if not self.try_combine_overloads(defn, defs):
+                        defs.append(defn)
+                        self.starts.append(line)
+                        self.restartable.append(restartable)
+            except ParseError:
+                pass
+        return defs
+
+    def at_restart_point(self) -> bool:
+        """Is the current token at the beginning of a line, after a line
+        break (or at the beginning of the string)?"""
+        if self.current().pre:
+            return False
+        if self.ind == 0:
+            return True
+        prev = self.tok[self.ind - 1]
+        return (prev.kind == lex.DEDENT or
+                (prev.kind == lex.BREAK and prev.string[-1:] in ('\n', '\r')))
+
+
+def continues_overload(prev: Node, defn: Node) -> bool:
+    """Would an overloaded function defined by prev continue with defn?"""
+    name = overload_name(prev)
+    return name is not None and name == overload_name(defn)
+
+
+def overload_name(defn: Node) -> str:
+    if isinstance(defn, Decorator):
+        return cast(Decorator, defn).func.name()
+    elif isinstance(defn, OverloadedFuncDef):
+        return cast(OverloadedFuncDef, defn).name()
+    return None
+
+
+def line_contexts(node: Node) -> List[Any]:
+    """Return the nodes and types within a node that have line numbers."""
+    result = List[Any]()
+    seen = Set[int]()
+    # Is each encountered class a subclass of Context? Context is an abstract
+    # base class, so isinstance checks against it are slow.
+    is_context = Dict[Any, bool]()
+    pending = List[Any]([node])
+    while pending:
+        obj = pending.pop()
+        t = type(obj)
+        if t is list or t is tuple:
+            pending.extend(obj)
+        elif t is dict:
+            pending.extend(obj.values())
+        else:
+            if t not in is_context:
+                is_context[t] = issubclass(t, Context)
+            if is_context[t] and id(obj) not in seen:
+                seen.add(id(obj))
+                if obj.line > 0:
+                    result.append(obj)
+                pending.extend(obj.__dict__.values())
+    return result
@@ -58,6 +58,9 @@ class SameTypeVisitor(TypeVisitor[bool]):
         raise RuntimeError()
 
     def visit_instance(self, left: Instance) -> bool:
+        if left is self.right:
+            # Shared types (see TypeTable) are usually the same object.
+            return True
         return (isinstance(self.right, Instance) and
                 left.type == (cast(Instance, self.right)).type and
                 is_same_types(left.args, (cast(Instance, self.right)).args))
@@ -517,7 +517,7 @@ class SemanticAnalyzer(NodeVisitor):
             # If there are cyclic imports, we may be missing 'object' in
             # the MRO. Fix MRO if needed.
             if defn.info.mro[-1].fullname() != 'builtins.object':
-                defn.info.mro.append(self.object_type().type)
+                defn.info.set_mro(defn.info.mro + [self.object_type().type])
 
     def verify_base_classes(self, defn: ClassDef) -> bool:
         base_classes = List[str]()
@@ -1,12 +1,15 @@
-from typing import cast, List, Dict
+from collections import OrderedDict
+
+from typing import cast, List, Dict, Any
 
 from mypy.types import (
     Type, AnyType, UnboundType, TypeVisitor, ErrorType, Void, NoneTyp,
-    Instance, TypeVar, Callable, TupleType, UnionType, Overloaded, ErasedType, TypeList
+    Instance, TypeVar, Callable, TupleType, UnionType, Overloaded, ErasedType, TypeList,
+    type_key
 )
 from mypy import sametypes
 from mypy.nodes import TypeInfo
-from mypy.expandtype import expand_type
+from mypy.expandtype import expand_type, ExpandTypeVisitor, is_same_objects
 
 
 def is_immutable(t: Instance) -> bool:
@@ -17,6 +20,49 @@ def is_immutable(t: Instance) -> bool:
                                  )
 
 
+class ResultCache:
+    """Bounded cache of the results of a type operation.
+
+    The results are keyed by structural type keys (see mypy.types.type_key).
+    When the cache is full, the least recently used result is evicted. The
+    numbers of cache hits and misses are recorded for profiling.
+
+    The results depend on the class hierarchy, so the cache must be cleared
+    between builds (see BuildManager).
+    """
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self.results = OrderedDict()  # type: OrderedDict[Any, Any]
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Any) -> Any:
+        """Return a cached result, or None if there is no result for key."""
+        result = self.results.get(key)
+        if result is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.results.move_to_end(key)
+        return result
+
+    def add(self, key: Any, result: Any) -> None:
+        self.results[key] = result
+        if len(self.results) > self.max_size:
+            self.results.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all results and reset the counters."""
+        self.results.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+# Cache of is_subtype results, keyed by (left key, right key)
+subtype_cache = ResultCache(8192)
+
+
 def is_subtype(left: Type, right: Type) -> bool:
     """Is 'left' subtype of 'right'?
 
@@ -27,12 +73,33 @@ def is_subtype(left: Type, right: Type) -> bool:
     if (isinstance(right, AnyType) or isinstance(right, UnboundType)
             or isinstance(right, ErasedType)):
         return True
-    elif isinstance(left, UnionType):
-        return all(is_subtype(item, right) for item in left.items)
+    key = pair_key(left, right)
+    if key is not None:
+        cached = subtype_cache.get(key)
+        if cached is not None:
+            return cached
+    if isinstance(left, UnionType):
+        result = all(is_subtype(item, right) for item in left.items)
     elif isinstance(right, UnionType):
-        return any(is_subtype(left, item) for item in right.items)
+        result = any(is_subtype(left, item) for item in right.items)
     else:
-        return left.accept(SubtypeVisitor(right))
+        result = left.accept(SubtypeVisitor(right))
+    if key is not None:
+        subtype_cache.add(key, result)
+    return result
+
+
+def pair_key(left: Type, right: Type) -> Any:
+    """Return a cache key for a pair of types (None if there is none)."""
+    if left is None or right is None:
+        return None
+    left_key = type_key(left)
+    if left_key is None:
+        return None
+    right_key = type_key(right)
+    if right_key is None:
+        return None
+    return (left_key, right_key)
 
 
 def is_equivalent(a: Type, b: Type) -> bool:
@@ -205,7 +272,48 @@ def map_instance_to_supertype(instance: Instance,
     if not supertype.type_vars:
         return Instance(supertype, [])
 
-    return map_instance_to_supertypes(instance, supertype)[0]
+    typ = instance.type
+    if len(instance.args) != len(typ.type_vars):
+        # The type arguments are missing; keep the type variables of the
+        # base class definitions.
+        return map_instance_to_supertypes(instance, supertype)[0]
+    mapped = supertype_mapping(typ, supertype)
+    return cast(Instance, mapped.accept(
+        SupertypeExpander(type_var_map(typ, instance.args))))
+
+
+def supertype_mapping(typ: TypeInfo, supertype: TypeInfo) -> Instance:
+    """Return supertype as a base class of typ.
+
+    The type variables of typ are used as type arguments of typ. For example,
+    if C[T] is derived from Dict[int, T], return Dict[int, T] for dict. The
+    result is stored in typ.supertype_map for later calls.
+
+    Assume that supertype is a supertype of typ.
+    """
+    mapped = typ.supertype_map.get(supertype)
+    if mapped is None:
+        args = List[Type]()
+        for i, name in enumerate(typ.type_vars):
+            args.append(TypeVar(name, i + 1, None))
+        mapped = map_instance_to_supertypes(Instance(typ, args), supertype)[0]
+        typ.supertype_map[supertype] = mapped
+    return mapped
+
+
+class SupertypeExpander(ExpandTypeVisitor):
+    """Substitute type arguments into a supertype mapping.
+
+    Unlike ExpandTypeVisitor, keep the erased flags of instances. The
+    result is then the same as that of mapping the instance along the path
+    of base classes (see map_instance_to_supertypes).
+    """
+
+    def visit_instance(self, t: Instance) -> Type:
+        args = self.expand_types(t.args)
+        if is_same_objects(args, t.args):
+            return t
+        return Instance(t.type, args, t.line, t.repr, t.erased)
 
 
 def map_instance_to_direct_supertype(instance: Instance,
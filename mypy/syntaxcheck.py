@@ -0,0 +1,96 @@
+"""Syntax checking of source files without a build.
+
+Parse all the Python files under the given directories (and the given
+files), without following imports or doing any semantic analysis, and
+report the parse errors. Files are parsed in parallel by a pool of
+processes, but the errors are always reported in the same order: files
+sorted by path, and the errors of each file sorted by line.
+
+This is meant for quick checks of large numbers of files, such as in
+version control hooks.
+"""
+
+import multiprocessing
+import os
+import os.path
+
+from typing import List, Set, Tuple
+
+from mypy import parse
+from mypy.errors import Errors
+
+
+# Number of files passed to a parser process at a time
+CHUNK_SIZE = 16
+
+
+def find_source_files(paths: List[str]) -> List[str]:
+    """Return the Python files among paths and under the directories in paths.
+
+    The files under each directory are sorted by path. Duplicates are
+    removed.
+    """
+    result = List[str]()
+    seen = Set[str]()
+    for path in paths:
+        if os.path.isdir(path):
+            files = List[str]()
+            for root, dirs, names in os.walk(path):
+                for name in names:
+                    if name.endswith('.py'):
+                        files.append(os.path.join(root, name))
+            files.sort()
+        else:
+            files = [path]
+        for file in files:
+            key = os.path.normpath(file)
+            if key not in seen:
+                seen.add(key)
+                result.append(file)
+    return result
+
+
+def check_syntax(paths: List[str], pyversion: int = 3,
+                 custom_typing_module: str = None,
+                 jobs: int = None) -> List[str]:
+    """Parse the files in paths (see find_source_files).
+
+    Return the error messages. Use jobs processes for parsing (by default,
+    one per CPU).
+    """
+    files = find_source_files(paths)
+    if jobs is None:
+        jobs = multiprocessing.cpu_count()
+    args = [(file, pyversion, custom_typing_module) for file in files]
+    if jobs > 1 and len(files) > 1:
+        pool = multiprocessing.Pool(jobs)
+        try:
+            results = pool.map(check_file, args, CHUNK_SIZE)
+        finally:
+            pool.terminate()
+            pool.join()
+    else:
+        results = [check_file(arg) for arg in args]
+    messages = List[str]()
+    for file_messages in results:
+        messages.extend(file_messages)
+    return messages
+
+
+def check_file(args: Tuple[str, int, str]) -> List[str]:
+    """Parse a file and return the error messages.
+
+    The argument is a tuple (path, pyversion, custom typing module).
+    """
+    path, pyversion, custom_typing_module = args
+    try:
+        with open(path) as f:
+            text = f.read()
+    except IOError as ioerr:
+        return ["mypy: can't read file '{}': {}".format(path, ioerr.strerror)]
+    except UnicodeDecodeError as err:
+        return ["mypy: can't read file '{}': {}".format(path, err)]
+    errors = Errors()
+    parse.parse(text, path, errors, pyversion=pyversion,
+                custom_typing_module=custom_typing_module, lossless=False)
+    return errors.messages()
@@ -1,10 +1,12 @@
 import sys
 import re
 import os
+import shutil
+import tempfile
 
 from typing import List, Dict
 
-from mypy.myunit import AssertionFailure
+from mypy.myunit import AssertionFailure, Suite
 from mypy.test import config
 
 
@@ -271,3 +273,31 @@ def testcase_pyversion(path: str, testcase_name: str) -> int:
         return 2
     else:
         return testfile_pyversion(path)
+
+
+class TempDirSuite(Suite):
+    """Suite whose test cases each get a fresh temporary directory (dir).
+
+    Subclasses that override set_up or tear_down must call the base class
+    versions.
+    """
+
+    dir = ''
+
+    def set_up(self) -> None:
+        self.dir = tempfile.mkdtemp()
+
+    def tear_down(self) -> None:
+        shutil.rmtree(self.dir)
+
+    def path(self, path: str) -> str:
+        """Return the full path of a '/'-separated path relative to dir."""
+        return os.path.join(self.dir, *path.split('/'))
+
+    def write(self, path: str, text: str = '') -> None:
+        """Write a file under dir, creating its directory if needed."""
+        path = self.path(path)
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        with open(path, 'w') as f:
+            f.write(text)
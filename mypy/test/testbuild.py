@@ -0,0 +1,239 @@
+"""Test cases for builds with multiple entry points"""
+
+import os
+import os.path
+import shutil
+import sys
+
+from typing import Dict, List
+
+from mypy import build
+from mypy import buildstats
+from mypy import cache
+from mypy.build import BuildSource
+from mypy.cache import MemoryModuleCache, ParseTreeCache
+from mypy.myunit import Suite, assert_equal, assert_true, run_test
+from mypy.errors import CompileError
+from mypy.parse import parse
+from mypy.test.helpers import TempDirSuite
+
+
+class MultipleSourcesSuite(TempDirSuite):
+    def test_files_share_dependencies(self):
+        self.write('m.py', 'def f() -> int: pass')
+        self.write('a.py', 'import m\nx = m.f() # type: int')
+        self.write('b.py', 'import m\ny = m.f() # type: int')
+        result = self.run_build([self.source('a.py', 'a'),
+                                 self.source('b.py', 'b')])
+        assert_true('a' in result.files)
+        assert_true('b' in result.files)
+        assert_true('m' in result.files)
+
+    def test_entry_points_are_processed_in_order(self):
+        self.write('a.py', 'x = 1 # type: str')
+        self.write('b.py', 'y = 1 # type: str')
+        error = ('tmp/{}.py, line 1: Incompatible types in assignment '
+                 '(expression has type "int", variable has type "str")')
+        assert_equal(self.build_errors([self.source('a.py', 'a'),
+                                        self.source('b.py', 'b')]),
+                     [error.format('a')])
+        assert_equal(self.build_errors([self.source('b.py', 'b'),
+                                        self.source('a.py', 'a')]),
+                     [error.format('b')])
+
+    def test_entry_point_imported_by_another(self):
+        self.write('a.py', 'import b\nx = b.y # type: int')
+        self.write('b.py', 'y = 1')
+        result = self.run_build([self.source('a.py', 'a'),
+                                 self.source('b.py', 'b')])
+        assert_equal(result.files['b'].path, self.path('b.py'))
+
+    def test_package(self):
+        self.write('p/__init__.py', '')
+        self.write('p/a.py', '')
+        self.write('p/q/__init__.py', '')
+        self.write('p/q/b.py', '')
+        self.write('p/r/c.py', '')
+        result = self.run_build([BuildSource(None, 'p', recursive=True)])
+        for id in 'p', 'p.a', 'p.q', 'p.q.b':
+            assert_true(id in result.files, id)
+        assert_true('p.r.c' not in result.files)
+
+    def test_duplicate_module(self):
+        self.write('a.py', '')
+        assert_equal(self.build_errors([self.source('a.py', 'a'),
+                                        BuildSource(None, 'a')]),
+                     ["mypy: duplicate module named 'a'"])
+
+    def test_module_for_path(self):
+        self.write('p/__init__.py', '')
+        self.write('p/q/__init__.py', '')
+        path = self.path('p/q/b.py')
+        assert_equal(build.module_for_path(path), 'p.q.b')
+        path = self.path('p/q/__init__.py')
+        assert_equal(build.module_for_path(path), 'p.q')
+        path = self.path('b.py')
+        assert_equal(build.module_for_path(path), 'b')
+
+    def test_derived_ids_of_files_with_same_name(self):
+        self.write('a/run.py', 'x = 1')
+        self.write('b/run.py', 'x = 1')
+        self.write('c/run.py', 'x = 1')
+        sources = [self.source('a/run.py', None),
+                   self.source('b/run.py', None),
+                   self.source('c/run.py', None)]
+        result = self.run_build(sources)
+        assert_equal([source.module for source in sources],
+                     ['run', 'run-2', 'run-3'])
+        assert_equal(result.files['run-2'].path, self.path('b/run.py'))
+
+    def test_derived_id_of_file_named_like_module(self):
+        self.write('p/__init__.py', 'x = 1')
+        self.write('scripts/p', 'import p\ny = p.x # type: str')
+        sources = [self.source('scripts/p', None)]
+        assert_equal(self.build_errors(sources),
+                     ['tmp/scripts/p, line 2: Incompatible types in '
+                      'assignment (expression has type "int", variable has '
+                      'type "str")'])
+        assert_equal(sources[0].module, 'p-2')
+
+    def test_derived_id_of_package_module(self):
+        self.write('p/__init__.py', '')
+        self.write('p/a.py', '')
+        sources = [self.source('p/a.py', None)]
+        self.run_build(sources)
+        assert_equal(sources[0].module, 'p.a')
+
+    def source(self, path: str, module: str) -> BuildSource:
+        return BuildSource(self.path(path), module)
+
+    def run_build(self, sources: List[BuildSource]) -> build.BuildResult:
+        return build.build(None,
+                           target=build.TYPE_CHECK,
+                           sources=sources,
+                           flags=[build.TEST_BUILTINS],
+                           alt_lib_path=self.dir)
+
+    def build_errors(self, sources: List[BuildSource]) -> List[str]:
+        try:
+            self.run_build(sources)
+        except CompileError as e:
+            return [message.replace(self.dir, 'tmp')
+                    for message in e.messages]
+        return []
+
+
+class ParseTreeCacheSuite(Suite):
+    def set_up(self):
+        self.files = {}  # type: Dict[str, bytes]
+        self.cache = ParseTreeCache(MemoryModuleCache(self.files, []),
+                                    [3, None, False])
+
+    def test_cached_tree_is_used(self):
+        self.run_build('x = 1')
+        assert_true(self.cache.contains('main', 'x = 1'))
+        # Replace the cached tree to see that it is used instead of parsing.
+        tree = parse('x = 1 # type: str', lossless=False)
+        self.cache.store('main', 'x = 1', tree)
+        assert_equal(self.build_errors('x = 1'),
+                     ['main, line 1: Incompatible types in assignment '
+                      '(expression has type "int", variable has type "str")'])
+
+    def test_tree_with_parse_errors_is_not_cached(self):
+        assert_equal(self.build_errors('x = ('),
+                     ['main, line 1: Parse error before end of line'])
+        assert_true(not self.cache.contains('main', 'x = ('))
+
+    def test_changed_file_replaces_tree(self):
+        self.run_build('x = 1')
+        num_files = len(self.files)
+        self.run_build('x = 2')
+        assert_true(not self.cache.contains('main', 'x = 1'))
+        assert_true(self.cache.contains('main', 'x = 2'))
+        assert_equal(len(self.files), num_files)
+
+    def test_options_are_part_of_key(self):
+        other = ParseTreeCache(self.cache.files, [2, None, False])
+        assert_true(other.source_key('x') != self.cache.source_key('x'))
+        assert_true(self.cache.source_key('x') != self.cache.source_key('y'))
+        self.cache.store('main', 'x', parse('x', lossless=False))
+        assert_true(not other.contains('main', 'x'))
+
+    def run_build(self, program: str) -> build.BuildResult:
+        return build.build('main',
+                           target=build.TYPE_CHECK,
+                           program_text=program,
+                           flags=[build.TEST_BUILTINS, build.PARSE_CACHE],
+                           cache_files=self.files)
+
+    def build_errors(self, program: str) -> List[str]:
+        try:
+            self.run_build(program)
+        except CompileError as e:
+            return e.messages
+        return []
+
+
+class SnapshotSuite(TempDirSuite):
+    def set_up(self):
+        super().set_up()
+        self.stubs = self.path('stubs')
+        shutil.copytree(os.path.join('mypy', 'test', 'data', 'lib-stub'),
+                        self.stubs)
+        self.snapshot_path = build.create_snapshot(
+            alt_lib_path=self.stubs, flags=[build.TEST_BUILTINS])
+
+    def test_core_modules_are_loaded_from_snapshot(self):
+        assert_equal(self.snapshot_path,
+                     os.path.join(self.stubs, cache.SNAPSHOT_NAME))
+        stats = self.run_build('import typing\nx = 1').stats
+        for id in 'builtins', 'typing':
+            assert_equal(list(stats.modules[id].times), [buildstats.CACHE_LOAD])
+        assert_true(buildstats.PARSE in stats.modules['__main__'].times)
+
+    def test_changed_module_is_processed_from_source(self):
+        with open(os.path.join(self.stubs, 'builtins.py'), 'a') as f:
+            f.write('\nclass str2: pass\n')
+        result = self.run_build('x = str2()')
+        # All the modules depend on builtins.
+        for m in result.stats.modules.values():
+            assert_true(buildstats.CACHE_LOAD not in m.times, m.id)
+
+    def test_snapshot_can_be_moved(self):
+        stubs = self.path('moved')
+        shutil.move(self.stubs, stubs)
+        self.stubs = stubs
+        stats = self.run_build('x = 1').stats
+        assert_true(buildstats.CACHE_LOAD in stats.modules['builtins'].times)
+
+    def test_snapshot_with_incremental_build(self):
+        files = {}  # type: Dict[str, bytes]
+        self.run_build('x = 1', [build.INCREMENTAL], files)
+        stats = self.run_build('x = 1', [build.INCREMENTAL], files).stats
+        assert_true(buildstats.CACHE_LOAD in stats.modules['__main__'].times)
+
+    def test_no_snapshot(self):
+        stats = self.run_build('x = 1', [build.NO_SNAPSHOT]).stats
+        assert_true(buildstats.PARSE in stats.modules['builtins'].times)
+
+    def run_build(self, program: str, flags: List[str] = None,
+                  cache_files: Dict[str, bytes] = None) -> build.BuildResult:
+        return build.build('main',
+                           target=build.TYPE_CHECK,
+                           program_text=program,
+                           flags=[build.TEST_BUILTINS,
+                                  build.PROFILE] + (flags or []),
+                           alt_lib_path=self.stubs,
+                           cache_files=cache_files)
+
+
+class BuildSuite(Suite):
+    def __init__(self):
+        self.test_sources = MultipleSourcesSuite()
+        self.test_parse_cache = ParseTreeCacheSuite()
+        self.test_snapshot = SnapshotSuite()
+        super().__init__()
+
+
+if __name__ == '__main__':
+    run_test(BuildSuite(), sys.argv[1:])
@@ -0,0 +1,101 @@
+"""Test cases for build profiling (per-module timing and size statistics)"""
+
+import io
+import json
+import sys
+
+from typing import List
+
+from mypy import build
+from mypy import buildstats
+from mypy.buildstats import BuildStats
+from mypy.errors import CompileError
+from mypy.myunit import Suite, assert_equal, assert_true, run_test
+
+
+class BuildStatsSuite(Suite):
+    def test_phases_and_counts_are_recorded(self):
+        result, output = self.run_build('x = 1\ndef f() -> int: return x',
+                                        [build.PROFILE])
+        m = result.stats.modules['__main__']
+        for phase in [buildstats.PARSE, buildstats.SEMANAL_PASS1,
+                      buildstats.SEMANAL_PASS2, buildstats.SEMANAL_PASS3,
+                      buildstats.TYPE_CHECK]:
+            assert_true(phase in m.times, phase)
+        assert_equal(m.counts[buildstats.TOKENS], 15)
+        # Lexing happens while parsing.
+        assert_true(m.times[buildstats.LEX] <= m.times[buildstats.PARSE])
+        assert_true(m.counts[buildstats.NODES] > 0)
+        assert_true(m.counts[buildstats.TYPES] > 0)
+        assert_true('builtins' in result.stats.modules)
+        assert_true(output[0].split()[:2] == ['module', 'total'])
+        assert_true(output[-1].startswith('subtype cache: '))
+        hits, misses = result.stats.caches['subtype']
+        assert_true(hits + misses > 0)
+
+    def test_json_report(self):
+        result, output = self.run_build('x = 1', [build.PROFILE_JSON])
+        data = json.loads('\n'.join(output))
+        modules = [m['module'] for m in data['modules']]
+        assert_equal(sorted(modules), sorted(result.stats.modules))
+        assert_true('parse' in data['total']['times'])
+        assert_true('hits' in data['caches']['subtype'])
+
+    def test_no_stats_by_default(self):
+        result, output = self.run_build('x = 1', [])
+        assert_equal(result.stats, None)
+        assert_equal(output, [])
+
+    def test_stats_of_failed_build(self):
+        try:
+            self.run_build('x = 1 # type: str', [build.PROFILE])
+        except CompileError as e:
+            assert_true('__main__' in e.stats.modules)
+        else:
+            assert_true(False, 'no CompileError')
+
+    def test_table_is_sorted_by_time(self):
+        stats = BuildStats()
+        stats.add_time('a', 'a.py', buildstats.PARSE, 0.001)
+        stats.add_time('b', 'b.py', buildstats.PARSE, 0.002)
+        stats.add_time('b', 'b.py', buildstats.LEX, 0.5)
+        stats.set_count('a', 'a.py', buildstats.TOKENS, 7)
+        table = stats.format_table()
+        assert_equal([line.split()[:3] for line in table[1:]],
+                     [['b', '2.0', '500.0'],
+                      ['a', '1.0', '-'],
+                      ['total', '3.0', '500.0']])
+        assert_equal(table[2].split()[-3:], ['7', '-', '-'])
+
+    def test_cache_counts(self):
+        stats = BuildStats()
+        stats.set_cache_counts('subtype', 3, 1)
+        stats.set_cache_counts('join', 0, 0)
+        table = stats.format_table()
+        assert_equal(table[-2:],
+                     ['join cache: 0 hits, 0 misses (unused)',
+                      'subtype cache: 3 hits, 1 misses (75.0% hit rate)'])
+        data = json.loads(stats.format_json())
+        assert_equal(data['caches']['subtype'], {'hits': 3, 'misses': 1})
+
+    def run_build(self, program: str, flags: List[str]):
+        """Build a program and return the result and the formatted
+        statistics (see build.format_stats)."""
+        stdout = sys.stdout
+        sys.stdout = io.StringIO()
+        try:
+            result = build.build('main',
+                                 target=build.TYPE_CHECK,
+                                 program_text=program,
+                                 flags=[build.TEST_BUILTINS] + flags)
+            # The report is left to the caller.
+            assert_equal(sys.stdout.getvalue(), '')
+        finally:
+            sys.stdout = stdout
+        if not result.stats:
+            return result, []
+        return result, build.format_stats(result.stats, flags)
+
+
+if __name__ == '__main__':
+    run_test(BuildStatsSuite(), sys.argv[1:])
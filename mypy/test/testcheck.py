@@ -3,6 +3,7 @@
 import os.path
 
 import typing
+from typing import List
 
 from mypy import build
 from mypy.myunit import Suite, run_test
@@ -47,6 +48,13 @@ files = [
 
 
 class TypeCheckSuite(Suite):
+    # Number of processes used for parsing modules
+    jobs = 1
+    # Additional build options
+    flags = List[str]()
+    # Directory for looking up modules (in addition to library stubs)
+    lib_dir = test_temp_dir
+
     def cases(self):
         c = []
         for f in files:
@@ -63,8 +71,9 @@ class TypeCheckSuite(Suite):
                         target=build.TYPE_CHECK,
                         program_text=src,
                         pyversion=pyversion,
-                        flags=[build.TEST_BUILTINS],
-                        alt_lib_path=test_temp_dir)
+                        flags=[build.TEST_BUILTINS] + self.flags,
+                        alt_lib_path=self.lib_dir,
+                        jobs=self.jobs)
         except CompileError as e:
             a = normalize_error_messages(e.messages)
 
@@ -77,6 +86,29 @@ class TypeCheckSuite(Suite):
                 testcase.file, testcase.line))
 
 
+class ParallelParseSuite(TypeCheckSuite):
+    """Type check programs with multiple modules, parsing them in parallel."""
+
+    jobs = 2
+
+    def cases(self):
+        return parse_test_cases(os.path.join(test_data_prefix,
+                                             'check-modules.test'),
+                                self.run_test, test_temp_dir, True)
+
+
+class LazyStubsSuite(TypeCheckSuite):
+    """Type check programs that use stubs, checking the stubs lazily."""
+
+    flags = [build.LAZY_STUBS]
+    lib_dir = os.path.join(test_temp_dir, 'stubs')
+
+    def cases(self):
+        return parse_test_cases(os.path.join(test_data_prefix,
+                                             'check-lazy-stubs.test'),
+                                self.run_test, test_temp_dir, True)
+
+
 if __name__ == '__main__':
     import sys
     run_test(TypeCheckSuite(), sys.argv[1:])
@@ -0,0 +1,104 @@
+"""Test cases for the build server (mypy.daemon)"""
+
+import os
+import os.path
+import socket
+import threading
+
+import typing
+
+from mypy.myunit import assert_equal, assert_true, run_test
+from mypy import build, client
+from mypy.daemon import BuildServer
+from mypy.test.helpers import TempDirSuite
+
+
+class BuildServerSuite(TempDirSuite):
+    def set_up(self):
+        super().set_up()
+        self.server = BuildServer(bin_dir='scripts')
+
+    def test_check(self):
+        self.write('m.py', 'def f() -> int: pass')
+        self.write('main.py', 'import m\nx = m.f() # type: int')
+        assert_equal(self.check('main.py'), {'status': 0, 'messages': []})
+        assert_true(self.server.cache_files)
+        self.write('m.py', 'def f() -> str: pass')
+        assert_equal(self.check('main.py'),
+                     {'status': 1,
+                      'messages': ['{}, line 2: Incompatible types in '
+                                   'assignment (expression has type "str", '
+                                   'variable has type "int")'.format(
+                                       self.path('main.py'))]})
+
+    def test_profile_report_is_returned(self):
+        self.server = BuildServer(bin_dir='scripts', flags=[build.PROFILE])
+        self.write('main.py', 'x = 1 # type: str')
+        response = self.check('main.py')
+        assert_equal(response['status'], 1)
+        assert_equal(response['profile'][0].split()[:2], ['module', 'total'])
+
+    def test_invalid_request(self):
+        assert_equal(self.server.handle({'command': 'x'}),
+                     {'status': 2, 'messages': ['Invalid request']})
+
+    def test_socket(self):
+        self.write('main.py', 'x = 1 # type: str')
+        socket_path = self.path('sock')
+        thread = self.start_server(socket_path)
+        try:
+            response = client.check(socket_path, self.path('main.py'))
+        finally:
+            client.stop(socket_path)
+            thread.join()
+        assert_equal(response['status'], 1)
+        assert_equal(len(response['messages']), 1)
+        assert_true(not os.path.exists(socket_path))
+
+    def test_client_disconnects_early(self):
+        self.write('main.py', 'x = 1 # type: str')
+        socket_path = self.path('sock')
+        thread = self.start_server(socket_path)
+        try:
+            # Send a request but close the connection without waiting for
+            # the response.
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.connect(socket_path)
+            client.write_message(sock, {'command': 'check',
+                                        'path': self.path('main.py'),
+                                        'cwd': os.getcwd()})
+            sock.close()
+            # The server still serves other clients.
+            response = client.check(socket_path, self.path('main.py'))
+        finally:
+            client.stop(socket_path)
+            thread.join()
+        assert_equal(response['status'], 1)
+
+    def start_server(self, socket_path):
+        """Start serving in a thread and wait until the server listens."""
+        thread = threading.Thread(target=self.server.serve,
+                                  args=(socket_path,))
+        thread.start()
+        while True:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                sock.connect(socket_path)
+                client.write_message(sock, {'command': 'ping'})
+                client.read_message(sock)
+                return thread
+            except IOError:
+                # The server is not listening yet.
+                thread.join(0.01)
+            finally:
+                sock.close()
+
+    def check(self, path):
+        return self.server.handle({'command': 'check',
+                                   'path': self.path(path),
+                                   'cwd': os.getcwd()})
+
+
+if __name__ == '__main__':
+    import sys
+    run_test(BuildServerSuite(), sys.argv[1:])
@@ -0,0 +1,63 @@
+"""Test cases for finding the source files of modules."""
+
+import os
+import os.path
+
+import typing
+
+from mypy.myunit import assert_equal, run_test
+from mypy.build import find_module, find_module_clear_caches
+from mypy.test.helpers import TempDirSuite
+
+
+class FindModuleSuite(TempDirSuite):
+    def set_up(self):
+        super().set_up()
+        self.lib_path = [os.path.join(self.dir, 'a'),
+                         os.path.join(self.dir, 'b')]
+        find_module_clear_caches()
+
+    def tear_down(self):
+        super().tear_down()
+        find_module_clear_caches()
+
+    def test_module(self):
+        self.write('b/m.py')
+        assert_equal(find_module('m', self.lib_path), self.path('b/m.py'))
+
+    def test_first_path_entry_has_precedence(self):
+        self.write('a/m.py')
+        self.write('b/m.py')
+        assert_equal(find_module('m', self.lib_path), self.path('a/m.py'))
+
+    def test_package(self):
+        self.write('b/p/__init__.py')
+        self.write('b/p/m.py')
+        assert_equal(find_module('p', self.lib_path),
+                     self.path('b/p/__init__.py'))
+        assert_equal(find_module('p.m', self.lib_path), self.path('b/p/m.py'))
+
+    def test_package_without_init_file(self):
+        self.write('b/p/m.py')
+        assert_equal(find_module('p.m', self.lib_path), None)
+
+    def test_missing_module(self):
+        assert_equal(find_module('m', self.lib_path), None)
+        assert_equal(find_module('p.m', self.lib_path), None)
+
+    def test_directory_is_not_a_module(self):
+        os.makedirs(self.path('b/m.py'))
+        assert_equal(find_module('m', self.lib_path), None)
+
+    def test_clear_caches(self):
+        assert_equal(find_module('m', self.lib_path), None)
+        self.write('b/m.py')
+        # The negative result is cached.
+        assert_equal(find_module('m', self.lib_path), None)
+        find_module_clear_caches()
+        assert_equal(find_module('m', self.lib_path), self.path('b/m.py'))
+
+
+if __name__ == '__main__':
+    import sys
+    run_test(FindModuleSuite(), sys.argv[1:])
@@ -0,0 +1,103 @@
+"""Test cases for the import graph algorithms used by builds."""
+
+import typing
+
+from mypy.myunit import Suite, assert_equal, run_test
+from mypy.build import strongly_connected_components, update_components
+
+
+class StronglyConnectedComponentsSuite(Suite):
+    def test_empty_graph(self):
+        self.assert_sccs({}, [])
+
+    def test_no_cycles(self):
+        self.assert_sccs({'a': ['b', 'c'], 'b': ['c'], 'c': []},
+                         [['c'], ['b'], ['a']])
+
+    def test_simple_cycle(self):
+        self.assert_sccs({'a': ['b'], 'b': ['a']}, [['a', 'b']])
+
+    def test_self_import(self):
+        self.assert_sccs({'a': ['a']}, [['a']])
+
+    def test_cycle_with_dependencies(self):
+        self.assert_sccs({'main': ['a'],
+                          'a': ['b', 'builtins'],
+                          'b': ['c', 'builtins'],
+                          'c': ['a', 'builtins'],
+                          'builtins': []},
+                         [['builtins'], ['a', 'b', 'c'], ['main']])
+
+    def test_two_cycles(self):
+        sccs = strongly_connected_components({'a': ['b'], 'b': ['a', 'c'],
+                                              'c': ['d'], 'd': ['c']})
+        assert_equal([sorted(scc) for scc in sccs], [['c', 'd'], ['a', 'b']])
+
+    def test_successors_outside_graph_are_ignored(self):
+        self.assert_sccs({'a': ['missing', 'b'], 'b': []}, [['b'], ['a']])
+
+    def assert_sccs(self, graph, expected):
+        sccs = strongly_connected_components(graph)
+        assert_equal(sorted(sorted(scc) for scc in sccs),
+                     sorted(expected))
+        # Each component comes after all the components it depends on.
+        position = {}
+        for i, scc in enumerate(sccs):
+            for id in scc:
+                position[id] = i
+        for id, deps in graph.items():
+            for dep in deps:
+                if dep in graph:
+                    assert_equal(position[dep] <= position[id], True)
+
+
+class UpdateComponentsSuite(Suite):
+    def test_new_vertices(self):
+        self.assert_updates([('a', []), ('b', ['a']), ('c', ['c'])])
+
+    def test_cycle(self):
+        self.assert_updates([('a', []), ('b', []), ('c', []),
+                             ('a', ['b']), ('b', ['c']), ('c', ['a'])])
+
+    def test_edge_to_new_vertex_closes_cycle(self):
+        self.assert_updates([('a', ['c']), ('b', ['a']), ('c', ['b'])])
+
+    def test_components_are_merged(self):
+        self.assert_updates([('a', ['b']), ('b', ['a']),
+                             ('c', ['d']), ('d', ['c', 'e']), ('e', []),
+                             ('x', []), ('b', ['a', 'c']), ('e', ['x']),
+                             ('x', ['a'])])
+
+    def assert_updates(self, steps):
+        """Add the successors of a vertex at a time and compare the updated
+        components to the components computed from scratch."""
+        graph = {}
+        predecessors = {}
+        components = {}
+        for v, successors in steps:
+            graph[v] = successors
+            for w in successors:
+                predecessors.setdefault(w, set()).add(v)
+            update_components(
+                components, v, lambda v: graph[v],
+                lambda v: [w for w in predecessors.get(v, set())
+                           if w in graph])
+            expected = sorted(sorted(scc) for scc in
+                              strongly_connected_components(graph))
+            actual = {}
+            for w, representative in components.items():
+                actual.setdefault(representative, []).append(w)
+            assert_equal(sorted(sorted(scc) for scc in actual.values()),
+                         expected)
+
+
+class GraphSuite(Suite):
+    def __init__(self):
+        self.test_sccs = StronglyConnectedComponentsSuite()
+        self.test_update_components = UpdateComponentsSuite()
+        super().__init__()
+
+
+if __name__ == '__main__':
+    import sys
+    run_test(GraphSuite(), sys.argv[1:])
@@ -0,0 +1,52 @@
+"""Test cases for finding imports by scanning tokens"""
+
+import sys
+
+from mypy.importscan import scan_imports
+from mypy.myunit import Suite, assert_equal, run_test
+
+
+class ImportScanSuite(Suite):
+    def test_import(self):
+        assert_equal(scan_imports('import a\nimport b.c as d, e\n'),
+                     [('a', 1), ('b.c', 2), ('e', 2)])
+
+    def test_import_from(self):
+        assert_equal(scan_imports('from a.b import c, d as e\n'
+                                  'from f import (g,\n  h)\n'
+                                  'from i import *\n'),
+                     [('a.b', 1), ('a.b.c', 1), ('a.b.d', 1),
+                      ('f', 2), ('f.g', 2), ('f.h', 2),
+                      ('i', 4)])
+
+    def test_nested_imports(self):
+        assert_equal(scan_imports('if x:\n'
+                                  '    import a\n'
+                                  'else: import b\n'
+                                  'def f():\n'
+                                  '    x = 1; import c\n'),
+                     [('a', 2), ('b', 3), ('c', 5)])
+
+    def test_not_import_statements(self):
+        assert_equal(scan_imports('"import a"\n'
+                                  '# import b\n'
+                                  'def f(): yield from c\n'
+                                  'x.import_d = 1\n'),
+                     [])
+
+    def test_custom_typing_module(self):
+        assert_equal(scan_imports('import t\nfrom a import t2\n'
+                                  'from b import c\n', 't'),
+                     [('typing', 1), ('a', 2), ('a.t2', 2), ('b', 3),
+                      ('b.c', 3)])
+        assert_equal(scan_imports('from a import t\n', 'a.t'),
+                     [('typing', 1)])
+
+    def test_syntax_errors(self):
+        assert_equal(scan_imports('import\nimport a as\nfrom b import\n'
+                                  'from c d\nimport e.\n'),
+                     [('a', 2), ('b', 3), ('e', 5)])
+
+
+if __name__ == '__main__':
+    run_test(ImportScanSuite(), sys.argv[1:])
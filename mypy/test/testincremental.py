@@ -0,0 +1,211 @@
+"""Test cases for incremental builds (the cache of analyzed modules)"""
+
+import io
+import os
+import os.path
+import shutil
+import sys
+import tempfile
+
+from typing import List
+
+from mypy import build
+from mypy.myunit import Suite, assert_equal, assert_true, run_test
+from mypy.test.config import test_temp_dir, test_data_prefix
+from mypy.test.data import parse_test_cases
+from mypy.test.helpers import (
+    assert_string_arrays_equal, testcase_pyversion, TempDirSuite
+)
+from mypy.test.testsemanal import normalize_error_messages
+from mypy.errors import CompileError
+
+
+# Type checker test case files that are run twice using the same cache.
+check_files = ['check-modules.test',
+               'check-classes.test',
+               'check-generics.test']
+
+
+class IncrementalCheckSuite(Suite):
+    """Type check each test case program twice using the same cache.
+
+    The second build loads modules from the cache, and it should produce
+    the same output as the first one.
+    """
+
+    def cases(self):
+        c = []
+        for f in check_files:
+            c += parse_test_cases(os.path.join(test_data_prefix, f),
+                                  self.run_test, test_temp_dir, True)
+        return c
+
+    def run_test(self, testcase):
+        cache_dir = tempfile.mkdtemp()
+        try:
+            for run in 'first', 'second':
+                a = []
+                try:
+                    build.build('main',
+                                target=build.TYPE_CHECK,
+                                program_text='\n'.join(testcase.input),
+                                pyversion=testcase_pyversion(testcase.file,
+                                                             testcase.name),
+                                flags=[build.TEST_BUILTINS, build.INCREMENTAL],
+                                alt_lib_path=test_temp_dir,
+                                cache_dir=cache_dir)
+                except CompileError as e:
+                    a = normalize_error_messages(e.messages)
+                assert_string_arrays_equal(
+                    testcase.output, a,
+                    'Invalid output of {} build ({}, line {})'.format(
+                        run, testcase.file, testcase.line))
+        finally:
+            shutil.rmtree(cache_dir)
+
+
+class IncrementalSuite(TempDirSuite):
+    def set_up(self):
+        super().set_up()
+        self.cache_dir = os.path.join(self.dir, 'cache')
+
+    def test_unchanged_program_is_loaded_from_cache(self):
+        self.write('m.py', 'def f(x: int) -> int: return x')
+        program = 'import m\nm.f(1)'
+        assert_true(self.run_build(program).types)
+        assert_true(os.path.isfile(os.path.join(self.cache_dir,
+                                                'm.meta.json')))
+        result = self.run_build(program)
+        # Nothing was type checked.
+        assert_equal(result.types, {})
+        assert_true('m' in result.files)
+
+    def test_change_in_dependency(self):
+        self.write('m.py', 'def f() -> int: pass')
+        program = 'import m\nx = m.f() # type: int'
+        self.run_build(program)
+        self.write('m.py', 'def f() -> str: pass')
+        assert_equal(self.build_errors(program),
+                     ['main, line 2: Incompatible types in assignment '
+                      '(expression has type "str", variable has type "int")'])
+
+    def test_change_in_indirect_dependency(self):
+        self.write('m.py', 'import n\ndef f() -> int: return n.g()')
+        self.write('n.py', 'def g() -> int: pass')
+        program = 'import m\nx = m.f() # type: int'
+        self.run_build(program)
+        self.write('n.py', 'def g() -> str: pass')
+        assert_equal(self.build_errors(program),
+                     ['In module imported in main, line 1:',
+                      'tmp/m.py: In function "f":',
+                      'tmp/m.py, line 2: Incompatible return value type: '
+                      'expected builtins.int, got builtins.str'])
+
+    def test_module_with_errors_is_not_cached(self):
+        self.write('m.py', 'x = 1 # type: str')
+        program = 'import m'
+        errors = ['In module imported in main, line 1:',
+                  'tmp/m.py, line 1: Incompatible types in assignment '
+                  '(expression has type "int", variable has type "str")']
+        assert_equal(self.build_errors(program), errors)
+        assert_true(not os.path.isfile(os.path.join(self.cache_dir,
+                                                    'm.data')))
+        assert_equal(self.build_errors(program), errors)
+
+    def test_dependencies_of_program_with_errors_are_loaded_from_cache(self):
+        self.write('m.py', 'def f() -> int: pass')
+        program = 'import m\nx = m.f() # type: str'
+        errors = ['main, line 2: Incompatible types in assignment '
+                  '(expression has type "int", variable has type "str")']
+        assert_equal(self.build_errors(program), errors)
+        assert_true('LOG: Loaded m from cache' in self.build_log(program,
+                                                                 errors))
+
+    def test_dependents_of_module_with_unchanged_interface_are_loaded(self):
+        self.write('m.py', 'import n\ndef f() -> int: return n.g()')
+        self.write('n.py', 'def g() -> int: pass')
+        program = 'import m\nx = m.f() # type: int'
+        self.run_build(program)
+        self.write('n.py', 'def g() -> int:\n    return 1')
+        log = self.build_log(program)
+        assert_true('LOG: Loaded m from cache' in log)
+        assert_true('LOG: Loaded __main__ from cache' in log)
+        assert_true('LOG: Loaded n from cache' not in log)
+
+    def test_dependents_of_module_with_changed_interface_are_processed(self):
+        self.write('m.py', 'import n\ndef f() -> int: return 1')
+        self.write('n.py', 'def g() -> int: pass')
+        program = 'import m\nx = m.f() # type: int'
+        self.run_build(program)
+        self.write('n.py', 'def g(x: int) -> int: pass')
+        log = self.build_log(program)
+        assert_true('LOG: Loaded m from cache' not in log)
+        # Indirect dependencies are considered as well.
+        assert_true('LOG: Loaded __main__ from cache' not in log)
+        self.write('n.py', 'def g(x: int) -> int: pass\ndef h() -> None: pass')
+        assert_true('LOG: Loaded m from cache' not in self.build_log(program))
+        assert_true('LOG: Loaded m from cache' in self.build_log(program))
+
+    def test_new_module_shadows_missing_module(self):
+        program = 'import m\nx = 1'
+        assert_equal(self.build_errors(program),
+                     ["main, line 1: No module named 'm'"])
+        self.write('m.py', 'y = 1')
+        assert_equal(self.build_errors(program), [])
+
+    def test_corrupted_cache_is_ignored(self):
+        self.write('m.py', 'def f() -> int: pass')
+        program = 'import m\nx = m.f() # type: int'
+        self.run_build(program)
+        with open(os.path.join(self.cache_dir, 'm.data'), 'wb') as f:
+            f.write(b'garbage')
+        assert_true(self.run_build(program).types)
+
+    def test_lazily_checked_stubs_are_not_used_by_full_check(self):
+        # Modules in a directory named stubs are stubs.
+        self.write('stubs/__init__.py', '')
+        self.write('stubs/m.py',
+                   'class A:\n    def __init__(self) -> str: pass')
+        program = 'import stubs.m'
+        errors = ['In module imported in main, line 1:',
+                  'tmp/stubs/m.py: In member "__init__" of class "A":',
+                  'tmp/stubs/m.py, line 2: Cannot define return type for '
+                  '"__init__"']
+        assert_equal(self.build_errors(program, [build.LAZY_STUBS]), [])
+        assert_equal(self.build_errors(program), errors)
+
+    def run_build(self, program: str,
+                  flags: List[str] = []) -> build.BuildResult:
+        return build.build('main',
+                           target=build.TYPE_CHECK,
+                           program_text=program,
+                           flags=[build.TEST_BUILTINS, build.INCREMENTAL] + flags,
+                           alt_lib_path=self.dir,
+                           cache_dir=self.cache_dir)
+
+    def build_log(self, program: str,
+                  errors: List[str] = []) -> List[str]:
+        """Build a program and return the lines logged by the build.
+
+        Also check that the build reports the given errors.
+        """
+        stdout = sys.stdout
+        sys.stdout = io.StringIO()
+        try:
+            assert_equal(self.build_errors(program, [build.VERBOSE]), errors)
+            return sys.stdout.getvalue().splitlines()
+        finally:
+            sys.stdout = stdout
+
+    def build_errors(self, program: str,
+                     flags: List[str] = []) -> List[str]:
+        try:
+            self.run_build(program, flags)
+        except CompileError as e:
+            return [message.replace(self.dir, 'tmp')
+                    for message in e.messages]
+        return []
+
+
+if __name__ == '__main__':
+    run_test(IncrementalSuite(), sys.argv[1:])
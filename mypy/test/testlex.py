@@ -1,12 +1,18 @@
 """Lexical analyzer test cases"""
 
+import os.path
+
 import typing
 
-from mypy.myunit import Suite, assert_equal
-from mypy.lex import lex
+from mypy.myunit import Suite, assert_equal, assert_raises, assert_true
+from mypy import lex
+from mypy.lex import lex as lex_string
+from mypy.test.config import PREFIX
 
 
 class LexerSuite(Suite):
+    backend = lex.REGEX_BACKEND
+
     def test_empty(self):
         self.assert_lex('', 'Eof()')
 
@@ -386,7 +392,7 @@ class LexerSuite(Suite):
         if lexed.endswith(' ...'):
             lexed = lexed[:-3] + 'Break() Eof()'
 
-        l = lex(src)
+        l = lex_string(src, backend=self.backend)
         r = []
         for t in l:
             r.append(str(t))
@@ -400,7 +406,7 @@ class LexerSuite(Suite):
         s = s.replace('\\n', '\n')
         s = s.replace('\\r', '\r')
 
-        tt = lex(s)
+        tt = lex_string(s, backend=self.backend)
         r = []
         for t in tt:
             r.append(t.line)
@@ -409,3 +415,68 @@ class LexerSuite(Suite):
             a.append(a[-1])
             a.append(a[-1])
         assert_equal(r, a)
+
+
+class DispatchLexerSuite(LexerSuite):
+    backend = lex.DISPATCH_BACKEND
+
+
+class LexerBackendSuite(Suite):
+    def test_backends_produce_same_tokens(self):
+        for path in [os.path.join('mypy', 'lex.py'),
+                     os.path.join('mypy', 'parse.py'),
+                     os.path.join('stubs', '3.2', 'builtins.py'),
+                     os.path.join('lib-python', '3.2', 'textwrap.py')]:
+            with open(os.path.join(PREFIX, path)) as f:
+                text = f.read()
+            regex = lex_string(text, backend=lex.REGEX_BACKEND)
+            dispatch = lex_string(text, backend=lex.DISPATCH_BACKEND)
+            assert_equal(self.dump(regex), self.dump(dispatch))
+
+    def test_invalid_characters(self):
+        for backend in lex.REGEX_BACKEND, lex.DISPATCH_BACKEND:
+            tokens = lex_string('x ! \xe9', backend=backend)
+            assert_equal(' '.join(str(t) for t in tokens),
+                         'Name(x) LexError( !) LexError( \xe9) Break() Eof()')
+
+    def test_trailing_whitespace_without_newline(self):
+        for text in 'x = 1  ', 'x = 1\t\x0c', 'x\n  \n  ':
+            regex = lex_string(text, backend=lex.REGEX_BACKEND)
+            dispatch = lex_string(text, backend=lex.DISPATCH_BACKEND)
+            assert_equal(self.dump(regex), self.dump(dispatch))
+            assert_true('LexError' not in ' '.join(str(t) for t in regex))
+
+    def dump(self, tokens):
+        return [(str(t), t.line) for t in tokens]
+
+
+class TokenStreamSuite(Suite):
+    def test_same_tokens_as_lex(self):
+        text = 'if x:\n  y = """a\nb"""  # c\n\n  z(1,\n    2)\n'
+        tokens = lex_string(text)
+        for backend in lex.REGEX_BACKEND, lex.DISPATCH_BACKEND:
+            for chunk_size in 1, 3, 1000:
+                stream = lex.TokenStream(text, backend=backend)
+                stream.chunk_size = chunk_size
+                for i, t in enumerate(tokens):
+                    assert_equal((str(stream[i]), stream[i].line),
+                                 (str(t), t.line))
+                assert_raises(IndexError, lambda: stream[len(tokens)])
+                assert_equal(stream.num_tokens, len(tokens))
+
+    def test_trailing_whitespace_without_newline(self):
+        text = 'x = 1  '
+        tokens = lex_string(text)
+        stream = lex.TokenStream(text)
+        stream.chunk_size = 1
+        for i, t in enumerate(tokens):
+            assert_equal(str(stream[i]), str(t))
+        assert_equal(str(tokens[-2]), 'Break(  )')
+
+    def test_old_tokens_are_dropped(self):
+        stream = lex.TokenStream('x = 1\n' * 100)
+        stream.chunk_size = 10
+        stream.lookback = 2
+        assert_equal(str(stream[200]), 'Name(x)')
+        assert_equal(str(stream[198]), 'IntLit( 1)')
+        assert_raises(IndexError, lambda: stream[100])
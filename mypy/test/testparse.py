@@ -17,17 +17,27 @@ from mypy.errors import CompileError
 class ParserSuite(Suite):
     parse_files = ['parse.test',
                    'parse-python2.test']
+    lossless = True
 
     def cases(self):
         # The test case descriptions are stored in data files.
         c = []
         for f in self.parse_files:
             c += parse_test_cases(
-                os.path.join(config.test_data_prefix, f), test_parser)
+                os.path.join(config.test_data_prefix, f), self.run_case)
         return c
 
+    def run_case(self, testcase):
+        test_parser(testcase, self.lossless)
 
-def test_parser(testcase):
+
+class LossyParserSuite(ParserSuite):
+    """Parse without recording the tokens of nodes; the trees are the same."""
+
+    lossless = False
+
+
+def test_parser(testcase, lossless=True):
     """Perform a single parser test case.
 
     The argument contains the description of the test case.
@@ -38,7 +48,8 @@ def test_parser(testcase):
         pyversion = 2
 
     try:
-        n = parse('\n'.join(testcase.input), pyversion=pyversion)
+        n = parse('\n'.join(testcase.input), pyversion=pyversion,
+                  lossless=lossless)
         a = str(n).split('\n')
     except CompileError as e:
         a = e.messages
@@ -0,0 +1,107 @@
+"""Test cases for the lexer and parser benchmark"""
+
+import io
+import json
+import os
+import os.path
+import sys
+
+from mypy import lex, parsebench
+from mypy.myunit import assert_equal, assert_true, assert_raises, run_test
+from mypy.parse import parse
+from mypy.parsebench import FileResult, BenchmarkResult
+from mypy.test.helpers import TempDirSuite
+
+
+class ParseBenchmarkSuite(TempDirSuite):
+    def test_corpus_files(self):
+        self.write('stubs/3.2/a.py', '')
+        self.write('stubs/3.2/b.txt', '')
+        self.write('lib-python/3.2/c.py', '')
+        self.write('lib-python/3.3/d.py', '')
+        self.write('mypy/e.py', '')
+        assert_equal(parsebench.corpus_files(self.dir),
+                     [os.path.join('lib-python', '3.2', 'c.py'),
+                      os.path.join('mypy', 'e.py'),
+                      os.path.join('stubs', '3.2', 'a.py')])
+
+    def test_counts(self):
+        self.write('a.py', 'x = 1\ndef f() -> None:\n    print(x)\n')
+        self.write('2.7/b.py', 'print "x"\n')
+        result = parsebench.run_benchmark(
+            ['a.py', os.path.join('2.7', 'b.py')], self.dir, repeat=1)
+        a = result.files[0]
+        assert_equal(a.tokens, 20)
+        assert_equal(a.nodes, 10)
+        assert_equal(a.error, None)
+        totals = result.totals()
+        assert_equal(totals['files'], 2)
+        assert_equal(totals['tokens'], a.tokens + result.files[1].tokens)
+
+    def test_parse_error(self):
+        self.write('a.py', 'x = (\n')
+        result = parsebench.run_benchmark(['a.py'], self.dir, repeat=1,
+                                          measure_memory=False)
+        assert_equal(result.files[0].error,
+                     'a.py, line 2: Parse error before end of line')
+        assert_equal(result.totals()['files'], 0)
+        assert_equal(result.totals()['peak_memory'], None)
+        assert_equal(result.format_report()[-2:],
+                     ['files that could not be parsed:',
+                      '  a.py, line 2: Parse error before end of line'])
+
+    def test_outliers(self):
+        result = BenchmarkResult([self.result('a', 1000, 0.01),
+                                  self.result('b', 1000, 0.02),
+                                  self.result('c', 10, 0.5),
+                                  self.result('d', 1000, 0.001)], False)
+        assert_equal([f.path for f in result.outliers(2)], ['b', 'a'])
+
+    def test_compare_to_baseline(self):
+        baseline = BenchmarkResult([self.result('a', 1000, 0.01),
+                                    self.result('b', 1000, 0.01)], True)
+        data = json.loads(baseline.format_json())
+        result = BenchmarkResult([self.result('a', 1000, 0.005),
+                                  self.result('b', 1000, 0.011)], True)
+        lines = result.format_comparison(data)
+        assert_equal(lines[0].split()[0], 'tokens/sec')
+        assert_equal(lines[1].split(), ['nodes/sec', '100000', '->',
+                                        '125000', '+25.0%'])
+        assert_equal(lines[-1].split(), ['-50.0%', 'a'])
+
+    def test_backend(self):
+        self.write('a.py', 'x = 1\ndef f() -> None:\n    print(x)\n')
+        result = parsebench.run_benchmark(
+            ['a.py'], self.dir, repeat=1, backend=lex.DISPATCH_BACKEND,
+            measure_memory=False)
+        assert_equal((result.files[0].tokens, result.files[0].nodes),
+                     (20, 10))
+        # The backend is also used for parsing.
+        assert_raises(ValueError, lambda: parse('x = 1', lexer_backend='x'))
+
+    def test_unknown_backend(self):
+        stderr = sys.stderr
+        sys.stderr = io.StringIO()
+        try:
+            parsebench.main(['--backend', 'x'])
+        except SystemExit as e:
+            assert_equal(e.code, 2)
+        else:
+            assert_true(False, 'no SystemExit')
+        finally:
+            message = sys.stderr.getvalue()
+            sys.stderr = stderr
+        assert_equal(message.splitlines()[0], 'Unknown lexer backend: x')
+
+    def result(self, path: str, tokens: int,
+               parse_time: float) -> FileResult:
+        result = FileResult(path)
+        result.tokens = result.nodes = tokens
+        result.lex_time = parse_time / 2
+        result.parse_time = parse_time
+        result.memory = tokens * 100
+        return result
+
+
+if __name__ == '__main__':
+    run_test(ParseBenchmarkSuite(), sys.argv[1:])
@@ -0,0 +1,106 @@
+"""Test cases for incremental reparsing of edited source files."""
+
+import sys
+
+from mypy.myunit import Suite, assert_equal, assert_true, run_test
+from mypy.errors import CompileError
+from mypy.nodes import MypyFile
+from mypy.parse import parse
+from mypy.reparse import SourceTree
+
+
+program = '''\
+import a
+
+def f() -> None:
+    x = 1
+
+def g() -> None:
+    pass
+
+y = 2
+'''
+
+
+class ReparseSuite(Suite):
+    def test_edit_inside_function(self):
+        source = SourceTree(program)
+        f, g, y = source.tree.defs[1:]
+        tree = self.edit(source, program.index('1'), 1, '(1 +\n 2)')
+        assert_true(tree.defs[1] is not f)
+        assert_true(tree.defs[2] is g)
+        assert_true(tree.defs[3] is y)
+        assert_equal(y.line, 10)
+
+    def test_insert_statement(self):
+        source = SourceTree(program)
+        self.edit(source, program.index('def g'), 0, 'import b\n')
+        assert_equal([imp.line for imp in source.tree.imports], [1, 6])
+        self.edit(source, 0, len('import a\n'), '')
+        assert_equal([imp.line for imp in source.tree.imports], [5])
+
+    def test_edit_at_end(self):
+        source = SourceTree(program)
+        self.edit(source, len(program), 0, 'z = 3\n')
+        self.edit(source, len(program) - 2, 2, '')
+
+    def test_edit_joins_statements(self):
+        text = 'if x:\n    pass\ny = 1\nz = 2\n'
+        source = SourceTree(text)
+        self.edit(source, text.index('y = 1'), len('y = 1'), 'else: y = 1')
+        assert_equal(len(source.tree.defs), 2)
+        self.edit(source, source.text.index('else: '), len('else: '), '')
+        assert_equal(len(source.tree.defs), 3)
+
+    def test_triple_quoted_string_spans_statements(self):
+        text = 'x = 1\ny = 2\nz = 3 # """\n'
+        source = SourceTree(text)
+        self.edit(source, text.index('y'), 0, 's = """')
+        assert_equal(len(source.tree.defs), 2)
+        self.edit(source, text.index('y'), len('s = """'), '')
+        assert_equal(len(source.tree.defs), 3)
+
+    def test_overloaded_function(self):
+        text = ('@overload\ndef f(x: int) -> None: pass\n'
+                '@overload\ndef f(x: str) -> None: pass\n'
+                'x = 1\n')
+        source = SourceTree(text)
+        self.edit(source, text.index('str'), 3, 'bytes')
+        assert_equal(len(source.tree.defs), 2)
+        self.edit(source, source.text.index('x = 1'), 0,
+                  '@overload\ndef f(x: float) -> None: pass\n')
+        assert_equal(len(source.tree.defs), 2)
+
+    def test_statements_on_same_line(self):
+        text = 'x = 1; y = 2\nz = 3\n'
+        source = SourceTree(text)
+        self.edit(source, text.index('2'), 1, '(\n2)')
+        self.edit(source, source.text.index('z'), 0, 'w = 0; ')
+
+    def test_parse_error_leaves_tree_unchanged(self):
+        source = SourceTree(program)
+        defs = source.tree.defs
+        try:
+            source.edit(program.index('pass'), 4, 'pass +')
+        except CompileError as e:
+            assert_equal(e.messages, ['<input>: In function "g":',
+                                      '<input>, line 7: Parse error before +'])
+        else:
+            assert_true(False, 'No parse error')
+        assert_equal(source.text, program)
+        assert_true(source.tree.defs == defs)
+
+    def edit(self, source: SourceTree, start: int, length: int,
+             replacement: str) -> MypyFile:
+        """Edit source and check that the result matches a full parse."""
+        text = source.text[:start] + replacement + source.text[start + length:]
+        tree = source.edit(start, start + length, replacement)
+        assert_equal(source.text, text)
+        assert_equal(str(tree), str(parse(text)))
+        assert_equal([(type(imp), imp.line) for imp in tree.imports],
+                     [(type(imp), imp.line) for imp in parse(text).imports])
+        return tree
+
+
+if __name__ == '__main__':
+    run_test(ReparseSuite(), sys.argv[1:])
@@ -1,8 +1,11 @@
 import typing
 
-from mypy.myunit import Suite, assert_true, run_test
-from mypy.subtypes import is_subtype
-from mypy.typefixture import TypeFixture, InterfaceTypeFixture
+from mypy.myunit import Suite, assert_equal, assert_true, run_test
+from mypy.subtypes import (
+    is_subtype, subtype_cache, ResultCache, map_instance_to_supertype
+)
+from mypy.typefixture import TypeFixture, InterfaceTypeFixture, make_type_info
+from mypy.types import Instance
 
 
 class SubtypingSuite(Suite):
@@ -149,6 +152,82 @@ class SubtypingSuite(Suite):
         self.assert_not_subtype(t, s)
 
 
+class SupertypeMappingSuite(Suite):
+    def set_up(self):
+        self.fx = TypeFixture()
+        # X[T] <: GS[T, A] <: G[A]
+        self.xi = make_type_info('X', mro=[self.fx.gsi, self.fx.gi,
+                                           self.fx.oi],
+                                 bases=[Instance(self.fx.gsi,
+                                                 [self.fx.t, self.fx.a])],
+                                 typevars=['T'])
+
+    def test_ancestors(self):
+        assert_equal(sorted(self.xi.ancestors),
+                     ['G', 'GS', 'X', 'builtins.object'])
+        assert_true(self.xi.has_base('G'))
+        assert_true(not self.xi.has_base('H'))
+
+    def test_map_to_indirect_supertype(self):
+        x = Instance(self.xi, [self.fx.b])
+        assert_equal(str(map_instance_to_supertype(x, self.fx.gsi)),
+                     'GS[B*, A]')
+        assert_equal(str(map_instance_to_supertype(x, self.fx.gi)), 'G[A*]')
+        assert_equal(str(self.xi.supertype_map[self.fx.gsi]), 'GS[T`1, A]')
+        # The stored mapping is reused for other type arguments.
+        x = Instance(self.xi, [self.fx.c])
+        assert_equal(str(map_instance_to_supertype(x, self.fx.gsi)),
+                     'GS[C*, A]')
+
+    def test_map_to_non_generic_supertype(self):
+        x = Instance(self.xi, [self.fx.b])
+        assert_equal(str(map_instance_to_supertype(x, self.fx.oi)),
+                     'builtins.object')
+        assert_equal(self.xi.supertype_map, {})
+
+
+class SubtypeCacheSuite(Suite):
+    def set_up(self):
+        self.fx = TypeFixture()
+        subtype_cache.clear()
+
+    def tear_down(self):
+        subtype_cache.clear()
+
+    def test_hits_and_misses(self):
+        assert_true(is_subtype(self.fx.gsab, self.fx.gb))
+        misses = subtype_cache.misses
+        assert_equal(subtype_cache.hits, 0)
+        # Structurally equal types share cached results.
+        gb = Instance(self.fx.gb.type, self.fx.gb.args)
+        assert_true(is_subtype(self.fx.gsab, gb))
+        assert_equal((subtype_cache.hits, subtype_cache.misses), (1, misses))
+        assert_true(not is_subtype(self.fx.gb, self.fx.gsab))
+        assert_equal(subtype_cache.hits, 1)
+
+    def test_any_is_not_cached(self):
+        assert_true(is_subtype(self.fx.a, self.fx.anyt))
+        assert_equal((subtype_cache.hits, subtype_cache.misses), (0, 0))
+
+    def test_clear(self):
+        is_subtype(self.fx.a, self.fx.o)
+        subtype_cache.clear()
+        assert_equal((subtype_cache.hits, subtype_cache.misses), (0, 0))
+        is_subtype(self.fx.a, self.fx.o)
+        assert_equal(subtype_cache.misses, 1)
+
+    def test_least_recently_used_result_is_evicted(self):
+        cache = ResultCache(2)
+        cache.add('a', True)
+        cache.add('b', False)
+        cache.get('a')
+        cache.add('c', True)
+        assert_equal(cache.get('b'), None)
+        assert_equal(cache.get('a'), True)
+        assert_equal(cache.get('c'), True)
+        assert_equal((cache.hits, cache.misses), (3, 1))
+
+
 if __name__ == '__main__':
     import sys
     run_test(SubtypingSuite(), sys.argv[1:])
@@ -0,0 +1,53 @@
+"""Test cases for syntax checking files without a build"""
+
+import sys
+
+from mypy import syntaxcheck
+from mypy.myunit import assert_equal, run_test
+from mypy.test.helpers import TempDirSuite
+
+
+class SyntaxCheckSuite(TempDirSuite):
+    def set_up(self):
+        super().set_up()
+        self.write('a.py', 'def f(:\n    pass\n')
+        self.write('p/b.py', 'x = (\n')
+        self.write('p/q/c.py', 'y = 1\n')
+        self.write('p/d.txt', 'x = (\n')
+        self.write('p/e.py', 'print 1\n')
+
+    def test_find_source_files(self):
+        assert_equal(syntaxcheck.find_source_files(
+                         [self.path('p'), self.path('a.py'),
+                          self.path('p/q/c.py')]),
+                     [self.path('p/b.py'),
+                      self.path('p/e.py'),
+                      self.path('p/q/c.py'),
+                      self.path('a.py')])
+
+    def test_errors_are_sorted_by_file(self):
+        expected = ['tmp/a.py: In function "f":',
+                    'tmp/a.py, line 1: Parse error before :',
+                    'tmp/a.py, line 3: Parse error before end of line',
+                    'tmp/p/b.py, line 2: Parse error before end of line',
+                    'tmp/p/e.py, line 1: Parse error before numeric literal']
+        for jobs in 1, 2:
+            assert_equal(self.check([self.path('a.py'), self.path('p')],
+                                    jobs=jobs),
+                         expected)
+
+    def test_python_2(self):
+        assert_equal(self.check([self.path('p/e.py')], pyversion=2), [])
+
+    def test_unreadable_file(self):
+        assert_equal(self.check([self.path('missing.py')]),
+                     ["mypy: can't read file 'tmp/missing.py': "
+                      "No such file or directory"])
+
+    def check(self, paths, pyversion=3, jobs=1):
+        messages = syntaxcheck.check_syntax(paths, pyversion, jobs=jobs)
+        return [m.replace(self.dir, 'tmp') for m in messages]
+
+
+if __name__ == '__main__':
+    run_test(SyntaxCheckSuite(), sys.argv[1:])
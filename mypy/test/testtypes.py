@@ -7,13 +7,15 @@ from mypy.myunit import (
 )
 from mypy.erasetype import erase_type
 from mypy.expandtype import expand_type
-from mypy.join import join_types
-from mypy.meet import meet_types
+from mypy.join import join_types, join_cache
+from mypy.meet import meet_types, meet_cache
 from mypy.types import (
     UnboundType, AnyType, Void, Callable, TupleType, TypeVarDef, Type,
-    Instance, NoneTyp, ErrorType
+    Instance, NoneTyp, ErrorType, TypeTable, UnionType, BasicTypes, type_key
+)
+from mypy.nodes import (
+    ARG_POS, ARG_OPT, ARG_STAR, MDEF, SymbolTableNode, Var, FuncDef, Block
 )
-from mypy.nodes import ARG_POS, ARG_OPT, ARG_STAR
 from mypy.replacetvars import replace_type_vars
 from mypy.subtypes import is_subtype, is_more_precise, is_proper_subtype
 from mypy.typefixture import TypeFixture, InterfaceTypeFixture
@@ -112,6 +114,13 @@ class TypeOpsSuite(Suite):
     def test_expand_basic_generic_types(self):
         self.assert_expand(self.fx.gt, [(1, self.fx.a)], self.fx.ga)
 
+    def test_expand_shares_unchanged_types(self):
+        ga = self.fx.ga
+        assert_true(expand_type(ga, {1: self.fx.b}) is ga)
+        tuple_type = self.tuple(self.fx.t, ga)
+        assert_true(expand_type(tuple_type, {}) is tuple_type)
+        assert_true(expand_type(tuple_type, {1: self.fx.a}) is not tuple_type)
+
     # IDEA: Add test cases for
     #   tuple types
     #   callable types
@@ -243,6 +252,145 @@ class TypeOpsSuite(Suite):
                         tv)
 
 
+class TypeTableSuite(Suite):
+    def set_up(self):
+        self.fx = TypeFixture()
+        self.table = TypeTable()
+
+    def test_type_key(self):
+        fx = self.fx
+        assert_equal(type_key(Instance(fx.gi, [fx.a])),
+                     type_key(Instance(fx.gi, [Instance(fx.ai, [], 5)])))
+        assert_true(type_key(fx.ga) != type_key(fx.gb))
+        assert_true(type_key(fx.callable(fx.a, fx.b)) !=
+                    type_key(fx.callable(fx.b, fx.b)))
+        assert_equal(type_key(Instance(fx.gi, [UnboundType('X')])), None)
+
+    def test_intern(self):
+        fx = self.fx
+        ga = self.table.intern(Instance(fx.gi, [fx.a]))
+        assert_true(self.table.intern(Instance(fx.gi, [fx.a])) is ga)
+        assert_true(self.table.intern(Instance(fx.gi, [fx.b])) is not ga)
+        c = fx.callable(fx.a, fx.b)
+        assert_true(self.table.intern(fx.callable(fx.a, fx.b)) is
+                    self.table.intern(c))
+
+    def test_types_with_location_are_not_interned(self):
+        t = Instance(self.fx.ai, [], 3)
+        self.table.intern(Instance(self.fx.ai, []))
+        assert_true(self.table.intern(t) is t)
+        t = UnboundType('X')
+        assert_true(self.table.intern(t) is t)
+
+    def test_instance(self):
+        a = self.table.instance(self.fx.ai, [])
+        assert_true(self.table.instance(self.fx.ai, []) is a)
+        assert_true(self.table.intern(Instance(self.fx.ai, [])) is a)
+        ga = self.table.instance(self.fx.gi, [a])
+        assert_true(self.table.instance(self.fx.gi, [self.fx.a]) is ga)
+
+
+class MemberLookupSuite(Suite):
+    def set_up(self):
+        self.fx = TypeFixture()
+        self.f = FuncDef('f', [], [], [], Block([]))
+        self.x = Var('x')
+        self.fx.ai.names['f'] = SymbolTableNode(MDEF, self.f)
+        self.fx.ai.names['x'] = SymbolTableNode(MDEF, self.x)
+
+    def test_lookup(self):
+        bi = self.fx.bi
+        info, node = bi.lookup('f')
+        assert_true(info is self.fx.ai)
+        assert_true(node.node is self.f)
+        assert_true(bi.get_method('f') is self.f)
+        assert_equal(bi.get_var('f'), None)
+        assert_true(bi.get_var('x') is self.x)
+        assert_equal(bi.get_method('x'), None)
+        assert_equal(bi.lookup('y'), (None, None))
+        assert_equal(bi.get('y'), None)
+
+    def test_symbol_table_changes(self):
+        bi = self.fx.bi
+        assert_true(bi.get_var('x') is self.x)
+        x = Var('x')
+        bi.names['x'] = SymbolTableNode(MDEF, x)
+        assert_true(bi.get_var('x') is x)
+        del bi.names['x']
+        assert_true(bi.get_var('x') is self.x)
+
+    def test_mro_changes(self):
+        fx = self.fx
+        fx.di.names['y'] = SymbolTableNode(MDEF, Var('y'))
+        assert_equal(fx.bi.lookup('y'), (None, None))
+        fx.bi.set_mro([fx.bi, fx.ai, fx.di, fx.oi])
+        assert_true(fx.bi.lookup('y')[0] is fx.di)
+
+
+class UnionSimplificationSuite(Suite):
+    def set_up(self):
+        self.fx = TypeFixture()
+
+    def test_subtypes_are_removed(self):
+        fx = self.fx
+        self.assert_union([fx.b, fx.a, fx.c], 'A')
+        self.assert_union([fx.b, fx.d, fx.c], 'Union[B, D, C]')
+        self.assert_union([fx.gsab, fx.gb, fx.ga], 'Union[G[B], G[A]]')
+        self.assert_union([fx.b, fx.o], 'builtins.object')
+        self.assert_union([fx.b, UnionType([fx.d, fx.a])], 'Union[D, A]')
+
+    def test_non_instance_supertypes(self):
+        fx = self.fx
+        self.assert_union([fx.a, fx.b, fx.anyt], 'Any')
+        self.assert_union([fx.a, fx.t], 'Union[A, T`1]')
+
+    def test_duplicates(self):
+        fx = self.fx
+        self.assert_union([fx.a, fx.d, Instance(fx.ai, [])], 'Union[D, A]')
+        items = UnionType.make_simplified_union([fx.a, fx.d, fx.a]).items
+        assert_true(items[1] is fx.a)
+        # ErrorType is not a subtype of itself.
+        self.assert_union([ErrorType(), ErrorType()],
+                          'Union[<ERROR>, <ERROR>]')
+
+    def assert_union(self, items: List[Type], result: str) -> None:
+        assert_equal(str(UnionType.make_simplified_union(items)), result)
+
+
+class TypeOperationCacheSuite(Suite):
+    def set_up(self):
+        self.fx = TypeFixture()
+        join_cache.clear()
+        meet_cache.clear()
+
+    def tear_down(self):
+        join_cache.clear()
+        meet_cache.clear()
+
+    def test_join_cache(self):
+        fx = self.fx
+        assert_equal(str(join_types(fx.b, fx.c, fx.basic)), 'A')
+        assert_equal((join_cache.hits, join_cache.misses), (0, 1))
+        assert_equal(str(join_types(Instance(fx.bi, []), fx.c, fx.basic)),
+                     'A')
+        assert_equal((join_cache.hits, join_cache.misses), (1, 1))
+        assert_equal(str(join_types(fx.c, fx.b, fx.basic)), 'A')
+        assert_equal((join_cache.hits, join_cache.misses), (1, 2))
+
+    def test_meet_cache(self):
+        fx = self.fx
+        assert_equal(str(meet_types(fx.a, fx.b, fx.basic)), 'B')
+        assert_equal(str(meet_types(fx.a, fx.b, fx.basic)), 'B')
+        assert_equal((meet_cache.hits, meet_cache.misses), (1, 1))
+
+    def test_basic_types_are_part_of_key(self):
+        fx = self.fx
+        assert_equal(str(join_types(fx.a, fx.t, fx.basic)), 'builtins.object')
+        basic = BasicTypes(fx.a, fx.type_type, fx.std_tuple, None)
+        assert_equal(str(join_types(fx.a, fx.t, basic)), 'A')
+        assert_equal(join_cache.hits, 0)
+
+
 class JoinSuite(Suite):
     def set_up(self):
         self.fx = TypeFixture()
@@ -674,6 +822,10 @@ class CombinedTypesSuite(Suite):
     def __init__(self):
         self.test_types = TypesSuite()
         self.test_type_ops = TypeOpsSuite()
+        self.test_type_table = TypeTableSuite()
+        self.test_member_lookup = MemberLookupSuite()
+        self.test_union_simplification = UnionSimplificationSuite()
+        self.test_type_operation_caches = TypeOperationCacheSuite()
         self.test_join = JoinSuite()
         self.test_meet = MeetSuite()
         super().__init__()
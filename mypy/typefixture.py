@@ -220,7 +220,7 @@ def make_type_info(name: str,
     info = TypeInfo(SymbolTable(), class_def)
     if mro is None:
         mro = []
-    info.mro = [info] + mro
+    info.set_mro([info] + mro)
     if bases is None:
         if mro:
             # By default, assume that there is a single non-generic base.
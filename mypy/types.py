@@ -1,7 +1,9 @@
 """Classes for representing mypy types."""
 
 from abc import abstractmethod
-from typing import Undefined, Any, typevar, List, Tuple, cast, Generic, Set
+from typing import (
+    Undefined, Any, typevar, List, Tuple, Dict, cast, Generic, Set
+)
 
 import mypy.nodes
 
@@ -408,6 +410,13 @@ class UnionType(Type):
 
     @staticmethod
     def make_simplified_union(items: List[Type], line: int = -1, repr: Any = None) -> Type:
+        """Return the union of items, without redundant items.
+
+        Nested unions are flattened. An item is removed if it is a subtype of
+        another item that has not been removed (items are considered in
+        order). Only items that can be supertypes of an item are compared
+        to it, so that unions of many instance types can be built quickly.
+        """
         while any(isinstance(typ, UnionType) for typ in items):
             all_items = []  # type: List[Type]
             for typ in items:
@@ -418,9 +427,21 @@ class UnionType(Type):
             items = all_items
 
         from mypy.subtypes import is_subtype
+        items = remove_duplicate_types(items)
+        # Instance items by class name, and all other items
+        instances = Dict[str, List[int]]()
+        others = List[int]()
+        for i in range(len(items)):
+            if isinstance(items[i], Instance):
+                name = cast(Instance, items[i]).type.fullname()
+                instances.setdefault(name, []).append(i)
+            else:
+                others.append(i)
         removed = Set[int]()
         for i in range(len(items)):
-            if any(is_subtype(items[i], items[j]) for j in range(len(items))
+            if any(is_subtype(items[i], items[j])
+                   for j in possible_supertypes(items[i], instances, others,
+                                                len(items))
                    if j not in removed and j != i):
                 removed.add(i)
 
@@ -797,6 +818,184 @@ class TypeQuery(TypeVisitor[bool]):
             return res
 
 
+class TypeKeyVisitor(TypeVisitor[Any]):
+    """Visitor for computing structural keys of types (see type_key)."""
+
+    def visit_unbound_type(self, t: UnboundType) -> Any:
+        return None
+
+    def visit_type_list(self, t: TypeList) -> Any:
+        return None
+
+    def visit_error_type(self, t: ErrorType) -> Any:
+        return ('Error',)
+
+    def visit_any(self, t: AnyType) -> Any:
+        return ('Any',)
+
+    def visit_void(self, t: Void) -> Any:
+        return ('Void', t.source)
+
+    def visit_none_type(self, t: NoneTyp) -> Any:
+        return ('None',)
+
+    def visit_erased_type(self, t: ErasedType) -> Any:
+        return ('Erased',)
+
+    def visit_type_var(self, t: TypeVar) -> Any:
+        values = self.keys(t.values)
+        if values is None:
+            return None
+        return ('TypeVar', t.name, t.id, values, t.is_wrapper_var)
+
+    def visit_instance(self, t: Instance) -> Any:
+        args = self.keys(t.args)
+        if args is None:
+            return None
+        return ('Instance', t.type, args, bool(t.erased))
+
+    def visit_callable(self, t: Callable) -> Any:
+        arg_types = self.keys(t.arg_types)
+        ret_type = t.ret_type.accept(self)
+        variables = List[Any]()
+        for v in t.variables:
+            variables.append((v.name, v.id, self.keys(v.values)))
+        bound_vars = List[Any]()
+        for id, bound in t.bound_vars:
+            bound_vars.append((id, bound.accept(self)))
+        if (arg_types is None or ret_type is None or
+                None in [v[2] for v in variables] or
+                None in [b[1] for b in bound_vars]):
+            return None
+        return ('Callable', arg_types, tuple(t.arg_kinds), tuple(t.arg_names),
+                ret_type, t.is_type_obj(), t.name, tuple(variables),
+                tuple(bound_vars))
+
+    def visit_overloaded(self, t: Overloaded) -> Any:
+        items = self.keys(cast(List[Type], t.items()))
+        if items is None:
+            return None
+        return ('Overloaded', items)
+
+    def visit_tuple_type(self, t: TupleType) -> Any:
+        items = self.keys(t.items)
+        if items is None:
+            return None
+        return ('Tuple', items)
+
+    def visit_union_type(self, t: UnionType) -> Any:
+        items = self.keys(t.items)
+        if items is None:
+            return None
+        return ('Union', items)
+
+    def visit_runtime_type_var(self, t: RuntimeTypeVar) -> Any:
+        return None
+
+    def keys(self, types: List[Type]) -> Any:
+        """Return a tuple of the keys of types (None if any is None)."""
+        result = List[Any]()
+        for t in types:
+            key = t.accept(self)
+            if key is None:
+                return None
+            result.append(key)
+        return tuple(result)
+
+
+def type_key(t: Type) -> Any:
+    """Return a hashable key that identifies the structure of a type.
+
+    Types with equal keys are interchangeable during type checking. Source
+    locations (line and repr) are not part of the key. Return None for types
+    that have no key (unbound types and runtime type variables, and types
+    that contain them).
+    """
+    return t.accept(TypeKeyVisitor())
+
+
+def remove_duplicate_types(items: List[Type]) -> List[Type]:
+    """Remove all but the last of structurally equal types from items.
+
+    Since a type is kept if it is equal to a later one, the types removed
+    must be subtypes of themselves (which isn't the case for ErrorType,
+    for example).
+    """
+    from mypy.subtypes import is_subtype
+    seen = Set[Any]()
+    result = List[Type]()
+    for item in reversed(items):
+        key = type_key(item)
+        if key is not None:
+            if key in seen and is_subtype(item, item):
+                continue
+            seen.add(key)
+        result.append(item)
+    result.reverse()
+    return result
+
+
+def possible_supertypes(t: Type, instances: Dict[str, List[int]],
+                        others: List[int], count: int) -> List[int]:
+    """Return the indexes of the union items that may be supertypes of t.
+
+    An instance type (without a duck type) can only be a subtype of instances
+    of its base classes and object, or of a non-instance type.
+    instances maps class names to the indexes of instance items, others
+    contains the indexes of other items, and count is the number of items.
+    """
+    if not isinstance(t, Instance) or cast(Instance, t).type.ducktype:
+        return list(range(count))
+    info = cast(Instance, t).type
+    result = others[:]
+    for name in info.ancestors:
+        result.extend(instances.get(name, []))
+    if 'builtins.object' not in info.ancestors:
+        result.extend(instances.get('builtins.object', []))
+    return result
+
+
+class TypeTable:
+    """Table of shared type objects (hash consing).
+
+    intern returns the same object for all structurally equal types, so
+    that interned types can be compared using 'is' and used as cache keys.
+    Interned types are shared and must not be modified. Types with a source
+    location are never interned, so that the location is not lost.
+    """
+
+    def __init__(self) -> None:
+        # Map from type key to the shared type object
+        self.types = Dict[Any, Type]()
+        # Instances without type arguments, by TypeInfo
+        self.plain_instances = Dict[mypy.nodes.TypeInfo, Instance]()
+
+    def intern(self, t: Type) -> Type:
+        """Return the shared object that is structurally equal to t."""
+        if t.line >= 0 or t.repr is not None:
+            return t
+        key = type_key(t)
+        if key is None:
+            return t
+        shared = self.types.get(key)
+        if shared is None:
+            self.types[key] = t
+            return t
+        return shared
+
+    def instance(self, info: mypy.nodes.TypeInfo,
+                 args: List[Type]) -> Instance:
+        """Return a shared instance type info[args]."""
+        if not args:
+            result = self.plain_instances.get(info)
+            if result is None:
+                result = Instance(info, [])
+                self.plain_instances[info] = result
+                self.types[type_key(result)] = result
+            return result
+        return cast(Instance, self.intern(Instance(info, args)))
+
+
 class BasicTypes:
     """Collection of Instance types of basic types (object, type, etc.)."""
 
@@ -34,6 +34,8 @@ for version in ['3.4', '3.3', '3.2', '2.7']:
     for stub_dir in stub_dirs:
         target = os.path.join('lib', 'mypy', 'stubs', version, stub_dir)
         files = glob.glob(os.path.join(base, stub_dir, '*.py'))
+        # Include snapshots of core modules (see mypy --create-snapshot).
+        files += glob.glob(os.path.join(base, stub_dir, '*.snapshot'))
         stubs.append((target, files))
 
 classifiers = [
@@ -59,7 +61,7 @@ setup(name='mypy',
       package_dir={'': 'lib-typing/3.2', 'mypy': 'mypy'},
       py_modules=['typing'],
       packages=['mypy'],
-      scripts=['scripts/mypy'],
+      scripts=['scripts/mypy', 'scripts/mypy-client'],
       data_files=stubs,
       classifiers=classifiers,
       )
@@ -0,0 +1,15 @@
+# Stubs for bisect
+
+# Based on http://docs.python.org/3.2/library/bisect.html
+
+from typing import typevar, Sequence, List
+
+T = typevar('T')
+
+def insort_left(a: List[T], x: T, lo: int = 0, hi: int = None) -> None: pass
+def insort_right(a: List[T], x: T, lo: int = 0, hi: int = None) -> None: pass
+def insort(a: List[T], x: T, lo: int = 0, hi: int = None) -> None: pass
+
+def bisect_left(a: Sequence[T], x: T, lo: int = 0, hi: int = None) -> int: pass
+def bisect_right(a: Sequence[T], x: T, lo: int = 0, hi: int = None) -> int: pass
+def bisect(a: Sequence[T], x: T, lo: int = 0, hi: int = None) -> int: pass
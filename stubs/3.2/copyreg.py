@@ -0,0 +1,12 @@
+# Stubs for copyreg
+
+# NOTE: These are incomplete!
+
+from typing import Undefined, Any, Dict, Function
+
+dispatch_table = Undefined(Dict[type, Function[[Any], Any]])
+
+def pickle(type: type, function: Function[[Any], Any],
+           constructor: Any = None) -> None: pass
+def constructor(object: Any) -> None: pass
+def __newobj__(cls: type, *args: Any) -> Any: pass
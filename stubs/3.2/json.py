@@ -6,7 +6,10 @@ class JSONDecodeError(object):
     def loads(self, s: str) -> Any: pass
     def load(self, fp: IO[str]) -> Any: pass
 
-def dumps(obj: Any) -> str: pass
+def dumps(obj: Any, *, skipkeys: bool = False, ensure_ascii: bool = True,
+          check_circular: bool = True, allow_nan: bool = True,
+          cls: Any = None, indent: Any = None, separators: Any = None,
+          default: Any = None, sort_keys: bool = False) -> str: pass
 def dump(obj: Any, fp: IO[str], *args: Any, **kwds: Any) -> None: pass
 def loads(s: str) -> Any: pass
 def load(fp: IO[str]) -> Any: pass
@@ -0,0 +1,34 @@
+# Stubs for multiprocessing
+
+# NOTE: These are incomplete!
+
+from typing import Any, Function, Iterable, Iterator, List, Dict
+
+class AsyncResult:
+    def get(self, timeout: float = None) -> Any: pass
+    def wait(self, timeout: float = None) -> None: pass
+    def ready(self) -> bool: pass
+    def successful(self) -> bool: pass
+
+class Pool:
+    def __init__(self, processes: int = None,
+                 initializer: Any = None,
+                 initargs: Iterable[Any] = (),
+                 maxtasksperchild: int = None) -> None: pass
+    def apply(self, func: Any, args: Iterable[Any] = (),
+              kwds: Dict[str, Any] = {}) -> Any: pass
+    def apply_async(self, func: Any, args: Iterable[Any] = (),
+                    kwds: Dict[str, Any] = {},
+                    callback: Function[[Any], None] = None) -> AsyncResult: pass
+    def map(self, func: Function[[Any], Any], iterable: Iterable[Any] = (),
+            chunksize: int = None) -> List[Any]: pass
+    def imap(self, func: Function[[Any], Any], iterable: Iterable[Any] = (),
+             chunksize: int = None) -> Iterator[Any]: pass
+    def imap_unordered(self, func: Function[[Any], Any],
+                       iterable: Iterable[Any] = (),
+                       chunksize: int = None) -> Iterator[Any]: pass
+    def close(self) -> None: pass
+    def terminate(self) -> None: pass
+    def join(self) -> None: pass
+
+def cpu_count() -> int: pass
@@ -2,11 +2,36 @@
 
 # NOTE: These are incomplete!
 
-from typing import Any, IO
+from typing import Undefined, Any, Dict, Function, IO
 
+HIGHEST_PROTOCOL = 0
+DEFAULT_PROTOCOL = 0
+
+def dump(obj: Any, file: IO[bytes], protocol: int = None, *,
+         fix_imports: bool = True) -> None: pass
 def dumps(obj: Any, protocol: int = None, *,
           fix_imports: bool = True) -> bytes: pass
 def loads(p: bytes, *, fix_imports: bool = True,
           encoding: str = 'ASCII', errors: str = 'strict') -> Any: pass
 def load(file: IO[bytes], *, fix_imports: bool = True, encoding: str = 'ASCII',
          errors: str = 'strict') -> Any: pass
+
+class PickleError(Exception): pass
+class PicklingError(PickleError): pass
+class UnpicklingError(PickleError): pass
+
+class Pickler:
+    dispatch_table = Undefined(Dict[type, Function[[Any], Any]])
+
+    def __init__(self, file: IO[bytes], protocol: int = None, *,
+                 fix_imports: bool = True) -> None: pass
+    def dump(self, obj: Any) -> None: pass
+    def persistent_id(self, obj: Any) -> Any: pass
+    def clear_memo(self) -> None: pass
+
+class Unpickler:
+    def __init__(self, file: IO[bytes], *, fix_imports: bool = True,
+                 encoding: str = 'ASCII', errors: str = 'strict') -> None: pass
+    def load(self) -> Any: pass
+    def persistent_load(self, pid: Any) -> Any: pass
+    def find_class(self, module: str, name: str) -> Any: pass
@@ -5,5 +5,6 @@ import typing
 # TODO signatures
 def format_tb(traceback): pass
 def print_ecx(limit=None, file=None, chain=True): pass
+def format_exc(limit: int = None, chain: bool = True) -> str: pass
 
 # TODO add more
@@ -0,0 +1,12 @@
+# Stubs for tracemalloc
+
+# NOTE: These are incomplete!
+
+from typing import Tuple
+
+def start(nframe: int = 1) -> None: pass
+def stop() -> None: pass
+def is_tracing() -> bool: pass
+def clear_traces() -> None: pass
+def get_traced_memory() -> Tuple[int, int]: pass
+def get_tracemalloc_memory() -> int: pass
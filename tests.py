@@ -9,35 +9,71 @@ from mypy.test import testsolve
 from mypy.test import testinfer
 from mypy.test import testlex
 from mypy.test import testparse
+from mypy.test import testreparse
+from mypy.test import testparsebench
+from mypy.test import testsyntaxcheck
+from mypy.test import testimportscan
 from mypy.test import testsemanal
 from mypy.test import testtransform
 from mypy.test import testcheck
 from mypy.test import testtypegen
 from mypy.test import testoutput
 from mypy.test import testdyncheck
+from mypy.test import testincremental
+from mypy.test import testgraph
+from mypy.test import testfindmodule
+from mypy.test import testdaemon
+from mypy.test import testbuild
+from mypy.test import testbuildstats
 
 
 class AllSuite(Suite):
     def __init__(self):
         self.test_types = testtypes.TypesSuite()
         self.test_typeops = testtypes.TypeOpsSuite()
+        self.test_type_table = testtypes.TypeTableSuite()
+        self.test_member_lookup = testtypes.MemberLookupSuite()
+        self.test_union_simplification = testtypes.UnionSimplificationSuite()
+        self.test_type_operation_caches = testtypes.TypeOperationCacheSuite()
         self.test_join = testtypes.JoinSuite()
         self.test_meet = testtypes.MeetSuite()
         self.test_subtypes = testsubtypes.SubtypingSuite()
+        self.test_supertype_mapping = testsubtypes.SupertypeMappingSuite()
+        self.test_subtype_cache = testsubtypes.SubtypeCacheSuite()
         self.test_solve = testsolve.SolveSuite()
         self.test_infer = testinfer.MapActualsToFormalsSuite()
         self.test_lex = testlex.LexerSuite()
+        self.test_lex_dispatch = testlex.DispatchLexerSuite()
+        self.test_lex_backends = testlex.LexerBackendSuite()
+        self.test_token_stream = testlex.TokenStreamSuite()
         self.test_parse = testparse.ParserSuite()
+        self.test_parse_lossy = testparse.LossyParserSuite()
         self.test_parse_errors = testparse.ParseErrorSuite()
+        self.test_reparse = testreparse.ReparseSuite()
+        self.test_parse_bench = testparsebench.ParseBenchmarkSuite()
+        self.test_syntax_check = testsyntaxcheck.SyntaxCheckSuite()
+        self.test_import_scan = testimportscan.ImportScanSuite()
         self.test_semanal = testsemanal.SemAnalSuite()
         self.test_semanal_errors = testsemanal.SemAnalErrorSuite()
         self.test_semanal_symtable = testsemanal.SemAnalSymtableSuite()
         self.test_semanal_typeinfos = testsemanal.SemAnalTypeInfoSuite()
         self.test_transform = testtransform.TransformSuite()
         self.test_check = testcheck.TypeCheckSuite()
+        self.test_check_parallel = testcheck.ParallelParseSuite()
+        self.test_check_lazy_stubs = testcheck.LazyStubsSuite()
         self.test_typegen = testtypegen.TypeExportSuite()
         self.test_output = testoutput.OutputSuite()
         self.test_dyncheck = testdyncheck.DyncheckTransformSuite()
+        self.test_incremental = testincremental.IncrementalSuite()
+        self.test_incremental_check = testincremental.IncrementalCheckSuite()
+        self.test_graph = testgraph.StronglyConnectedComponentsSuite()
+        self.test_update_components = testgraph.UpdateComponentsSuite()
+        self.test_find_module = testfindmodule.FindModuleSuite()
+        self.test_daemon = testdaemon.BuildServerSuite()
+        self.test_build = testbuild.MultipleSourcesSuite()
+        self.test_parse_cache = testbuild.ParseTreeCacheSuite()
+        self.test_snapshot = testbuild.SnapshotSuite()
+        self.test_build_stats = testbuildstats.BuildStatsSuite()
         super().__init__()
 
 